@@ -0,0 +1,216 @@
+import bisect
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Commands run inside a batch are recorded one by one as commands
+KINDS = ("command", "sequence")
+GRANULARITIES = ("hour", "day")
+
+# Upper bounds (seconds) of the latency histogram bins; a last bin holds anything slower
+LATENCY_BOUNDS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+# Longer command strings are cut so one bucket key stays a reasonable size
+MAX_NAME_LENGTH = 200
+
+
+def hour_bucket(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def local_time(moment: datetime) -> datetime:
+    """Buckets are naive local time; convert an aware datetime to match them"""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone().replace(tzinfo=None)
+
+
+def parse_time(text: str) -> datetime:
+    """ISO 8601 timestamp (a trailing Z or an offset is allowed) as naive local time"""
+    if text.endswith(("Z", "z")):
+        text = text[:-1] + "+00:00"
+    return local_time(datetime.fromisoformat(text))
+
+
+def latency_bin(seconds: float) -> int:
+    return bisect.bisect_left(LATENCY_BOUNDS, seconds)
+
+
+def estimate_percentile(bins: List[int], fraction: float) -> Optional[float]:
+    """Latency at `fraction` of a histogram, interpolated within its bin"""
+    total = sum(bins)
+    if not total:
+        return None
+    rank = fraction * total
+    seen = 0
+    for i, count in enumerate(bins):
+        if count and seen + count >= rank:
+            lower = LATENCY_BOUNDS[i - 1] if i else 0.0
+            upper = LATENCY_BOUNDS[i] if i < len(LATENCY_BOUNDS) else LATENCY_BOUNDS[-1]
+            return round(lower + (upper - lower) * (rank - seen) / count, 4)
+        seen += count
+    return LATENCY_BOUNDS[-1]
+
+
+def _empty_counters() -> Dict:
+    return {"count": 0, "successes": 0, "duration_sum": 0.0, "latency": [0] * (len(LATENCY_BOUNDS) + 1)}
+
+
+def _merge(into: Dict, counters: Dict):
+    into["count"] += counters.get("count", 0)
+    into["successes"] += counters.get("successes", 0)
+    into["duration_sum"] += counters.get("duration_sum", 0.0)
+    latency = counters.get("latency", {})
+    for i in range(len(into["latency"])):
+        into["latency"][i] += latency[i] if isinstance(latency, list) else latency.get(f"b{i}", 0)
+
+
+def _describe(counters: Dict) -> Dict:
+    count = counters["count"]
+    return {
+        "count": count,
+        "successes": counters["successes"],
+        "failures": count - counters["successes"],
+        "success_rate": round(counters["successes"] / count, 4) if count else None,
+        "avg_seconds": round(counters["duration_sum"] / count, 4) if count else None,
+        "p50_seconds": estimate_percentile(counters["latency"], 0.5),
+        "p95_seconds": estimate_percentile(counters["latency"], 0.95),
+        "p99_seconds": estimate_percentile(counters["latency"], 0.99)
+    }
+
+
+class AnalyticsRollup:
+    """Hourly per-user, per-command run counts, success rates and latency histograms
+
+    record() is called for every command and automation sequence run and only
+    updates counters in memory. flush() writes them as $inc upserts into one
+    document per (hour, user, kind, name), so several workers can share the
+    collection without coordinating, and the write rate follows the number
+    of distinct keys per flush rather than the number of runs. summary()
+    reads and merges those buckets; raw history is never scanned.
+    """
+
+    def __init__(self, collection, retention_days: int = 365):
+        self.collection = collection
+        self.retention_days = retention_days
+        self._pending: Dict[tuple, Dict] = {}
+        self._lock = threading.Lock()
+        self._flush_thread = None
+
+    def ensure_indexes(self):
+        self.collection.create_index([("bucket", 1), ("user_id", 1), ("kind", 1), ("name", 1)], unique=True)
+        self.collection.create_index([("user_id", 1), ("bucket", -1)])
+        self.collection.create_index("bucket", name="bucket_ttl", expireAfterSeconds=self.retention_days * 86400)
+
+    def record(self, kind: str, user_id: str, name: str, success: bool, duration: float,
+               moment: Optional[datetime] = None):
+        if kind not in KINDS:
+            raise ValueError(f"Analytics kind must be one of {KINDS}")
+        key = (hour_bucket(moment or datetime.now()), user_id, kind, name[:MAX_NAME_LENGTH])
+        with self._lock:
+            counters = self._pending.setdefault(key, _empty_counters())
+            counters["count"] += 1
+            counters["successes"] += 1 if success else 0
+            counters["duration_sum"] += duration
+            counters["latency"][latency_bin(duration)] += 1
+
+    def flush(self) -> int:
+        """Write pending counters to the collection; returns buckets written"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        written = 0
+        try:
+            for key, counters in list(pending.items()):
+                bucket, user_id, kind, name = key
+                increments = {
+                    "count": counters["count"],
+                    "successes": counters["successes"],
+                    "duration_sum": counters["duration_sum"]
+                }
+                increments.update({f"latency.b{i}": n for i, n in enumerate(counters["latency"]) if n})
+                self.collection.update_one(
+                    {"bucket": bucket, "user_id": user_id, "kind": kind, "name": name},
+                    {"$inc": increments},
+                    upsert=True
+                )
+                del pending[key]
+                written += 1
+        finally:
+            if pending:
+                # Keep what could not be written for the next flush
+                with self._lock:
+                    for key, counters in pending.items():
+                        _merge(self._pending.setdefault(key, _empty_counters()), counters)
+        return written
+
+    def summary(self, user_id: Optional[str] = None, since: Optional[datetime] = None,
+                until: Optional[datetime] = None, kind: Optional[str] = None,
+                granularity: str = "hour", top: int = 10) -> Dict:
+        """Totals, a per-bucket timeline and the busiest commands over [since, until)
+
+        Defaults to the last 24 hours across all users. Counters not yet
+        flushed by this process are included, so its own runs show up at once.
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Granularity must be one of {GRANULARITIES}")
+        if kind is not None and kind not in KINDS:
+            raise ValueError(f"Analytics kind must be one of {KINDS}")
+        until = local_time(until) if until else datetime.now()
+        since = local_time(since) if since else until - timedelta(days=1)
+        query = {"bucket": {"$gte": hour_bucket(since), "$lt": until}}
+        if user_id is not None:
+            query["user_id"] = user_id
+        if kind is not None:
+            query["kind"] = kind
+
+        rows = [(doc["bucket"], doc["user_id"], doc["kind"], doc["name"], doc)
+                for doc in self.collection.find(query, {"_id": 0})]
+        with self._lock:
+            rows.extend((bucket, row_user, row_kind, name, dict(counters, latency=list(counters["latency"])))
+                        for (bucket, row_user, row_kind, name), counters in self._pending.items()
+                        if hour_bucket(since) <= bucket < until
+                        and (user_id is None or row_user == user_id) and (kind is None or row_kind == kind))
+
+        totals, timeline, names, users = _empty_counters(), {}, {}, {}
+        for bucket, row_user, row_kind, name, counters in rows:
+            if granularity == "day":
+                bucket = bucket.replace(hour=0)
+            _merge(totals, counters)
+            _merge(timeline.setdefault(bucket, _empty_counters()), counters)
+            _merge(names.setdefault((row_kind, name), _empty_counters()), counters)
+            _merge(users.setdefault(row_user, _empty_counters()), counters)
+
+        busiest = sorted(names.items(), key=lambda item: item[1]["count"], reverse=True)[:top]
+        return {
+            "since": since.isoformat(),
+            "until": until.isoformat(),
+            "granularity": granularity,
+            "totals": _describe(totals),
+            "timeline": [{"bucket": bucket.isoformat(), **_describe(counters)}
+                         for bucket, counters in sorted(timeline.items())],
+            "top": [{"kind": row_kind, "name": name, **_describe(counters)}
+                    for (row_kind, name), counters in busiest],
+            "users": {row_user: _describe(counters) for row_user, counters in users.items()}
+        }
+
+    def start_flushing(self, interval: float = 10.0, on_flush=None):
+        """flush() every `interval` seconds on a background thread, then call on_flush()"""
+        if self._flush_thread is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.flush()
+                    if on_flush is not None:
+                        on_flush()
+                except Exception as e:
+                    logger.error(f"Analytics flush failed: {e}")
+
+        self._flush_thread = threading.Thread(target=run, daemon=True)
+        self._flush_thread.start()
@@ -5,33 +5,41 @@ import base64
 import subprocess
 import threading
 import logging
+import platform
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
-import tempfile
 from pathlib import Path
 
-# GUI Automation imports
-import pyautogui
-import cv2
-import numpy as np
-from PIL import Image, ImageDraw, ImageFont
-import pytesseract
-import psutil
-import pygetwindow as gw
+from gestures import build_gesture_path, path_out_of_bounds, DEFAULT_SAMPLE_RATE
+from window_inventory import WindowInventory, window_region
+from wake_word import WakeWordEngine, SphinxKeywordSpotter
+from event_bus import event_bus, HotkeyPressed, WakeWordDetected, WindowsChanged
+from lazy_modules import LazyModule, capability_status
 
-# Input simulation
-import keyboard
-import mouse
-from pynput import keyboard as pynput_keyboard
-from pynput import mouse as pynput_mouse
 
-# Speech recognition for wake word
-import speech_recognition as sr
-from pydub import AudioSegment
+def _configure_pyautogui(module):
+    module.FAILSAFE = True
+    module.PAUSE = 0.1
 
-# Configure pyautogui
-pyautogui.FAILSAFE = True
-pyautogui.PAUSE = 0.1
+# Heavy GUI, vision and audio dependencies load on first use
+pyautogui = LazyModule("pyautogui", on_load=_configure_pyautogui)
+cv2 = LazyModule("cv2")
+np = LazyModule("numpy")
+pytesseract = LazyModule("pytesseract")
+gw = LazyModule("pygetwindow")
+keyboard = LazyModule("keyboard")
+sr = LazyModule("speech_recognition")
+
+# Modules each automation capability needs
+CAPABILITIES = {
+    "capture": [pyautogui],
+    "matching": [pyautogui, cv2, np],
+    "ocr": [pyautogui, pytesseract, np],
+    "input": [pyautogui],
+    "windows": [gw],
+    "hotkeys": [keyboard],
+    "audio": [sr],
+}
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -48,19 +56,61 @@ class ScreenAutomation:
         self.last_screenshot = None
         self.wake_word_active = False
         self.hotkey_listeners = []
+        self.wake_word_engine = None
+        self.wake_word_action = ""
+        self.wake_word = None
+        self._screen_size = None
         
-        # Initialize wake word detection
-        self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
-        
-        # Screen dimensions
-        self.screen_width, self.screen_height = pyautogui.size()
+        # Window inventory, populated on first lookup and refreshed in the background;
+        # its diffs go out on the event bus and feed the dashboard's windows section
+        self.window_inventory = WindowInventory(self._enumerate_windows)
+        self.window_inventory.subscribe(lambda diff: event_bus.publish(WindowsChanged(**diff)))
         
-        logger.info(f"Screen Automation initialized - Screen size: {self.screen_width}x{self.screen_height}")
+        logger.info("Screen Automation initialized - capabilities load on first use")
+    
+    def _get_screen_size(self):
+        if self._screen_size is None:
+            try:
+                self._screen_size = tuple(pyautogui.size())
+                logger.info(f"Screen size: {self._screen_size[0]}x{self._screen_size[1]}")
+            except Exception as e:
+                logger.error(f"Screen size unavailable: {e}")
+                return (None, None)
+        return self._screen_size
+    
+    @property
+    def screen_width(self):
+        return self._get_screen_size()[0]
     
-    def take_screenshot(self, region=None, filename=None) -> Dict:
-        """Take a screenshot of the screen or specific region"""
+    @property
+    def screen_height(self):
+        return self._get_screen_size()[1]
+    
+    def capabilities(self) -> Dict:
+        """Per-capability availability; reading it does not import anything"""
+        return {name: capability_status(modules) for name, modules in CAPABILITIES.items()}
+    
+    def capability_ready(self, name: str) -> bool:
+        """Import everything capability `name` needs; False if any of it fails to load"""
+        return all(module.probe() for module in CAPABILITIES[name])
+    
+    def _resolve_scope(self, window_title=None, region=None):
+        """Turn an optional window scope into a screen region
+
+        With window_title set, region is relative to that window. Returns the
+        screen-space region to capture (or None for the full screen).
+        """
+        if not window_title:
+            return region
+        info = self.window_inventory.resolve(window_title)
+        if info is None:
+            raise ValueError(f"Window with title '{window_title}' not found")
+        return window_region(info, region, self.screen_width, self.screen_height)
+    
+    def take_screenshot(self, region=None, filename=None, window_title=None) -> Dict:
+        """Take a screenshot of the screen, a specific region or a window"""
         try:
+            region = self._resolve_scope(window_title, region)
             if region:
                 screenshot = pyautogui.screenshot(region=region)
             else:
@@ -88,6 +138,7 @@ class ScreenAutomation:
                 "filename": filename,
                 "image_base64": img_base64,
                 "size": screenshot.size,
+                "region": list(region) if region else None,
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -99,11 +150,13 @@ class ScreenAutomation:
                 "timestamp": datetime.now().isoformat()
             }
     
-    def locate_on_screen(self, template_image, confidence=0.8, region=None) -> Dict:
+    def locate_on_screen(self, template_image, confidence=0.8, region=None, window_title=None) -> Dict:
         """Find template image on screen using image recognition"""
         try:
-            # Take screenshot
+            # Take screenshot of the search area only
+            region = self._resolve_scope(window_title, region)
             screenshot = pyautogui.screenshot(region=region)
+            offset_x, offset_y = (region[0], region[1]) if region else (0, 0)
             
             # Convert to OpenCV format
             screenshot_cv = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
@@ -120,9 +173,10 @@ class ScreenAutomation:
             
             matches = []
             for pt in zip(*locations[::-1]):
+                # Translate back from capture coordinates to screen space
                 matches.append({
-                    "x": int(pt[0]),
-                    "y": int(pt[1]),
+                    "x": int(pt[0]) + offset_x,
+                    "y": int(pt[1]) + offset_y,
                     "width": template_cv.shape[1],
                     "height": template_cv.shape[0],
                     "confidence": float(result[pt[1], pt[0]])
@@ -178,11 +232,11 @@ class ScreenAutomation:
                 "timestamp": datetime.now().isoformat()
             }
     
-    def click_on_image(self, template_image, confidence=0.8, double_click=False) -> Dict:
+    def click_on_image(self, template_image, confidence=0.8, double_click=False, window_title=None) -> Dict:
         """Click on first occurrence of template image"""
         try:
             # Find the image on screen
-            locate_result = self.locate_on_screen(template_image, confidence)
+            locate_result = self.locate_on_screen(template_image, confidence, window_title=window_title)
             
             if not locate_result["success"]:
                 return locate_result
@@ -229,6 +283,109 @@ class ScreenAutomation:
                 "timestamp": datetime.now().isoformat()
             }
     
+    def bulk_input(self, items, use_clipboard=True, min_interval=0.0) -> Dict:
+        """Inject a whole buffer of text and key chords in one call
+
+        Each item is either a string / {"text": ...} to type or {"key": "ctrl+s"}
+        to press. Text is pasted through the clipboard when allowed, otherwise
+        written as one batched event stream; min_interval > 0 falls back to
+        per-character typing for apps that drop fast input. An item that
+        fails is reported in failed_items and the rest are still sent; the
+        pyautogui fail-safe aborts the whole buffer. typewrite has no keys for
+        non-ASCII text, so that text is pasted even when typing, and fails
+        when the clipboard isn't allowed. The clipboard is always restored.
+        """
+        try:
+            start_time = time.perf_counter()
+            character_count = 0
+            key_count = 0
+            method = "typewrite"
+            paste_modifier = 'command' if platform.system() == 'Darwin' else 'ctrl'
+            
+            clipboard = None
+            previous_clipboard = None
+            clipboard_tried = False
+            
+            def open_clipboard():
+                nonlocal clipboard, previous_clipboard, clipboard_tried
+                if not clipboard_tried:
+                    clipboard_tried = True
+                    try:
+                        import pyperclip
+                        previous_clipboard = pyperclip.paste()
+                        clipboard = pyperclip
+                    except Exception as e:
+                        logger.warning(f"Clipboard unavailable, falling back to typing: {e}")
+                return clipboard
+            
+            if use_clipboard and min_interval <= 0 and open_clipboard() is not None:
+                method = "clipboard"
+            
+            failed_items = []
+            try:
+                for index, item in enumerate(items):
+                    if isinstance(item, str):
+                        item = {"text": item}
+                    
+                    try:
+                        if not isinstance(item, dict) or not (item.get('text') or item.get('key')):
+                            raise ValueError("Item needs 'text' or 'key'")
+                        if item.get('text'):
+                            text = item['text']
+                            paste = method == "clipboard" or (not text.isascii() and use_clipboard
+                                                              and open_clipboard() is not None)
+                            if paste:
+                                clipboard.copy(text)
+                                pyautogui.hotkey(paste_modifier, 'v', _pause=False)
+                            elif not text.isascii():
+                                # typewrite would silently skip these characters
+                                raise ValueError("Non-ASCII text can't be typed without the clipboard")
+                            else:
+                                pyautogui.typewrite(text, interval=min_interval, _pause=False)
+                            character_count += len(text)
+                        else:
+                            keys = item['key'].split('+')
+                            if len(keys) > 1:
+                                pyautogui.hotkey(*keys, _pause=False)
+                            else:
+                                pyautogui.press(keys[0], _pause=False)
+                            key_count += 1
+                    except Exception as e:
+                        if isinstance(e, pyautogui.FailSafeException):
+                            raise
+                        logger.warning(f"Bulk input item {index} failed: {e}")
+                        failed_items.append({"index": index, "error": str(e)})
+                    
+                    if min_interval > 0:
+                        time.sleep(min_interval)
+            finally:
+                if clipboard is not None:
+                    # Let the target app consume the last paste before restoring
+                    time.sleep(0.05)
+                    clipboard.copy(previous_clipboard or "")
+            
+            duration = time.perf_counter() - start_time
+            
+            return {
+                "success": not failed_items,
+                "method": method,
+                "item_count": len(items),
+                "character_count": character_count,
+                "key_count": key_count,
+                "failed_items": failed_items,
+                "duration": round(duration, 4),
+                "chars_per_second": round(character_count / duration, 1) if duration > 0 else None,
+                "timestamp": datetime.now().isoformat()
+            }
+            
+        except Exception as e:
+            logger.error(f"Bulk input failed: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "timestamp": datetime.now().isoformat()
+            }
+    
     def press_key(self, key_combination) -> Dict:
         """Press key or key combination"""
         try:
@@ -295,31 +452,72 @@ class ScreenAutomation:
     
     def drag_and_drop(self, start_x, start_y, end_x, end_y, duration=0.5) -> Dict:
         """Drag from start position to end position"""
+        result = self.perform_gesture(
+            [{"x": start_x, "y": start_y}, {"x": end_x, "y": end_y}],
+            duration=duration
+        )
+        if result["success"]:
+            result.update({
+                "start_position": {"x": start_x, "y": start_y},
+                "end_position": {"x": end_x, "y": end_y}
+            })
+        return result
+    
+    def perform_gesture(self, points, path_type='polyline', duration=0.5,
+                        sample_rate=DEFAULT_SAMPLE_RATE, fast=False, button='left') -> Dict:
+        """Press, move along a polyline/bezier path and release the mouse button"""
         try:
-            pyautogui.drag(end_x - start_x, end_y - start_y, duration=duration, 
-                          button='left', mouseDownUp=False)
+            path = build_gesture_path(points, path_type, duration, sample_rate, fast)
+            
+            outside = path_out_of_bounds(path, self.screen_width, self.screen_height)
+            if outside:
+                return {
+                    "success": False,
+                    "error": f"Gesture point ({outside['x']}, {outside['y']}) is outside screen bounds",
+                    "timestamp": datetime.now().isoformat()
+                }
+            
+            start = path[0]
+            pyautogui.moveTo(start["x"], start["y"], _pause=False)
+            pyautogui.mouseDown(button=button, _pause=False)
+            start_time = time.perf_counter()
+            try:
+                for point in path[1:]:
+                    # Sleep until the sample is due so the gesture keeps its timing
+                    delay = point["t"] - (time.perf_counter() - start_time)
+                    if delay > 0:
+                        time.sleep(delay)
+                    pyautogui.moveTo(point["x"], point["y"], _pause=False)
+            finally:
+                pyautogui.mouseUp(button=button, _pause=False)
             
             return {
                 "success": True,
-                "start_position": {"x": start_x, "y": start_y},
-                "end_position": {"x": end_x, "y": end_y},
-                "duration": duration,
+                "action": "gesture",
+                "path_type": path_type,
+                "button": button,
+                "point_count": len(path),
+                "start_position": {"x": start["x"], "y": start["y"]},
+                "end_position": {"x": path[-1]["x"], "y": path[-1]["y"]},
+                "duration": round(time.perf_counter() - start_time, 4),
                 "timestamp": datetime.now().isoformat()
             }
             
         except Exception as e:
-            logger.error(f"Drag and drop failed: {e}")
+            logger.error(f"Gesture failed: {e}")
             return {
                 "success": False,
                 "error": str(e),
                 "timestamp": datetime.now().isoformat()
             }
     
-    def read_text_from_screen(self, region=None, lang='eng') -> Dict:
+    def read_text_from_screen(self, region=None, lang='eng', window_title=None) -> Dict:
         """Extract text from screen using OCR"""
         try:
-            # Take screenshot
+            # Take screenshot of the OCR area only
+            region = self._resolve_scope(window_title, region)
             screenshot = pyautogui.screenshot(region=region)
+            offset_x, offset_y = (region[0], region[1]) if region else (0, 0)
             
             # Convert to format suitable for OCR
             screenshot_np = np.array(screenshot)
@@ -337,8 +535,8 @@ class ScreenAutomation:
                         "text": data['text'][i],
                         "confidence": int(data['conf'][i]),
                         "bbox": {
-                            "x": int(data['left'][i]),
-                            "y": int(data['top'][i]),
+                            "x": int(data['left'][i]) + offset_x,
+                            "y": int(data['top'][i]) + offset_y,
                             "width": int(data['width'][i]),
                             "height": int(data['height'][i])
                         }
@@ -349,6 +547,7 @@ class ScreenAutomation:
                 "text": text.strip(),
                 "words": words,
                 "word_count": len(words),
+                "region": list(region) if region else None,
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -360,30 +559,36 @@ class ScreenAutomation:
                 "timestamp": datetime.now().isoformat()
             }
     
+    def _enumerate_windows(self) -> List:
+        """Enumerate OS windows as (window_info, handle) pairs for the inventory"""
+        windows = []
+        for window in gw.getAllWindows():
+            if window.title:  # Only include windows with titles
+                windows.append(({
+                    "title": window.title,
+                    "pid": window._hWnd if hasattr(window, '_hWnd') else None,
+                    "position": {
+                        "x": window.left,
+                        "y": window.top,
+                        "width": window.width,
+                        "height": window.height
+                    },
+                    "is_active": window.isActive,
+                    "is_maximized": window.isMaximized,
+                    "is_minimized": window.isMinimized
+                }, window))
+        return windows
+    
     def get_window_list(self) -> Dict:
         """Get list of all open windows"""
         try:
-            windows = []
-            for window in gw.getAllWindows():
-                if window.title:  # Only include windows with titles
-                    windows.append({
-                        "title": window.title,
-                        "pid": window._hWnd if hasattr(window, '_hWnd') else None,
-                        "position": {
-                            "x": window.left,
-                            "y": window.top,
-                            "width": window.width,
-                            "height": window.height
-                        },
-                        "is_active": window.isActive,
-                        "is_maximized": window.isMaximized,
-                        "is_minimized": window.isMinimized
-                    })
+            windows = self.window_inventory.windows()
             
             return {
                 "success": True,
                 "windows": windows,
                 "window_count": len(windows),
+                "refreshed_at": datetime.fromtimestamp(self.window_inventory.last_refresh).isoformat(),
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -395,19 +600,42 @@ class ScreenAutomation:
                 "timestamp": datetime.now().isoformat()
             }
     
+    def find_windows(self, query, match='exact', limit=10) -> Dict:
+        """Look up windows by title from the inventory index"""
+        try:
+            windows = self.window_inventory.find(query, match, limit)
+            
+            return {
+                "success": True,
+                "query": query,
+                "match": match,
+                "windows": windows,
+                "window_count": len(windows),
+                "timestamp": datetime.now().isoformat()
+            }
+            
+        except Exception as e:
+            logger.error(f"Find windows failed: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "timestamp": datetime.now().isoformat()
+            }
+    
     def activate_window(self, window_title) -> Dict:
         """Activate window by title"""
         try:
-            windows = gw.getWindowsWithTitle(window_title)
-            if not windows:
+            info = self.window_inventory.resolve(window_title)
+            window = self.window_inventory.get_handle(info) if info else None
+            if window is None:
                 return {
                     "success": False,
                     "error": f"Window with title '{window_title}' not found",
                     "timestamp": datetime.now().isoformat()
                 }
             
-            window = windows[0]
             window.activate()
+            self.window_inventory.invalidate()
             
             return {
                 "success": True,
@@ -423,13 +651,13 @@ class ScreenAutomation:
                 "timestamp": datetime.now().isoformat()
             }
     
-    def wait_for_image(self, template_image, timeout=10, confidence=0.8) -> Dict:
+    def wait_for_image(self, template_image, timeout=10, confidence=0.8, window_title=None) -> Dict:
         """Wait for image to appear on screen"""
         try:
             start_time = time.time()
             
             while time.time() - start_time < timeout:
-                locate_result = self.locate_on_screen(template_image, confidence)
+                locate_result = self.locate_on_screen(template_image, confidence, window_title=window_title)
                 
                 if locate_result["success"] and locate_result["matches"]:
                     return {
@@ -456,35 +684,56 @@ class ScreenAutomation:
                 "timestamp": datetime.now().isoformat()
             }
     
-    def start_wake_word_detection(self, wake_word="shayak") -> Dict:
-        """Start wake word detection in background"""
+    def start_wake_word_detection(self, wake_word="shayak", action=None) -> Dict:
+        """Start wake word detection in background
+
+        Microphone audio flows through a WakeWordEngine: a ring buffer and an
+        energy gate, with the local keyword spotter only run on speech segments.
+        Detections are published with `action`, the template/sequence bound to them.
+        While already listening only the action is updated; the response names
+        the word actually being listened for (stop first to change it).
+        """
         try:
+            self.wake_word_action = action or ""
+            if self.wake_word_active:
+                response = {
+                    "success": True,
+                    "wake_word": self.wake_word,
+                    "status": "already_listening",
+                    "timestamp": datetime.now().isoformat()
+                }
+                if wake_word != self.wake_word:
+                    response["message"] = (f"Still listening for '{self.wake_word}'; "
+                                           "stop detection to change the wake word")
+                return response
+            
+            def on_detect(detection):
+                logger.info(f"Wake word '{wake_word}' detected (latency {detection['latency']}s)")
+                event_bus.publish(WakeWordDetected(wake_word=wake_word, latency=detection['latency'],
+                                                   action=self.wake_word_action))
+            
+            sample_rate = 16000
+            engine = self.wake_word_engine = WakeWordEngine(
+                SphinxKeywordSpotter(wake_word.lower(), sample_rate=sample_rate),
+                sample_rate=sample_rate,
+                on_detect=on_detect
+            )
+            
             def wake_word_listener():
-                self.wake_word_active = True
-                
-                with self.microphone as source:
-                    self.recognizer.adjust_for_ambient_noise(source)
-                
-                while self.wake_word_active:
-                    try:
-                        with self.microphone as source:
-                            audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=2)
-                        
-                        text = self.recognizer.recognize_google(audio).lower()
-                        
-                        if wake_word in text:
-                            logger.info(f"Wake word '{wake_word}' detected!")
-                            # Trigger wake word event (can be extended to call API)
-                            
-                    except sr.WaitTimeoutError:
-                        pass
-                    except sr.UnknownValueError:
-                        pass
-                    except sr.RequestError as e:
-                        logger.error(f"Wake word detection error: {e}")
-                        break
+                try:
+                    # 20 ms frames keep gate decisions fine-grained
+                    with sr.Microphone(sample_rate=sample_rate, chunk_size=sample_rate // 50) as source:
+                        while self.wake_word_active:
+                            frame = source.stream.read(source.CHUNK)
+                            engine.process_frame(frame)
+                except Exception as e:
+                    logger.error(f"Wake word detection error: {e}")
+                finally:
+                    self.wake_word_active = False
             
             # Start wake word detection in background thread
+            self.wake_word = wake_word
+            self.wake_word_active = True
             wake_thread = threading.Thread(target=wake_word_listener, daemon=True)
             wake_thread.start()
             
@@ -511,6 +760,7 @@ class ScreenAutomation:
             return {
                 "success": True,
                 "status": "stopped",
+                "stats": dict(self.wake_word_engine.stats) if self.wake_word_engine else None,
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -527,7 +777,7 @@ class ScreenAutomation:
         try:
             def hotkey_handler():
                 logger.info(f"Hotkey {key_combination} triggered")
-                # Execute action (can be extended)
+                event_bus.publish(HotkeyPressed(key_combination=key_combination, action=action))
                 
             keyboard.add_hotkey(key_combination, hotkey_handler)
             
@@ -565,8 +815,14 @@ class ScreenAutomation:
                     result = self.type_text(**action_params)
                 elif action_type == 'key':
                     result = self.press_key(**action_params)
+                elif action_type == 'bulk_input':
+                    result = self.bulk_input(**action_params)
                 elif action_type == 'scroll':
                     result = self.scroll(**action_params)
+                elif action_type == 'drag':
+                    result = self.drag_and_drop(**action_params)
+                elif action_type == 'gesture':
+                    result = self.perform_gesture(**action_params)
                 elif action_type == 'wait':
                     time.sleep(action_params.get('seconds', 1))
                     result = {"success": True, "action": "wait"}
@@ -0,0 +1,331 @@
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from capability_registry import CAPABILITY_MEMBERS, MEMBER_CAPABILITY
+from event_bus import Event, EventBus, event_bus, event_from_dict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = "/tmp/shayak-automation.sock"
+
+# Attributes read as values; every other exposed name is a method call
+REMOTE_ATTRIBUTES = {"screen_width", "screen_height", "wake_word_active", "last_screenshot"}
+
+# Members that only make sense in the daemon's own process
+LOCAL_MEMBERS = {"hotkey_listeners", "window_inventory", "wake_word_engine"}
+
+EXPOSED = (set(MEMBER_CAPABILITY) - LOCAL_MEMBERS) | {"capabilities", "backends"}
+
+# Calls that drive the mouse, keyboard or window focus run one at a time
+DEVICE_METHODS = set(CAPABILITY_MEMBERS["input"]) | {"click_on_image", "activate_window"}
+
+
+def _encode(message: Dict) -> bytes:
+    return (json.dumps(message, default=str) + "\n").encode()
+
+
+class AutomationDaemon:
+    """Single owner of the automation backend for a multi-worker deployment
+
+    HTTP workers talk to it over a Unix socket using newline-delimited JSON:
+    {"op": "call", "name", "args", "kwargs"} runs a method, {"op": "get",
+    "name"} reads an attribute, and {"op": "subscribe"} turns the connection
+    into a stream of bus events. Each event is flagged `dispatch` for exactly
+    one subscriber (round-robin), so a bound hotkey action runs once rather
+    than once per worker. {"op": "broadcast", "message"} relays a dashboard
+    state change from one worker to every subscriber, in one global order.
+    """
+
+    def __init__(self, automation, socket_path: str = DEFAULT_SOCKET_PATH, bus: EventBus = event_bus):
+        self.automation = automation
+        self.socket_path = socket_path
+        self.bus = bus
+        self._device_lock = threading.Lock()
+        self._subscribers = []
+        self._subscribers_lock = threading.Lock()
+        # Events and broadcasts are written from different threads; one line at a time per connection
+        self._send_lock = threading.Lock()
+        self._next_dispatcher = 0
+        self._server = None
+        self._unsubscribe = None
+        self.stats = {"calls": 0, "errors": 0, "events_forwarded": 0}
+
+    def handle(self, request: Dict) -> Dict:
+        """Execute one call/get request against the automation backend"""
+        op, name = request.get("op"), request.get("name")
+        if op == "broadcast":
+            self.broadcast(request.get("message"))
+            return {"ok": True, "result": None}
+        if name not in EXPOSED:
+            return {"ok": False, "error": f"'{name}' is not available over IPC"}
+        try:
+            if op == "get" and name in REMOTE_ATTRIBUTES:
+                return {"ok": True, "result": getattr(self.automation, name)}
+            if op != "call" or name in REMOTE_ATTRIBUTES:
+                return {"ok": False, "error": f"Unsupported {op} request for '{name}'"}
+
+            method = getattr(self.automation, name)
+            args, kwargs = request.get("args", []), request.get("kwargs", {})
+            if name in DEVICE_METHODS:
+                with self._device_lock:
+                    result = method(*args, **kwargs)
+            else:
+                result = method(*args, **kwargs)
+            self.stats["calls"] += 1
+            return {"ok": True, "result": result}
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Automation call {name} failed: {e}")
+            return {"ok": False, "error": str(e)}
+
+    def _make_handler(self):
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    if not line.endswith(b"\n"):
+                        # A worker died mid-send; never act on a truncated request
+                        return
+                    try:
+                        request = json.loads(line)
+                    except ValueError:
+                        self.wfile.write(_encode({"ok": False, "error": "Invalid JSON request"}))
+                        continue
+                    if request.get("op") == "subscribe":
+                        self.wfile.write(_encode({"ok": True}))
+                        daemon._add_subscriber(self.connection)
+                        try:
+                            # The connection now only carries events; hold it until the worker leaves
+                            self.rfile.read()
+                        finally:
+                            daemon._remove_subscriber(self.connection)
+                        return
+                    self.wfile.write(_encode(daemon.handle(request)))
+
+        return Handler
+
+    def _add_subscriber(self, connection):
+        with self._subscribers_lock:
+            self._subscribers.append(connection)
+
+    def _remove_subscriber(self, connection):
+        with self._subscribers_lock:
+            if connection in self._subscribers:
+                self._subscribers.remove(connection)
+
+    def _send(self, connection, message: Dict) -> bool:
+        try:
+            connection.sendall(_encode(message))
+            return True
+        except OSError as e:
+            logger.warning(f"Dropping event subscriber: {e}")
+            self._remove_subscriber(connection)
+            return False
+
+    def _forward(self, event: Event):
+        with self._subscribers_lock:
+            subscribers = list(self._subscribers)
+        if not subscribers:
+            return
+        start = self._next_dispatcher % len(subscribers)
+        self._next_dispatcher += 1
+        dispatched = False
+        payload = event.to_dict()
+        with self._send_lock:
+            for connection in subscribers[start:] + subscribers[:start]:
+                if self._send(connection, {"event": payload, "dispatch": not dispatched}):
+                    dispatched = True
+                    self.stats["events_forwarded"] += 1
+
+    def broadcast(self, message):
+        """Send a state change to every subscribed worker"""
+        with self._subscribers_lock:
+            subscribers = list(self._subscribers)
+        with self._send_lock:
+            for connection in subscribers:
+                self._send(connection, {"state": message})
+
+    def start(self):
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+                raise RuntimeError(f"An automation daemon is already listening on {self.socket_path}")
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Stale socket left by a previous run
+                os.unlink(self.socket_path)
+            finally:
+                probe.close()
+
+        self._server = socketserver.ThreadingUnixStreamServer(self.socket_path, self._make_handler())
+        self._server.daemon_threads = True
+        os.chmod(self.socket_path, 0o600)
+        self._unsubscribe = self.bus.subscribe(self._forward)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        logger.info(f"Automation daemon listening on {self.socket_path}")
+
+    def stop(self):
+        if self._unsubscribe:
+            self._unsubscribe()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        with self._subscribers_lock:
+            for connection in self._subscribers:
+                connection.close()
+            self._subscribers.clear()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class RemoteAutomation:
+    """Automation proxy for HTTP workers: every call runs in the daemon
+
+    Exposes the same methods and attributes as the in-process backends.
+    Each thread keeps its own connection. A connection the daemon closed
+    (e.g. it was restarted) is replaced before sending; a request is only
+    resent when sending it failed. Once a request may have reached the
+    daemon it is never retried, so a click or keystroke cannot run twice.
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH, timeout: float = 300.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._forwarder = None
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        return sock, sock.makefile("rb")
+
+    def _disconnect(self):
+        connection = getattr(self._local, "connection", None)
+        self._local.connection = None
+        if connection:
+            connection[1].close()
+            connection[0].close()
+
+    @staticmethod
+    def _closed_by_peer(sock) -> bool:
+        """True if the daemon has already closed this idle connection"""
+        timeout = sock.gettimeout()
+        try:
+            sock.setblocking(False)
+            return sock.recv(1, socket.MSG_PEEK) == b""
+        except BlockingIOError:
+            return False
+        except OSError:
+            return True
+        finally:
+            sock.settimeout(timeout)
+
+    def _request(self, message: Dict):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None and self._closed_by_peer(connection[0]):
+            self._disconnect()
+            connection = None
+        reused = connection is not None
+        data = _encode(message)
+        while True:
+            if getattr(self._local, "connection", None) is None:
+                self._local.connection = self._connect()
+            sock, reader = self._local.connection
+            try:
+                sock.sendall(data)
+                break
+            except OSError:
+                # Nothing (or only part of a line, which the daemon ignores) was delivered
+                self._disconnect()
+                if not reused:
+                    raise
+                reused = False
+
+        try:
+            line = reader.readline()
+        except OSError:
+            self._disconnect()
+            raise
+        if not line:
+            self._disconnect()
+            raise ConnectionError("Automation daemon closed the connection before replying")
+        response = json.loads(line)
+        if not response["ok"]:
+            raise RuntimeError(response["error"])
+        return response["result"]
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name in REMOTE_ATTRIBUTES:
+            return self._request({"op": "get", "name": name})
+
+        def call(*args, **kwargs):
+            return self._request({"op": "call", "name": name, "args": list(args), "kwargs": kwargs})
+        return call
+
+    def broadcast(self, message: Dict):
+        """Have the daemon relay a state change to every worker (this one included)"""
+        self._request({"op": "broadcast", "message": message})
+
+    def forward_events(self, bus: EventBus, on_dispatch: Optional[Callable[[Event], None]] = None,
+                       on_state: Optional[Callable[[Dict], None]] = None):
+        """Republish the daemon's events on this process's bus
+
+        on_dispatch runs only for the events this worker was picked to act on;
+        on_state receives every broadcast state change. The stream reconnects
+        on its own if the daemon restarts.
+        """
+        if self._forwarder is not None:
+            return
+
+        def run():
+            while True:
+                sock = None
+                try:
+                    sock, reader = self._connect()
+                    sock.settimeout(None)
+                    sock.sendall(_encode({"op": "subscribe"}))
+                    reader.readline()
+                    for line in reader:
+                        message = json.loads(line)
+                        if "state" in message:
+                            if on_state:
+                                on_state(message["state"])
+                            continue
+                        event = event_from_dict(message["event"])
+                        bus.publish(event)
+                        if message["dispatch"] and on_dispatch:
+                            on_dispatch(event)
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning(f"Event stream from automation daemon lost: {e}")
+                finally:
+                    if sock:
+                        sock.close()
+                time.sleep(1.0)
+
+        self._forwarder = threading.Thread(target=run, daemon=True)
+        self._forwarder.start()
+
+
+if __name__ == "__main__":
+    from capability_registry import create_automation
+
+    logging.basicConfig(level=logging.INFO)
+    daemon = AutomationDaemon(create_automation(), os.environ.get("AUTOMATION_SOCKET", DEFAULT_SOCKET_PATH))
+    daemon.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.stop()
@@ -0,0 +1,38 @@
+import asyncio
+import inspect
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Volatile keys are dropped from sections so the response's ETag only changes with the data
+VOLATILE_KEYS = ("timestamp", "refreshed_at")
+
+
+def select_sections(fields: Optional[str], available: List[str]) -> Tuple[List[str], List[str]]:
+    """(requested section names, unknown names) for a comma-separated `fields`; every section when empty"""
+    names = [field.strip() for field in fields.split(",") if field.strip()] if fields else []
+    if not names:
+        return list(available), []
+    return names, [name for name in names if name not in available]
+
+
+async def gather_sections(factories: Dict[str, Callable[[str], Awaitable[Dict]]], names: List[str],
+                          user_id: str) -> Dict[str, Dict]:
+    """Run the named section factories concurrently; results lose their volatile keys
+
+    Raises TypeError naming the section if a factory returns something that
+    can't be awaited, rather than failing inside asyncio.gather.
+    """
+    pending = []
+    for name in names:
+        section = factories[name](user_id)
+        if not inspect.isawaitable(section):
+            for started in pending:
+                if inspect.iscoroutine(started):
+                    started.close()
+            raise TypeError(f"Bootstrap section '{name}' did not return an awaitable")
+        pending.append(section)
+
+    results = await asyncio.gather(*pending)
+    return {
+        name: {key: value for key, value in result.items() if key not in VOLATILE_KEYS}
+        for name, result in zip(names, results)
+    }
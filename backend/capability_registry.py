@@ -0,0 +1,118 @@
+import logging
+import os
+import threading
+from typing import Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+BACKEND_CHOICES = ("auto", "real", "mock")
+
+# Automation methods and attributes served by each capability
+CAPABILITY_MEMBERS = {
+    "capture": ["take_screenshot", "screen_width", "screen_height", "last_screenshot"],
+    "matching": ["locate_on_screen", "click_on_image", "wait_for_image"],
+    "ocr": ["read_text_from_screen"],
+    "input": ["click_at_position", "type_text", "bulk_input", "press_key", "scroll",
+              "drag_and_drop", "perform_gesture", "execute_automation_sequence"],
+    "windows": ["get_window_list", "find_windows", "activate_window", "window_inventory"],
+    "hotkeys": ["setup_hotkey", "hotkey_listeners", "trigger_hotkey"],
+    "audio": ["start_wake_word_detection", "stop_wake_word_detection", "wake_word_active",
+              "wake_word_engine", "trigger_wake_word"],
+}
+
+MEMBER_CAPABILITY = {
+    member: capability
+    for capability, members in CAPABILITY_MEMBERS.items()
+    for member in members
+}
+
+
+def pins_from_env(environ: Mapping[str, str] = os.environ) -> Dict[str, str]:
+    """Backend choices from AUTOMATION_BACKEND (default for every capability)
+    and AUTOMATION_BACKEND_<CAPABILITY> (e.g. AUTOMATION_BACKEND_OCR=real)"""
+    default = environ.get("AUTOMATION_BACKEND", "auto").lower()
+    pins = {}
+    for capability in CAPABILITY_MEMBERS:
+        choice = environ.get(f"AUTOMATION_BACKEND_{capability.upper()}", default).lower()
+        if choice not in BACKEND_CHOICES:
+            raise ValueError(f"Invalid backend '{choice}' for {capability}; expected one of {BACKEND_CHOICES}")
+        pins[capability] = choice
+    return pins
+
+
+class CapabilityRegistry:
+    """Routes each automation capability to the real or the mock backend
+
+    A capability pinned to 'real' or 'mock' always uses that backend. With
+    'auto' the real backend is probed the first time the capability is used
+    (its dependencies are imported then) and the mock serves it only if that
+    fails, so a missing microphone no longer turns OCR into a fake.
+    """
+
+    def __init__(self, real, mock, pins: Optional[Dict[str, str]] = None):
+        self.real = real
+        self.mock = mock
+        self.pins = {capability: "auto" for capability in CAPABILITY_MEMBERS}
+        self.pins.update(pins or {})
+        self._resolved: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _resolve(self, capability: str) -> Dict:
+        resolved = self._resolved.get(capability)
+        if resolved is not None:
+            return resolved
+        with self._lock:
+            if capability not in self._resolved:
+                self._resolved[capability] = self._choose(capability)
+                logger.info(f"Automation capability '{capability}' served by "
+                            f"{self._resolved[capability]['backend']} backend")
+            return self._resolved[capability]
+
+    def _choose(self, capability: str) -> Dict:
+        pin = self.pins.get(capability, "auto")
+        if pin == "mock":
+            return {"backend": "mock", "source": "pinned", "reason": None}
+        if self.real is None:
+            error = "real automation backend failed to import"
+            if pin == "real":
+                logger.error(f"Capability '{capability}' is pinned to real but {error}")
+            return {"backend": "mock", "source": pin, "reason": error}
+        if pin == "real":
+            return {"backend": "real", "source": "pinned", "reason": None}
+        if self.real.capability_ready(capability):
+            return {"backend": "real", "source": "auto", "reason": None}
+        error = self.real.capabilities()[capability]["error"]
+        return {"backend": "mock", "source": "auto", "reason": error}
+
+    def backend_for(self, capability: str):
+        return self.real if self._resolve(capability)["backend"] == "real" else self.mock
+
+    def __getattr__(self, name):
+        capability = MEMBER_CAPABILITY.get(name)
+        if capability is not None:
+            return getattr(self.backend_for(capability), name)
+        # Shared helpers (screenshot dirs etc.) come from the real backend when there is one
+        return getattr(self.real if self.real is not None else self.mock, name)
+
+    def backends(self) -> Dict:
+        """Which backend serves each capability, resolving any not used yet"""
+        return {capability: dict(self._resolve(capability), pin=self.pins[capability])
+                for capability in CAPABILITY_MEMBERS}
+
+    def capabilities(self) -> Dict:
+        status = {}
+        for capability, backend in self.backends().items():
+            available = self.backend_for(capability).capabilities()[capability]
+            status[capability] = {**available, **backend}
+        return status
+
+
+def create_automation(pins: Optional[Dict[str, str]] = None) -> CapabilityRegistry:
+    """The in-process automation backend: real where possible, mock otherwise"""
+    from mock_automation import automation as mock_automation
+    try:
+        from automation import automation as real_automation
+    except Exception as e:
+        logger.warning(f"Real automation module unavailable: {e}")
+        real_automation = None
+    return CapabilityRegistry(real_automation, mock_automation, pins_from_env() if pins is None else pins)
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import queue
+import threading
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Event:
+    type = "event"
+    timestamp: str = field(default_factory=lambda: datetime.now().isoformat(), init=False)
+
+    def to_dict(self) -> Dict:
+        return {"type": self.type, **asdict(self)}
+
+
+@dataclass
+class WakeWordDetected(Event):
+    type = "wake_word"
+    wake_word: str = ""
+    latency: Optional[float] = None
+    action: str = ""
+
+
+@dataclass
+class HotkeyPressed(Event):
+    type = "hotkey"
+    key_combination: str = ""
+    action: str = ""
+
+
+@dataclass
+class SequenceCompleted(Event):
+    type = "sequence_completed"
+    name: str = ""
+    successful_actions: int = 0
+    total_actions: int = 0
+
+
+@dataclass
+class WindowsChanged(Event):
+    """A window inventory diff (see WindowInventory.subscribe)"""
+    type = "windows"
+    added: List[Dict] = field(default_factory=list)
+    removed: List[Dict] = field(default_factory=list)
+    changed: List[Dict] = field(default_factory=list)
+
+
+EVENT_TYPES = {cls.type: cls for cls in (WakeWordDetected, HotkeyPressed, SequenceCompleted, WindowsChanged)}
+
+
+def event_from_dict(data: Dict) -> Event:
+    """Rebuild an event from to_dict() output (e.g. one received from another process)"""
+    data = dict(data)
+    cls = EVENT_TYPES[data.pop("type")]
+    timestamp = data.pop("timestamp", None)
+    event = cls(**data)
+    if timestamp:
+        event.timestamp = timestamp
+    return event
+
+
+class EventBus:
+    """In-process publish/subscribe for automation events
+
+    publish() never blocks the caller (hotkey hooks, the wake word thread): the
+    event goes into a bounded queue and a single dispatcher thread delivers it
+    to subscribers. If the queue is full the event is dropped and counted.
+    """
+
+    def __init__(self, max_queue: int = 256):
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._subscribers: Dict[str, List[Callable[[Event], None]]] = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self.stats = {"published": 0, "delivered": 0, "dropped": 0}
+
+    def subscribe(self, callback: Callable[[Event], None], event_type: str = "*") -> Callable[[], None]:
+        """Call `callback` for each event of `event_type` ('*' for all); returns an unsubscribe function"""
+        with self._lock:
+            self._subscribers.setdefault(event_type, []).append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                callbacks = self._subscribers.get(event_type, [])
+                if callback in callbacks:
+                    callbacks.remove(callback)
+        return unsubscribe
+
+    def subscribe_async(self, loop: asyncio.AbstractEventLoop, max_queue: int = 100):
+        """An asyncio.Queue receiving every event as a dict, for streaming clients
+
+        Returns (queue, unsubscribe). A slow client loses its oldest events
+        instead of holding up the bus.
+        """
+        client_queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+
+        def deliver(event_dict):
+            if client_queue.full():
+                client_queue.get_nowait()
+            client_queue.put_nowait(event_dict)
+
+        def forward(event: Event):
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(deliver, event.to_dict())
+
+        return client_queue, self.subscribe(forward)
+
+    def publish(self, event: Event) -> bool:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.stats["dropped"] += 1
+            logger.warning(f"Event bus full, dropped {event.type} event")
+            return False
+        self.stats["published"] += 1
+        return True
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._dispatch_loop, daemon=True)
+                    self._thread.start()
+
+    def _dispatch_loop(self):
+        while True:
+            event = self._queue.get()
+            with self._lock:
+                callbacks = self._subscribers.get(event.type, []) + self._subscribers.get("*", [])
+            for callback in callbacks:
+                try:
+                    callback(event)
+                    self.stats["delivered"] += 1
+                except Exception as e:
+                    logger.error(f"Event subscriber failed for {event.type}: {e}")
+            self._queue.task_done()
+
+    def wait_idle(self):
+        """Block until every queued event has been dispatched"""
+        self._queue.join()
+
+
+# Process-wide bus shared by the automation backends and the server
+event_bus = EventBus()
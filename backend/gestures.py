@@ -0,0 +1,100 @@
+import math
+from typing import Dict, List, Tuple
+
+# Gesture path engine: turns polyline / bezier descriptions into timed samples
+
+PATH_TYPES = ('polyline', 'bezier')
+DEFAULT_SAMPLE_RATE = 60  # samples per second
+FAST_BEZIER_SAMPLES = 8
+
+
+def normalize_points(points) -> List[Tuple[float, float]]:
+    """Accept [{"x": .., "y": ..}] or [[x, y]] and return a list of (x, y) tuples"""
+    normalized = []
+    for point in points:
+        if isinstance(point, dict):
+            normalized.append((float(point['x']), float(point['y'])))
+        else:
+            x, y = point
+            normalized.append((float(x), float(y)))
+    return normalized
+
+
+def _bezier_point(control_points, t) -> Tuple[float, float]:
+    """Evaluate a bezier curve of any degree at t using de Casteljau's algorithm"""
+    points = list(control_points)
+    while len(points) > 1:
+        points = [
+            (p0[0] + (p1[0] - p0[0]) * t, p0[1] + (p1[1] - p0[1]) * t)
+            for p0, p1 in zip(points, points[1:])
+        ]
+    return points[0]
+
+
+def _polyline_point(points, cumulative, total_length, t) -> Tuple[float, float]:
+    """Point at fraction t of the polyline's arc length"""
+    if total_length == 0:
+        return points[0]
+
+    distance = t * total_length
+    for i in range(1, len(points)):
+        if distance <= cumulative[i] or i == len(points) - 1:
+            segment = cumulative[i] - cumulative[i - 1]
+            ratio = (distance - cumulative[i - 1]) / segment if segment else 0.0
+            (x0, y0), (x1, y1) = points[i - 1], points[i]
+            return (x0 + (x1 - x0) * ratio, y0 + (y1 - y0) * ratio)
+    return points[-1]
+
+
+def build_gesture_path(points, path_type='polyline', duration=0.5,
+                       sample_rate=DEFAULT_SAMPLE_RATE, fast=False) -> List[Dict]:
+    """Interpolate a gesture into timed samples [{"x", "y", "t"}]
+
+    Polylines are sampled uniformly along their arc length, bezier paths treat
+    the points as control points. Fast mode skips interpolation: polylines only
+    visit their vertices and beziers use a handful of samples.
+    """
+    if path_type not in PATH_TYPES:
+        raise ValueError(f"Invalid path type: {path_type}")
+
+    points = normalize_points(points)
+    if len(points) < 2:
+        raise ValueError("A gesture path needs at least two points")
+
+    if fast and path_type == 'polyline':
+        samples = points
+    else:
+        if fast:
+            sample_count = FAST_BEZIER_SAMPLES
+        else:
+            sample_count = max(2, int(math.ceil(duration * sample_rate)) + 1)
+
+        if path_type == 'bezier':
+            samples = [_bezier_point(points, i / (sample_count - 1)) for i in range(sample_count)]
+        else:
+            cumulative = [0.0]
+            for (x0, y0), (x1, y1) in zip(points, points[1:]):
+                cumulative.append(cumulative[-1] + math.hypot(x1 - x0, y1 - y0))
+            total_length = cumulative[-1]
+            samples = [
+                _polyline_point(points, cumulative, total_length, i / (sample_count - 1))
+                for i in range(sample_count)
+            ]
+
+    step = duration / (len(samples) - 1)
+    path = []
+    for i, (x, y) in enumerate(samples):
+        point = {"x": int(round(x)), "y": int(round(y)), "t": round(i * step, 4)}
+        # Rounding can produce repeated pixels; they add events without moving
+        if path and point["x"] == path[-1]["x"] and point["y"] == path[-1]["y"] and i < len(samples) - 1:
+            continue
+        path.append(point)
+    return path
+
+
+def path_out_of_bounds(path, screen_width, screen_height):
+    """Return the first sample outside the screen, or None"""
+    for point in path:
+        if not (0 <= point["x"] <= screen_width and 0 <= point["y"] <= screen_height):
+            return point
+    return None
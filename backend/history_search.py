@@ -0,0 +1,192 @@
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+SEARCH_MODES = ("mongo", "local")
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9_\-]*")
+
+# Fields kept in search results; output text stays in history/blob storage
+RESULT_FIELDS = ("id", "kind", "user_id", "command", "natural_language", "interpreted_command",
+                 "success", "method", "return_code", "output_id", "timestamp")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+def search_terms(text: str, limit: int = 200) -> str:
+    """Distinct tokens of `text` in first-seen order, capped at `limit`
+
+    Stored on history rows so outputs kept outside the row (dedup storage)
+    are still covered by the text index, at a fraction of their size.
+    """
+    terms = OrderedDict()
+    for token in tokenize(text):
+        terms.setdefault(token, None)
+        if len(terms) >= limit:
+            break
+    return " ".join(terms)
+
+
+def _document_text(doc: Dict) -> str:
+    return " ".join(doc.get(name) or "" for name in
+                    ("command", "natural_language", "interpreted_command", "output_terms", "output"))
+
+
+def _summary(doc: Dict, kind: str) -> Dict:
+    summary = {name: doc[name] for name in RESULT_FIELDS if doc.get(name) is not None}
+    summary["kind"] = kind
+    return summary
+
+
+def _matches_filters(doc: Dict, user_id: str, since: Optional[str], until: Optional[str],
+                     success: Optional[bool]) -> bool:
+    if doc.get("user_id") != user_id:
+        return False
+    if since and doc.get("timestamp", "") < since:
+        return False
+    if until and doc.get("timestamp", "") > until:
+        return False
+    return success is None or doc.get("success") == success
+
+
+class InvertedIndex:
+    """In-memory token -> document index over the most recent `max_docs` rows
+
+    A query intersects the posting sets of its tokens, smallest first, so
+    its cost follows the rarest term rather than the number of documents.
+    The oldest rows are evicted once the index is full.
+    """
+
+    def __init__(self, max_docs: int = 200000):
+        self.max_docs = max_docs
+        self._postings: Dict[str, Set[str]] = {}
+        self._docs: "OrderedDict[str, Dict]" = OrderedDict()
+        self._tokens: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, doc: Dict, kind: str):
+        key = f"{kind}:{doc['id']}"
+        tokens = set(tokenize(_document_text(doc)))
+        with self._lock:
+            if key in self._docs:
+                self._remove(key)
+            self._docs[key] = _summary(doc, kind)
+            self._tokens[key] = tokens
+            for token in tokens:
+                self._postings.setdefault(token, set()).add(key)
+            while len(self._docs) > self.max_docs:
+                self._remove(next(iter(self._docs)))
+
+    def _remove(self, key: str):
+        del self._docs[key]
+        for token in self._tokens.pop(key):
+            postings = self._postings[token]
+            postings.discard(key)
+            if not postings:
+                del self._postings[token]
+
+    def search(self, query: str, user_id: str, since: Optional[str] = None, until: Optional[str] = None,
+               success: Optional[bool] = None, kinds: Iterable[str] = ("command", "interpretation"),
+               limit: int = 50) -> List[Dict]:
+        tokens = set(tokenize(query))
+        if not tokens:
+            return []
+        kinds = set(kinds)
+        with self._lock:
+            postings = sorted((self._postings.get(token, set()) for token in tokens), key=len)
+            keys = set(postings[0])
+            for posting in postings[1:]:
+                keys &= posting
+                if not keys:
+                    break
+            hits = [self._docs[key] for key in keys]
+        hits = [dict(doc) for doc in hits
+                if doc["kind"] in kinds and _matches_filters(doc, user_id, since, until, success)]
+        hits.sort(key=lambda doc: doc.get("timestamp", ""), reverse=True)
+        return hits[:limit]
+
+
+class HistorySearch:
+    """Full-text search over executed commands and interpreted voice/text requests
+
+    'mongo' mode uses text indexes on the history collections. They are
+    compound indexes with user_id as an equality prefix, so a query only
+    touches that user's entries. 'local' mode keeps an InvertedIndex, seeded
+    from recent history at startup and fed on every insert, for deployments
+    without usable MongoDB text search.
+
+    Both modes match entries containing every term of the query. MongoDB
+    matches each term as a case-insensitive phrase (so 'up' also finds
+    'uptime'), while the local index matches whole tokens only.
+    """
+
+    def __init__(self, commands, interpretations, mode: str = "mongo", max_local_docs: int = 200000):
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"History search mode must be one of {SEARCH_MODES}")
+        self.collections = {"command": commands, "interpretation": interpretations}
+        self.mode = mode
+        self.local_index = InvertedIndex(max_local_docs) if mode == "local" else None
+
+    def ensure_indexes(self):
+        self.collections["command"].create_index(
+            [("user_id", 1), ("command", "text"), ("output_terms", "text"), ("output", "text")],
+            weights={"command": 10, "output_terms": 1, "output": 1},
+            name="history_text"
+        )
+        self.collections["interpretation"].create_index(
+            [("user_id", 1), ("natural_language", "text"), ("interpreted_command", "text")],
+            weights={"natural_language": 5, "interpreted_command": 10},
+            name="interpretation_text"
+        )
+
+    def load_local_index(self):
+        """Seed the local index with the most recent rows across both collections"""
+        if self.local_index is None:
+            return
+        rows = []
+        for kind, collection in self.collections.items():
+            cursor = collection.find({}, {"_id": 0}).sort("timestamp", -1).limit(self.local_index.max_docs)
+            rows.extend((doc.get("timestamp", ""), kind, doc) for doc in cursor)
+        # Oldest first: the index evicts in insertion order, so the newest rows must go in last
+        rows.sort(key=lambda row: row[0])
+        for _, kind, doc in rows:
+            self.local_index.add(doc, kind)
+        logger.info(f"History search index loaded with {len(self.local_index)} entries")
+
+    def index(self, doc: Dict, kind: str):
+        """Called for every stored row; only the local index needs feeding"""
+        if self.local_index is not None:
+            self.local_index.add(doc, kind)
+
+    def search(self, query: str, user_id: str, since: Optional[str] = None, until: Optional[str] = None,
+               success: Optional[bool] = None, kinds: Iterable[str] = ("command", "interpretation"),
+               limit: int = 50) -> List[Dict]:
+        """Newest matching entries for user_id; since/until are ISO timestamps"""
+        if self.local_index is not None:
+            return self.local_index.search(query, user_id, since, until, success, kinds, limit)
+
+        terms = tokenize(query)
+        if not terms:
+            return []
+        # Quoted terms are ANDed by $text, like the local index; bare terms would be ORed
+        mongo_filter = {"$text": {"$search": " ".join(f'"{term}"' for term in terms)}, "user_id": user_id}
+        if since or until:
+            mongo_filter["timestamp"] = {key: value for key, value in (("$gte", since), ("$lte", until)) if value}
+        if success is not None:
+            mongo_filter["success"] = success
+
+        hits = []
+        for kind in kinds:
+            cursor = self.collections[kind].find(mongo_filter, {"_id": 0, "output": 0}).sort("timestamp", -1)
+            hits.extend(_summary(doc, kind) for doc in cursor.limit(limit))
+        hits.sort(key=lambda doc: doc.get("timestamp", ""), reverse=True)
+        return hits[:limit]
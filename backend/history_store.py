@@ -0,0 +1,240 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from history_search import search_terms
+
+logger = logging.getLogger(__name__)
+
+STORAGE_MODES = ("dedup", "full")
+
+# Result fields replaced by a blob reference in dedup mode
+TEXT_FIELDS = ("output", "error")
+
+
+def content_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def compress_text(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"), 6)
+
+
+def decompress_text(data: bytes) -> str:
+    return zlib.decompress(data).decode("utf-8")
+
+
+class HistoryStore:
+    """Command and batch history with content-addressed output storage
+
+    In 'dedup' mode each output/error text is stored once in the blobs
+    collection, compressed and keyed by its hash; history rows only keep the
+    hash. Running `uptime` every minute then adds a ~200 byte row per run
+    instead of another copy of the output. Blobs already written recently are
+    remembered in-process, so a repeated output costs no extra round trip.
+    Reads put the text back (hydrate) with one query per page of rows.
+
+    Rows get a `created_at` date for the TTL index (`retention_days`), and
+    rollup() folds rows older than `rollup_after_days` into per-day
+    aggregates before deleting them (one aggregate per day and rollup
+    window; sum them for a day's totals). 'full' mode stores rows as before.
+    """
+
+    def __init__(self, commands, batches, blobs, rollups, mode: str = "dedup",
+                 retention_days: int = 90, rollup_after_days: int = 30,
+                 known_blobs: int = 10000, blob_touch_interval: float = 3600.0):
+        if mode not in STORAGE_MODES:
+            raise ValueError(f"History storage mode must be one of {STORAGE_MODES}")
+        self.commands = commands
+        self.batches = batches
+        self.blobs = blobs
+        self.rollups = rollups
+        self.mode = mode
+        self.retention_days = retention_days
+        self.rollup_after_days = rollup_after_days
+        self.blob_touch_interval = blob_touch_interval
+        self._known_blobs: "OrderedDict[str, float]" = OrderedDict()
+        self._known_limit = known_blobs
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _ensure_ttl_index(collection, field: str, seconds: int):
+        try:
+            collection.create_index(field, expireAfterSeconds=seconds)
+        except Exception as e:
+            # IndexOptionsConflict: the index exists with another TTL, so change it in place
+            if getattr(e, "code", None) != 85:
+                raise
+            collection.database.command("collMod", collection.name,
+                                        index={"keyPattern": {field: 1}, "expireAfterSeconds": seconds})
+
+    def ensure_indexes(self):
+        retention = self.retention_days * 86400
+        for collection in (self.commands, self.batches):
+            collection.create_index([("user_id", 1), ("timestamp", -1)])
+            self._ensure_ttl_index(collection, "created_at", retention)
+        # A blob outlives every row that references it: last_seen is refreshed on
+        # reuse, but at most once per touch interval, so it can lag a new row by that much
+        self._ensure_ttl_index(self.blobs, "last_seen", retention + math.ceil(self.blob_touch_interval))
+        self.rollups.create_index([("user_id", 1), ("day", -1)])
+
+    def _store_blob(self, text: str) -> str:
+        digest = content_hash(text)
+        now = time.time()
+        with self._lock:
+            last_touch = self._known_blobs.get(digest)
+            if last_touch is not None and now - last_touch < self.blob_touch_interval:
+                self._known_blobs.move_to_end(digest)
+                return digest
+
+        self.blobs.update_one(
+            {"_id": digest},
+            {"$setOnInsert": {"data": compress_text(text), "size": len(text)},
+             "$set": {"last_seen": datetime.now()}},
+            upsert=True
+        )
+        with self._lock:
+            self._known_blobs[digest] = now
+            self._known_blobs.move_to_end(digest)
+            while len(self._known_blobs) > self._known_limit:
+                self._known_blobs.popitem(last=False)
+        return digest
+
+    def _compact(self, record: Dict) -> Dict:
+        """Copy of a result/row with text fields swapped for blob hashes"""
+        compact = dict(record)
+        for name in TEXT_FIELDS:
+            text = compact.pop(name, None)
+            if text:
+                compact[f"{name}_hash"] = self._store_blob(text)
+        return compact
+
+    def insert_command(self, doc: Dict):
+        if self.mode == "dedup":
+            row = self._compact(doc)
+            # Output text is no longer in the row, so keep its terms for search
+            row["output_terms"] = search_terms(doc.get("output", ""))
+        else:
+            row = dict(doc)
+        row["created_at"] = datetime.now()
+        self.commands.insert_one(row)
+
+    def insert_batch(self, doc: Dict):
+        row = dict(doc)
+        if self.mode == "dedup":
+            row["results"] = [self._compact(result) for result in doc.get("results", [])]
+        row["created_at"] = datetime.now()
+        self.batches.insert_one(row)
+
+    def _load_blobs(self, hashes: Iterable[str]) -> Dict[str, str]:
+        hashes = list(set(hashes))
+        if not hashes:
+            return {}
+        return {blob["_id"]: decompress_text(blob["data"])
+                for blob in self.blobs.find({"_id": {"$in": hashes}}, {"data": 1})}
+
+    @staticmethod
+    def _referenced(records: Iterable[Dict]) -> List[str]:
+        return [record[f"{name}_hash"] for record in records for name in TEXT_FIELDS
+                if record.get(f"{name}_hash")]
+
+    @staticmethod
+    def _restore(record: Dict, texts: Dict[str, str]):
+        for name in TEXT_FIELDS:
+            digest = record.pop(f"{name}_hash", None)
+            if digest is not None:
+                record[name] = texts.get(digest, "")
+            else:
+                record.setdefault(name, "")
+
+    def hydrate_commands(self, rows: List[Dict]) -> List[Dict]:
+        """Put output/error text back into command rows (in place)"""
+        texts = self._load_blobs(self._referenced(rows))
+        for row in rows:
+            row.pop("created_at", None)
+            row.pop("output_terms", None)
+            row.pop("rollup_window", None)
+            self._restore(row, texts)
+        return rows
+
+    def hydrate_batches(self, rows: List[Dict]) -> List[Dict]:
+        results = [result for row in rows for result in row.get("results", [])]
+        texts = self._load_blobs(self._referenced(results))
+        for row in rows:
+            row.pop("created_at", None)
+        for result in results:
+            self._restore(result, texts)
+        return rows
+
+    def recent_commands(self, user_id: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        query = {"user_id": user_id} if user_id is not None else {}
+        rows = list(self.commands.find(query, {"_id": 0}).sort("timestamp", -1).limit(limit))
+        return self.hydrate_commands(rows)
+
+    def recent_batches(self, user_id: Optional[str] = None, limit: int = 20) -> List[Dict]:
+        query = {"user_id": user_id} if user_id is not None else {}
+        rows = list(self.batches.find(query, {"_id": 0}).sort("timestamp", -1).limit(limit))
+        return self.hydrate_batches(rows)
+
+    def rollup(self, now: Optional[datetime] = None) -> int:
+        """Aggregate command rows older than rollup_after_days into per-user,
+        per-command daily counts, then delete them; returns rows rolled up
+
+        Safe to re-run after a crash: the rows are first tagged with a new
+        rollup window id, each window's counts are written once with
+        $setOnInsert under that id, and only then are its rows deleted. A
+        window interrupted before its delete is finished by the next run
+        without counting any row twice.
+        """
+        cutoff = (now or datetime.now()) - timedelta(days=self.rollup_after_days)
+        self.commands.update_many({"created_at": {"$lt": cutoff}, "rollup_window": {"$exists": False}},
+                                  {"$set": {"rollup_window": uuid.uuid4().hex}})
+        return sum(self._rollup_window(window)
+                   for window in self.commands.distinct("rollup_window", {"rollup_window": {"$exists": True}}))
+
+    def _rollup_window(self, window: str) -> int:
+        match = {"rollup_window": window}
+        groups = list(self.commands.aggregate([
+            {"$match": match},
+            {"$group": {
+                "_id": {
+                    "user_id": "$user_id",
+                    "command": "$command",
+                    "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}}
+                },
+                "runs": {"$sum": 1},
+                "successes": {"$sum": {"$cond": ["$success", 1, 0]}},
+                "first_run": {"$min": "$created_at"},
+                "last_run": {"$max": "$created_at"}
+            }}
+        ]))
+        for group in groups:
+            self.rollups.update_one(
+                {**group["_id"], "window": window},
+                {"$setOnInsert": {"runs": group["runs"], "successes": group["successes"],
+                                  "first_run": group["first_run"], "last_run": group["last_run"]}},
+                upsert=True
+            )
+        self.commands.delete_many(match)
+        return sum(group["runs"] for group in groups)
+
+    def start_rollups(self, interval: float = 3600.0):
+        """Run rollup() every `interval` seconds on a background thread"""
+        def run():
+            while True:
+                try:
+                    rolled_up = self.rollup()
+                    if rolled_up:
+                        logger.info(f"Rolled up {rolled_up} command history rows")
+                except Exception as e:
+                    logger.error(f"History rollup failed: {e}")
+                time.sleep(interval)
+
+        threading.Thread(target=run, daemon=True).start()
@@ -0,0 +1,67 @@
+import threading
+from typing import Callable, Dict, Optional
+
+from fastapi import Request, Response
+
+from http_negotiation import compute_etag, conditional_body, serialize
+
+
+def _respond(request: Request, body: bytes, etag: str, headers: Dict,
+             encoded_bodies: Optional[Dict[str, bytes]] = None) -> Response:
+    status, body, encoding = conditional_body(body, etag, request.headers.get("if-none-match"),
+                                              request.headers.get("accept-encoding"), encoded_bodies)
+    if status == 304:
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def json_response(request: Request, payload, headers: Optional[Dict] = None) -> Response:
+    """Serialize payload with an ETag, answer If-None-Match with 304 and compress when accepted"""
+    body = serialize(payload)
+    etag = compute_etag(body)
+    return _respond(request, body, etag, {"ETag": etag, "Vary": "Accept-Encoding", **(headers or {})})
+
+
+class CachedResponse:
+    """A JSON response built once and served from precomputed bodies
+
+    The payload is serialized and hashed on first use, and each content
+    encoding is compressed at most once. Polling clients holding the ETag get
+    an empty 304. Call invalidate() if the underlying data changes.
+    """
+
+    def __init__(self, builder: Callable[[], Dict], max_age: int = 0):
+        self.builder = builder
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        # (payload, body, etag, encoded bodies), swapped atomically
+        self._entry = None
+
+    def _get_entry(self):
+        entry = self._entry
+        if entry is None:
+            with self._lock:
+                entry = self._entry
+                if entry is None:
+                    payload = self.builder()
+                    body = serialize(payload)
+                    entry = self._entry = (payload, body, compute_etag(body), {})
+        return entry
+
+    def invalidate(self):
+        self._entry = None
+
+    @property
+    def payload(self) -> Dict:
+        return self._get_entry()[0]
+
+    def respond(self, request: Request) -> Response:
+        _, body, etag, encoded_bodies = self._get_entry()
+        headers = {
+            "ETag": etag,
+            "Vary": "Accept-Encoding",
+            "Cache-Control": f"public, max-age={self.max_age}" if self.max_age else "no-cache"
+        }
+        return _respond(request, body, etag, headers, encoded_bodies)
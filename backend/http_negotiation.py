@@ -0,0 +1,69 @@
+import gzip
+import hashlib
+import json
+from typing import Dict, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
+# Bodies smaller than this are not worth the compression overhead
+MIN_COMPRESS_SIZE = 1024
+
+
+def serialize(payload) -> bytes:
+    return json.dumps(payload, separators=(",", ":"), default=str).encode()
+
+
+def compute_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header value covers etag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def accepts_encoding(accept_encoding: Optional[str], encoding: str) -> bool:
+    return any(part.split(";")[0].strip() == encoding for part in (accept_encoding or "").split(","))
+
+
+def negotiate_encoding(accept_encoding: Optional[str], body: bytes) -> Optional[str]:
+    """Preferred content encoding for a body given an Accept-Encoding header: br, gzip or None"""
+    if len(body) < MIN_COMPRESS_SIZE:
+        return None
+    if brotli is not None and accepts_encoding(accept_encoding, "br"):
+        return "br"
+    if accepts_encoding(accept_encoding, "gzip"):
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body)
+    return gzip.compress(body, compresslevel=6)
+
+
+def conditional_body(body: bytes, etag: str, if_none_match: Optional[str], accept_encoding: Optional[str],
+                     encoded_bodies: Optional[Dict[str, bytes]] = None) -> Tuple[int, bytes, Optional[str]]:
+    """(status, body, content encoding) answering a request for `body`
+
+    A matching If-None-Match gets an empty 304; otherwise the body is
+    compressed when it is large enough and the client accepts it.
+    `encoded_bodies` caches compressed bodies per encoding.
+    """
+    if etag_matches(if_none_match, etag):
+        return 304, b"", None
+    encoding = negotiate_encoding(accept_encoding, body)
+    if encoding is None:
+        return 200, body, None
+    if encoded_bodies is None:
+        return 200, compress(body, encoding), encoding
+    if encoding not in encoded_bodies:
+        encoded_bodies[encoding] = compress(body, encoding)
+    return 200, encoded_bodies[encoding], encoding
@@ -0,0 +1,232 @@
+import contextvars
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+
+class QueueFull(Exception):
+    """Raised by submit() when admission control rejects a job"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Job:
+    __slots__ = ("fn", "args", "kwargs", "user_id", "priority", "lane", "future", "enqueued", "started", "context")
+
+    def __init__(self, fn, args, kwargs, user_id, priority, lane):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.user_id = user_id
+        self.priority = priority
+        self.lane = lane
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+        self.started = None
+        # Run in the submitter's context so request-scoped state (trace spans) carries over
+        self.context = contextvars.copy_context()
+
+
+def _percentile(values, fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 4)
+
+
+class JobQueue:
+    """Bounded work queue with priorities and per-user fairness
+
+    Higher priorities go first. Within a priority, users take turns
+    (weighted round-robin): a user with weight w gets up to w jobs per turn.
+    With `max_running_per_user` set, a user already running that many jobs
+    is passed over until one finishes, so one user's backlog cannot occupy
+    every worker. Jobs submitted to a lane (e.g. "sequence", for work that
+    drives the mouse and keyboard) run at most `lanes[lane]` at a time; a job
+    waiting on its lane stays queued without holding a worker, and the
+    user's later jobs wait behind it so each user's jobs start in order.
+    submit() rejects work with QueueFull, carrying a retry hint, once the
+    queue or the user's share of it is full.
+    """
+
+    def __init__(self, workers: int = 4, max_queued: int = 200, max_queued_per_user: int = 50,
+                 max_running_per_user: Optional[int] = None, lanes: Optional[Dict[str, int]] = None,
+                 weights: Optional[Dict[str, int]] = None, latency_samples: int = 500):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.max_queued_per_user = max_queued_per_user
+        self.max_running_per_user = max_running_per_user
+        self.lanes = lanes or {}
+        self.weights = weights or {}
+        # Per priority: user_id -> pending jobs, and the users in turn order
+        self._pending: Dict[int, Dict[str, Deque[_Job]]] = {p: {} for p in PRIORITIES.values()}
+        self._turns: Dict[int, Deque[str]] = {p: deque() for p in PRIORITIES.values()}
+        self._credits: Dict[int, Dict[str, int]] = {p: {} for p in PRIORITIES.values()}
+        self._queued = 0
+        self._queued_by_user: Dict[str, int] = {}
+        self._running = 0
+        self._running_by_user: Dict[str, int] = {}
+        self._running_by_lane: Dict[str, int] = {}
+        self._cond = threading.Condition()
+        self._threads = []
+        self._queue_times: Deque[float] = deque(maxlen=latency_samples)
+        self._run_times: Deque[float] = deque(maxlen=latency_samples)
+        self.counters = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0}
+
+    def _ensure_started(self):
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"job-queue-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog should have drained, from recent run times"""
+        average_run = sum(self._run_times) / len(self._run_times) if self._run_times else 1.0
+        return max(1, math.ceil(average_run * (self._queued + self._running) / self.workers))
+
+    def submit(self, fn: Callable, *args, user_id: str = "default", priority: str = "normal",
+               lane: Optional[str] = None, **kwargs) -> Future:
+        """Queue fn(*args, **kwargs); the future resolves to (result, timing)"""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}'; expected one of {list(PRIORITIES)}")
+        if lane is not None and lane not in self.lanes:
+            raise ValueError(f"Unknown lane '{lane}'; expected one of {list(self.lanes)}")
+        level = PRIORITIES[priority]
+        with self._cond:
+            if self._queued >= self.max_queued:
+                self.counters["rejected"] += 1
+                raise QueueFull("Job queue is full", self.retry_after())
+            if self._queued_by_user.get(user_id, 0) >= self.max_queued_per_user:
+                self.counters["rejected"] += 1
+                raise QueueFull(f"Too many queued jobs for user '{user_id}'", self.retry_after())
+
+            job = _Job(fn, args, kwargs, user_id, level, lane)
+            user_jobs = self._pending[level].setdefault(user_id, deque())
+            if not user_jobs:
+                self._turns[level].append(user_id)
+                self._credits[level][user_id] = self.weights.get(user_id, 1)
+            user_jobs.append(job)
+            self._queued += 1
+            self._queued_by_user[user_id] = self._queued_by_user.get(user_id, 0) + 1
+            self.counters["submitted"] += 1
+            self._ensure_started()
+            self._cond.notify()
+        return job.future
+
+    def _can_start(self, job: _Job) -> bool:
+        if self.max_running_per_user is not None and \
+                self._running_by_user.get(job.user_id, 0) >= self.max_running_per_user:
+            return False
+        return job.lane is None or self._running_by_lane.get(job.lane, 0) < self.lanes[job.lane]
+
+    def _next_job(self) -> Optional[_Job]:
+        """Pop the next job that can start, by priority then user turn; the caller holds the lock
+
+        Users whose next job can't start yet keep their place in the turn order.
+        """
+        for level in sorted(self._turns):
+            turns = self._turns[level]
+            user_id = next((user_id for user_id in turns if self._can_start(self._pending[level][user_id][0])),
+                           None)
+            if user_id is not None:
+                break
+        else:
+            return None
+
+        user_jobs = self._pending[level][user_id]
+        job = user_jobs.popleft()
+        self._credits[level][user_id] -= 1
+
+        if not user_jobs:
+            turns.remove(user_id)
+            del self._pending[level][user_id]
+            del self._credits[level][user_id]
+        elif self._credits[level][user_id] <= 0:
+            # Turn used up: go to the back of the line with a fresh allowance
+            turns.remove(user_id)
+            turns.append(user_id)
+            self._credits[level][user_id] = self.weights.get(user_id, 1)
+
+        self._queued -= 1
+        self._queued_by_user[job.user_id] -= 1
+        if not self._queued_by_user[job.user_id]:
+            del self._queued_by_user[job.user_id]
+        self._running += 1
+        self._running_by_user[job.user_id] = self._running_by_user.get(job.user_id, 0) + 1
+        if job.lane is not None:
+            self._running_by_lane[job.lane] = self._running_by_lane.get(job.lane, 0) + 1
+        return job
+
+    def _finish(self, job: _Job):
+        """Release the job's worker, user and lane slots; the caller holds the lock"""
+        self._running -= 1
+        self._running_by_user[job.user_id] -= 1
+        if not self._running_by_user[job.user_id]:
+            del self._running_by_user[job.user_id]
+        if job.lane is not None:
+            self._running_by_lane[job.lane] -= 1
+        # Jobs passed over for this user or lane may be able to start now
+        self._cond.notify_all()
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    self._cond.wait()
+                    job = self._next_job()
+
+            job.started = time.perf_counter()
+            try:
+                result = job.context.run(job.fn, *job.args, **job.kwargs)
+                error = None
+            except Exception as e:
+                result, error = None, e
+            finished = time.perf_counter()
+            timing = {
+                "queue_seconds": round(job.started - job.enqueued, 4),
+                "run_seconds": round(finished - job.started, 4)
+            }
+
+            with self._cond:
+                self._finish(job)
+                self._queue_times.append(timing["queue_seconds"])
+                self._run_times.append(timing["run_seconds"])
+                self.counters["failed" if error else "completed"] += 1
+
+            if error is not None:
+                logger.error(f"Queued job for user '{job.user_id}' failed: {error}")
+                job.future.set_exception(error)
+            else:
+                job.future.set_result((result, timing))
+
+    def stats(self) -> Dict:
+        with self._cond:
+            queue_times, run_times = list(self._queue_times), list(self._run_times)
+            by_priority = {name: sum(len(jobs) for jobs in self._pending[level].values())
+                           for name, level in PRIORITIES.items()}
+            return {
+                "workers": self.workers,
+                "queued": self._queued,
+                "running": self._running,
+                "running_by_lane": {lane: self._running_by_lane.get(lane, 0) for lane in self.lanes},
+                "queued_by_priority": by_priority,
+                "queued_users": len(self._queued_by_user),
+                **self.counters,
+                "queue_seconds": {"p50": _percentile(queue_times, 0.5), "p95": _percentile(queue_times, 0.95),
+                                  "p99": _percentile(queue_times, 0.99)},
+                "run_seconds": {"p50": _percentile(run_times, 0.5), "p95": _percentile(run_times, 0.95),
+                                "p99": _percentile(run_times, 0.99)}
+            }
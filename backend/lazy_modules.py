@@ -0,0 +1,80 @@
+import importlib
+import importlib.util
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LazyModule:
+    """Proxy for a module that is only imported on first attribute access
+
+    Keeps heavy GUI/vision/audio dependencies out of process start-up; an
+    import failure is remembered and re-raised on each use so the caller's
+    error handling reports it.
+    """
+
+    def __init__(self, name: str, on_load: Optional[Callable] = None):
+        self._name = name
+        self._on_load = on_load
+        self._module = None
+        self._error = None
+        self._load_time = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is not None:
+            return self._module
+        if self._error is not None:
+            raise ImportError(f"{self._name} is unavailable: {self._error}")
+        with self._lock:
+            if self._module is None and self._error is None:
+                started = time.perf_counter()
+                try:
+                    module = importlib.import_module(self._name)
+                    if self._on_load:
+                        self._on_load(module)
+                    self._module = module
+                except Exception as e:
+                    self._error = str(e)
+                    logger.warning(f"Optional dependency {self._name} failed to load: {e}")
+                    raise ImportError(f"{self._name} is unavailable: {e}") from e
+                finally:
+                    self._load_time = time.perf_counter() - started
+        return self._load()
+
+    def probe(self) -> bool:
+        """Import now if that has not been tried yet; True when the module is usable"""
+        try:
+            self._load()
+            return True
+        except ImportError:
+            return False
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def status(self) -> Dict:
+        """Availability without importing: a module that was never loaded is
+        reported from whether it is installed"""
+        if self._module is not None:
+            return {"available": True, "loaded": True, "error": None,
+                    "load_seconds": round(self._load_time, 4)}
+        if self._error is not None:
+            return {"available": False, "loaded": False, "error": self._error}
+        installed = importlib.util.find_spec(self._name) is not None
+        return {"available": installed, "loaded": False,
+                "error": None if installed else f"{self._name} is not installed"}
+
+
+def capability_status(modules: List[LazyModule]) -> Dict:
+    """Combine module statuses: a capability works only if all its modules do"""
+    statuses = [module.status() for module in modules]
+    errors = [s["error"] for s in statuses if s["error"]]
+    return {
+        "available": all(s["available"] for s in statuses),
+        "loaded": all(s["loaded"] for s in statuses),
+        "error": "; ".join(errors) if errors else None
+    }
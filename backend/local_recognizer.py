@@ -0,0 +1,167 @@
+import io
+import logging
+import re
+import threading
+from typing import BinaryIO, Dict, List, Optional
+
+from sphinx_keywords import KeywordDecoder
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_phrase(text: str) -> str:
+    return re.sub(r"[^a-z0-9 ]+", " ", text.lower()).strip()
+
+
+class IntentMatcher:
+    """Maps recognized text to a command using a fixed phrase table
+
+    Exact phrases are a dict lookup; otherwise the longest known phrase
+    contained in the text wins, so "please show me the files now" still maps
+    to the "show me the files" intent.
+    """
+
+    def __init__(self, phrases: Dict[str, str]):
+        self.phrases = {normalize_phrase(phrase): command for phrase, command in phrases.items()}
+        # Longest first so specific phrases beat their substrings
+        self._by_length = sorted(self.phrases, key=len, reverse=True)
+
+    @property
+    def vocabulary(self) -> List[str]:
+        return list(self.phrases)
+
+    def match(self, text: str) -> Optional[Dict]:
+        text = normalize_phrase(text)
+        if not text:
+            return None
+        if text in self.phrases:
+            return {"phrase": text, "command": self.phrases[text]}
+        padded = f" {text} "
+        for phrase in self._by_length:
+            if f" {phrase} " in padded:
+                return {"phrase": phrase, "command": self.phrases[phrase]}
+        return None
+
+
+class LocalRecognizer:
+    """Offline speech recognizer limited to a known vocabulary"""
+
+    name = "base"
+
+    def recognize(self, audio: BinaryIO) -> Optional[str]:
+        """Recognized text, or None when nothing in the vocabulary was heard"""
+        raise NotImplementedError
+
+
+def load_audio_data(audio: BinaryIO):
+    """Read an uploaded clip into speech_recognition AudioData
+
+    WAV/AIFF/FLAC are read directly; other containers (e.g. browser webm) are
+    converted with pydub when ffmpeg is available.
+    """
+    import speech_recognition as sr
+
+    recognizer = sr.Recognizer()
+    try:
+        with sr.AudioFile(audio) as source:
+            return recognizer.record(source)
+    except ValueError:
+        from pydub import AudioSegment
+
+        audio.seek(0)
+        wav = io.BytesIO()
+        AudioSegment.from_file(audio).set_channels(1).export(wav, format="wav")
+        wav.seek(0)
+        with sr.AudioFile(wav) as source:
+            return recognizer.record(source)
+
+
+class SphinxKeywordRecognizer(LocalRecognizer):
+    """Keyword spotting with CMU PocketSphinx, restricted to the intent phrases
+
+    Searching only for known phrases keeps decoding fast and avoids the
+    open-vocabulary errors a general offline model would make. Loading the
+    model is slow, so the decoder is built on first use (or by warm()) and
+    then reused; a failure to build it is remembered and re-raised on each
+    call. Phrases with words PocketSphinx can't pronounce are left to the
+    remote path.
+    """
+
+    name = "sphinx"
+
+    def __init__(self, vocabulary: List[str], sensitivity: float = 0.8, sample_rate: int = 16000):
+        self.keyword_entries = [(phrase, sensitivity) for phrase in vocabulary]
+        self.sample_rate = sample_rate
+        self._decoder = None
+        self._error = None
+        self._lock = threading.Lock()
+
+    @property
+    def decoder(self) -> KeywordDecoder:
+        if self._decoder is None:
+            with self._lock:
+                if self._decoder is None and self._error is None:
+                    try:
+                        self._decoder = KeywordDecoder(self.keyword_entries, self.sample_rate, skip_unknown=True)
+                    except Exception as e:
+                        self._error = str(e)
+                        logger.warning(f"PocketSphinx keyword decoder unavailable: {e}")
+        if self._decoder is None:
+            raise RuntimeError(f"PocketSphinx keyword decoder unavailable: {self._error}")
+        return self._decoder
+
+    def warm(self):
+        """Build the decoder now (e.g. from a background thread at start-up)"""
+        try:
+            self.decoder
+        except RuntimeError:
+            pass
+
+    def recognize(self, audio: BinaryIO) -> Optional[str]:
+        decoder = self.decoder
+        audio_data = load_audio_data(audio)
+        pcm = audio_data.get_raw_data(convert_rate=decoder.sample_rate, convert_width=2)
+        return decoder.decode(pcm)
+
+
+class StaticRecognizer(LocalRecognizer):
+    """Returns a fixed phrase; the offline stand-in for tests"""
+
+    name = "static"
+
+    def __init__(self, text: Optional[str] = None):
+        self.text = text
+
+    def recognize(self, audio: BinaryIO) -> Optional[str]:
+        return self.text
+
+
+class VoiceIntentRecognizer:
+    """Audio straight to an intent through a local recognizer
+
+    Returns success=False when the recognizer is unavailable or heard nothing
+    it knows, so callers can fall back to remote transcription.
+    """
+
+    def __init__(self, recognizer: LocalRecognizer, matcher: IntentMatcher):
+        self.recognizer = recognizer
+        self.matcher = matcher
+
+    def recognize_intent(self, audio: BinaryIO) -> Dict:
+        try:
+            text = self.recognizer.recognize(audio)
+        except Exception as e:
+            logger.warning(f"Local recognizer '{self.recognizer.name}' failed: {e}")
+            return {"success": False, "error": str(e), "method": f"local_{self.recognizer.name}"}
+
+        intent = self.matcher.match(text) if text else None
+        if intent is None:
+            return {"success": False, "text": text, "method": f"local_{self.recognizer.name}"}
+
+        return {
+            "success": True,
+            "text": text,
+            "phrase": intent["phrase"],
+            "command": intent["command"],
+            "method": f"local_{self.recognizer.name}"
+        }
@@ -8,6 +8,10 @@ from datetime import datetime
 import tempfile
 from pathlib import Path
 
+from gestures import build_gesture_path, path_out_of_bounds, DEFAULT_SAMPLE_RATE
+from window_inventory import WindowInventory, window_region
+from event_bus import event_bus, HotkeyPressed, WakeWordDetected, WindowsChanged
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -23,16 +27,68 @@ class MockScreenAutomation:
         self.last_screenshot = None
         self.wake_word_active = False
         self.hotkey_listeners = []
+        self.hotkeys = {}
+        self.wake_word_action = ""
+        self.wake_word = None
+        self.last_gesture_events = []
         
         # Screen dimensions (mock values)
         self.screen_width = 1920
         self.screen_height = 1080
         
+        # Mock window list
+        self.mock_windows = [
+            {
+                "title": "Terminal",
+                "pid": 12345,
+                "position": {"x": 0, "y": 0, "width": 800, "height": 600},
+                "is_active": True,
+                "is_maximized": False,
+                "is_minimized": False
+            },
+            {
+                "title": "Web Browser",
+                "pid": 12346,
+                "position": {"x": 100, "y": 100, "width": 1024, "height": 768},
+                "is_active": False,
+                "is_maximized": True,
+                "is_minimized": False
+            },
+            {
+                "title": "Text Editor",
+                "pid": 12347,
+                "position": {"x": 200, "y": 200, "width": 600, "height": 400},
+                "is_active": False,
+                "is_maximized": False,
+                "is_minimized": False
+            }
+        ]
+        self.window_inventory = WindowInventory(self._enumerate_windows)
+        self.window_inventory.subscribe(lambda diff: event_bus.publish(WindowsChanged(**diff)))
+        
         logger.info(f"Mock Screen Automation initialized - Screen size: {self.screen_width}x{self.screen_height}")
     
-    def take_screenshot(self, region=None, filename=None) -> Dict:
+    def capabilities(self) -> Dict:
+        """Every capability is simulated, so all are available"""
+        return {
+            name: {"available": True, "loaded": True, "error": None}
+            for name in ("capture", "matching", "ocr", "input", "windows", "hotkeys", "audio")
+        }
+    
+    def _resolve_scope(self, window_title=None, region=None):
+        """Turn an optional window scope into a screen region"""
+        if not window_title:
+            return region
+        info = self.window_inventory.resolve(window_title)
+        if info is None:
+            raise ValueError(f"Window with title '{window_title}' not found")
+        return window_region(info, region, self.screen_width, self.screen_height)
+    
+    def take_screenshot(self, region=None, filename=None, window_title=None) -> Dict:
         """Mock taking a screenshot"""
         try:
+            region = self._resolve_scope(window_title, region)
+            
             # Generate filename if not provided
             if not filename:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -50,7 +106,8 @@ class MockScreenAutomation:
                 "filepath": str(filepath),
                 "filename": filename,
                 "image_base64": mock_base64,
-                "size": [self.screen_width, self.screen_height],
+                "size": [region[2], region[3]] if region else [self.screen_width, self.screen_height],
+                "region": list(region) if region else None,
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -62,14 +119,17 @@ class MockScreenAutomation:
                 "timestamp": datetime.now().isoformat()
             }
     
-    def locate_on_screen(self, template_image, confidence=0.8, region=None) -> Dict:
+    def locate_on_screen(self, template_image, confidence=0.8, region=None, window_title=None) -> Dict:
         """Mock finding template image on screen"""
         try:
-            # Return mock matches
+            region = self._resolve_scope(window_title, region)
+            offset_x, offset_y = (region[0], region[1]) if region else (0, 0)
+            
+            # Return mock matches, translated to screen space
             matches = [
                 {
-                    "x": 100,
-                    "y": 100,
+                    "x": 100 + offset_x,
+                    "y": 100 + offset_y,
                     "width": 50,
                     "height": 50,
                     "confidence": 0.95
@@ -118,13 +178,16 @@ class MockScreenAutomation:
                 "timestamp": datetime.now().isoformat()
             }
     
-    def click_on_image(self, template_image, confidence=0.8, double_click=False) -> Dict:
+    def click_on_image(self, template_image, confidence=0.8, double_click=False, window_title=None) -> Dict:
         """Mock clicking on template image"""
         try:
+            region = self._resolve_scope(window_title)
+            offset_x, offset_y = (region[0], region[1]) if region else (0, 0)
+            
             return {
                 "success": True,
                 "action": "double_click" if double_click else "click",
-                "position": {"x": 100, "y": 100},
+                "position": {"x": 100 + offset_x, "y": 100 + offset_y},
                 "button": "left",
                 "timestamp": datetime.now().isoformat()
             }
@@ -155,6 +218,50 @@ class MockScreenAutomation:
                 "timestamp": datetime.now().isoformat()
             }
     
+    def bulk_input(self, items, use_clipboard=True, min_interval=0.0) -> Dict:
+        """Mock injecting a buffer of text and key chords"""
+        try:
+            start_time = time.perf_counter()
+            character_count = 0
+            key_count = 0
+            
+            failed_items = []
+            for index, item in enumerate(items):
+                if isinstance(item, str):
+                    item = {"text": item}
+                
+                if not isinstance(item, dict) or not (item.get('text') or item.get('key')):
+                    failed_items.append({"index": index, "error": "Item needs 'text' or 'key'"})
+                elif item.get('text') and not use_clipboard and not item['text'].isascii():
+                    failed_items.append({"index": index,
+                                         "error": "Non-ASCII text can't be typed without the clipboard"})
+                elif item.get('text'):
+                    character_count += len(item['text'])
+                else:
+                    key_count += 1
+            
+            duration = time.perf_counter() - start_time
+            
+            return {
+                "success": not failed_items,
+                "method": "clipboard" if use_clipboard and min_interval <= 0 else "typewrite",
+                "item_count": len(items),
+                "character_count": character_count,
+                "key_count": key_count,
+                "failed_items": failed_items,
+                "duration": round(duration, 4),
+                "chars_per_second": round(character_count / duration, 1) if duration > 0 else None,
+                "timestamp": datetime.now().isoformat()
+            }
+            
+        except Exception as e:
+            logger.error(f"Mock bulk input failed: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "timestamp": datetime.now().isoformat()
+            }
+    
     def press_key(self, key_combination) -> Dict:
         """Mock pressing key or key combination"""
         try:
@@ -201,9 +308,66 @@ class MockScreenAutomation:
                 "timestamp": datetime.now().isoformat()
             }
     
-    def read_text_from_screen(self, region=None, lang='eng') -> Dict:
+    def drag_and_drop(self, start_x, start_y, end_x, end_y, duration=0.5) -> Dict:
+        """Mock dragging from start position to end position"""
+        result = self.perform_gesture(
+            [{"x": start_x, "y": start_y}, {"x": end_x, "y": end_y}],
+            duration=duration
+        )
+        if result["success"]:
+            result.update({
+                "start_position": {"x": start_x, "y": start_y},
+                "end_position": {"x": end_x, "y": end_y}
+            })
+        return result
+    
+    def perform_gesture(self, points, path_type='polyline', duration=0.5,
+                        sample_rate=DEFAULT_SAMPLE_RATE, fast=False, button='left') -> Dict:
+        """Mock performing a press/move/release gesture, recording the input events"""
+        try:
+            path = build_gesture_path(points, path_type, duration, sample_rate, fast)
+            
+            outside = path_out_of_bounds(path, self.screen_width, self.screen_height)
+            if outside:
+                return {
+                    "success": False,
+                    "error": f"Gesture point ({outside['x']}, {outside['y']}) is outside screen bounds",
+                    "timestamp": datetime.now().isoformat()
+                }
+            
+            start = path[0]
+            events = [{"type": "move", "x": start["x"], "y": start["y"]},
+                      {"type": "down", "button": button}]
+            events.extend({"type": "move", "x": p["x"], "y": p["y"]} for p in path[1:])
+            events.append({"type": "up", "button": button})
+            self.last_gesture_events = events
+            
+            return {
+                "success": True,
+                "action": "gesture",
+                "path_type": path_type,
+                "button": button,
+                "point_count": len(path),
+                "start_position": {"x": start["x"], "y": start["y"]},
+                "end_position": {"x": path[-1]["x"], "y": path[-1]["y"]},
+                "duration": path[-1]["t"],
+                "timestamp": datetime.now().isoformat()
+            }
+            
+        except Exception as e:
+            logger.error(f"Mock gesture failed: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "timestamp": datetime.now().isoformat()
+            }
+    
+    def read_text_from_screen(self, region=None, lang='eng', window_title=None) -> Dict:
         """Mock extracting text from screen using OCR"""
         try:
+            region = self._resolve_scope(window_title, region)
+            offset_x, offset_y = (region[0], region[1]) if region else (0, 0)
+            
             # Mock OCR text
             mock_text = "This is mock OCR text for testing purposes."
             
@@ -235,12 +399,16 @@ class MockScreenAutomation:
                     "bbox": {"x": 200, "y": 10, "width": 40, "height": 20}
                 }
             ]
+            for word in words:
+                word["bbox"]["x"] += offset_x
+                word["bbox"]["y"] += offset_y
             
             return {
                 "success": True,
                 "text": mock_text,
                 "words": words,
                 "word_count": len(words),
+                "region": list(region) if region else None,
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -252,56 +420,20 @@ class MockScreenAutomation:
                 "timestamp": datetime.now().isoformat()
             }
     
+    def _enumerate_windows(self) -> List:
+        """Mock window enumeration as (window_info, handle) pairs"""
+        return [(dict(window), window["title"]) for window in self.mock_windows]
+    
     def get_window_list(self) -> Dict:
         """Mock getting list of all open windows"""
         try:
-            # Mock window list
-            windows = [
-                {
-                    "title": "Terminal",
-                    "pid": 12345,
-                    "position": {
-                        "x": 0,
-                        "y": 0,
-                        "width": 800,
-                        "height": 600
-                    },
-                    "is_active": True,
-                    "is_maximized": False,
-                    "is_minimized": False
-                },
-                {
-                    "title": "Web Browser",
-                    "pid": 12346,
-                    "position": {
-                        "x": 100,
-                        "y": 100,
-                        "width": 1024,
-                        "height": 768
-                    },
-                    "is_active": False,
-                    "is_maximized": True,
-                    "is_minimized": False
-                },
-                {
-                    "title": "Text Editor",
-                    "pid": 12347,
-                    "position": {
-                        "x": 200,
-                        "y": 200,
-                        "width": 600,
-                        "height": 400
-                    },
-                    "is_active": False,
-                    "is_maximized": False,
-                    "is_minimized": False
-                }
-            ]
+            windows = self.window_inventory.windows()
             
             return {
                 "success": True,
                 "windows": windows,
                 "window_count": len(windows),
+                "refreshed_at": datetime.fromtimestamp(self.window_inventory.last_refresh).isoformat(),
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -313,13 +445,32 @@ class MockScreenAutomation:
                 "timestamp": datetime.now().isoformat()
             }
     
+    def find_windows(self, query, match='exact', limit=10) -> Dict:
+        """Mock looking up windows by title"""
+        try:
+            windows = self.window_inventory.find(query, match, limit)
+            
+            return {
+                "success": True,
+                "query": query,
+                "match": match,
+                "windows": windows,
+                "window_count": len(windows),
+                "timestamp": datetime.now().isoformat()
+            }
+            
+        except Exception as e:
+            logger.error(f"Mock find windows failed: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "timestamp": datetime.now().isoformat()
+            }
+    
     def activate_window(self, window_title) -> Dict:
         """Mock activating window by title"""
         try:
-            # Check if window title is in mock window list
-            mock_windows = ["Terminal", "Web Browser", "Text Editor"]
-            
-            if window_title not in mock_windows:
+            if self.window_inventory.resolve(window_title) is None:
                 return {
                     "success": False,
                     "error": f"Window with title '{window_title}' not found",
@@ -340,24 +491,25 @@ class MockScreenAutomation:
                 "timestamp": datetime.now().isoformat()
             }
     
-    def wait_for_image(self, template_image, timeout=10, confidence=0.8) -> Dict:
+    def wait_for_image(self, template_image, timeout=10, confidence=0.8, window_title=None) -> Dict:
         """Mock waiting for image to appear on screen"""
         try:
             # Simulate a short wait
             time.sleep(0.5)
+            locate_result = self.locate_on_screen(template_image, confidence, window_title=window_title)
+            
+            if not locate_result.get("matches"):
+                return {
+                    "success": False,
+                    "error": locate_result.get("error") or f"Image not found within {timeout} seconds",
+                    "timeout": timeout,
+                    "timestamp": datetime.now().isoformat()
+                }
             
             return {
                 "success": True,
                 "wait_time": 0.5,
-                "matches": [
-                    {
-                        "x": 100,
-                        "y": 100,
-                        "width": 50,
-                        "height": 50,
-                        "confidence": 0.95
-                    }
-                ],
+                "matches": locate_result["matches"],
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -369,9 +521,23 @@ class MockScreenAutomation:
                 "timestamp": datetime.now().isoformat()
             }
     
-    def start_wake_word_detection(self, wake_word="shayak") -> Dict:
+    def start_wake_word_detection(self, wake_word="shayak", action=None) -> Dict:
         """Mock starting wake word detection"""
         try:
+            self.wake_word_action = action or ""
+            if self.wake_word_active:
+                response = {
+                    "success": True,
+                    "wake_word": self.wake_word,
+                    "status": "already_listening",
+                    "timestamp": datetime.now().isoformat()
+                }
+                if wake_word != self.wake_word:
+                    response["message"] = (f"Still listening for '{self.wake_word}'; "
+                                           "stop detection to change the wake word")
+                return response
+            
+            self.wake_word = wake_word
             self.wake_word_active = True
             
             return {
@@ -411,6 +577,8 @@ class MockScreenAutomation:
     def setup_hotkey(self, key_combination, action) -> Dict:
         """Mock setting up global hotkey"""
         try:
+            self.hotkeys[key_combination] = action
+            
             return {
                 "success": True,
                 "hotkey": key_combination,
@@ -426,6 +594,31 @@ class MockScreenAutomation:
                 "timestamp": datetime.now().isoformat()
             }
     
+    def trigger_hotkey(self, key_combination) -> Dict:
+        """Simulate pressing a registered hotkey"""
+        if key_combination not in self.hotkeys:
+            return {
+                "success": False,
+                "error": f"Hotkey '{key_combination}' is not registered",
+                "timestamp": datetime.now().isoformat()
+            }
+        
+        event_bus.publish(HotkeyPressed(key_combination=key_combination, action=self.hotkeys[key_combination]))
+        return {
+            "success": True,
+            "hotkey": key_combination,
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    def trigger_wake_word(self, wake_word="shayak") -> Dict:
+        """Simulate a wake word detection"""
+        event_bus.publish(WakeWordDetected(wake_word=wake_word, latency=0.0, action=self.wake_word_action))
+        return {
+            "success": True,
+            "wake_word": wake_word,
+            "timestamp": datetime.now().isoformat()
+        }
+    
     def execute_automation_sequence(self, sequence) -> Dict:
         """Mock executing a sequence of automation actions"""
         try:
@@ -437,8 +630,14 @@ class MockScreenAutomation:
                 
                 logger.info(f"Mock executing action {i+1}: {action_type}")
                 
-                # Simulate success for all actions
-                result = {"success": True, "action": action_type}
+                # Gestures run through the path engine so paths are validated;
+                # everything else is simulated as a success
+                if action_type == 'drag':
+                    result = self.drag_and_drop(**action_params)
+                elif action_type == 'gesture':
+                    result = self.perform_gesture(**action_params)
+                else:
+                    result = {"success": True, "action": action_type}
                 
                 results.append({
                     "action_index": i,
@@ -446,13 +645,19 @@ class MockScreenAutomation:
                     "result": result
                 })
                 
+                # Stop sequence if action fails
+                if not result.get("success", False):
+                    break
+                
                 # Small delay between actions
                 time.sleep(0.1)
             
+            successful_actions = sum(1 for r in results if r["result"].get("success", False))
+            
             return {
                 "success": True,
                 "total_actions": len(sequence),
-                "successful_actions": len(sequence),
+                "successful_actions": successful_actions,
                 "results": results,
                 "timestamp": datetime.now().isoformat()
             }
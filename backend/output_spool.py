@@ -0,0 +1,131 @@
+import json
+import logging
+import re
+import threading
+import time
+import uuid
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+class OutputSpool:
+    """Keeps command output out of memory and out of MongoDB documents
+
+    Output is read from a file (the subprocess writes straight to one). The
+    first `inline_limit` bytes are returned for the API response and history
+    row; anything larger is also stored in full under `directory` as
+    independently zlib-compressed chunks plus a small JSON index, so a byte
+    range can be served by decompressing only the chunks it touches.
+    """
+
+    def __init__(self, directory: str = "outputs", inline_limit: int = 16 * 1024,
+                 chunk_size: int = 1024 * 1024):
+        self.directory = Path(directory)
+        self.directory.mkdir(exist_ok=True)
+        self.inline_limit = inline_limit
+        self.chunk_size = chunk_size
+        self._prune_thread = None
+
+    def _paths(self, output_id: str):
+        if not OUTPUT_ID_PATTERN.match(output_id):
+            raise ValueError(f"Invalid output id: {output_id}")
+        return self.directory / f"{output_id}.bin", self.directory / f"{output_id}.json"
+
+    def spool(self, stream: BinaryIO) -> Dict:
+        """Read `stream` from the start; returns the inline text, total size,
+        whether it was truncated, and the blob id when it was"""
+        stream.seek(0)
+        head = stream.read(self.inline_limit + 1)
+        truncated = len(head) > self.inline_limit
+        result = {
+            "text": head[:self.inline_limit].decode("utf-8", errors="replace"),
+            "size": len(head),
+            "truncated": truncated,
+            "output_id": None
+        }
+        if not truncated:
+            return result
+
+        output_id = uuid.uuid4().hex
+        blob_path, index_path = self._paths(output_id)
+        offsets, total = [], 0
+        stream.seek(0)
+        with open(blob_path, "wb") as blob:
+            while True:
+                chunk = stream.read(self.chunk_size)
+                if not chunk:
+                    break
+                offsets.append(blob.tell())
+                blob.write(zlib.compress(chunk, 6))
+                total += len(chunk)
+            offsets.append(blob.tell())
+        index_path.write_text(json.dumps({"chunk_size": self.chunk_size, "size": total, "offsets": offsets}))
+
+        result.update(size=total, output_id=output_id)
+        return result
+
+    def _index(self, output_id: str) -> Dict:
+        _, index_path = self._paths(output_id)
+        try:
+            return json.loads(index_path.read_text())
+        except FileNotFoundError:
+            raise KeyError(output_id)
+
+    def size(self, output_id: str) -> int:
+        return self._index(output_id)["size"]
+
+    def iter_range(self, output_id: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Bytes [start, end) of the original output, one decompressed chunk at a time"""
+        index = self._index(output_id)
+        blob_path, _ = self._paths(output_id)
+        chunk_size, offsets = index["chunk_size"], index["offsets"]
+        end = index["size"] if end is None else min(end, index["size"])
+        if start >= end:
+            return
+
+        with open(blob_path, "rb") as blob:
+            for chunk_number in range(start // chunk_size, (end - 1) // chunk_size + 1):
+                blob.seek(offsets[chunk_number])
+                data = zlib.decompress(blob.read(offsets[chunk_number + 1] - offsets[chunk_number]))
+                chunk_start = chunk_number * chunk_size
+                yield data[max(0, start - chunk_start):end - chunk_start]
+
+    def read_range(self, output_id: str, start: int = 0, end: Optional[int] = None) -> bytes:
+        return b"".join(self.iter_range(output_id, start, end))
+
+    def delete(self, output_id: str):
+        for path in self._paths(output_id):
+            path.unlink(missing_ok=True)
+
+    def prune(self, max_age_seconds: float) -> int:
+        """Delete spooled outputs older than max_age_seconds; returns how many"""
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for index_path in self.directory.glob("*.json"):
+            if index_path.stat().st_mtime < cutoff:
+                self.delete(index_path.stem)
+                removed += 1
+        return removed
+
+    def start_pruning(self, max_age_seconds: float, interval: float = 3600.0):
+        """Prune now and then every `interval` seconds on a background thread"""
+        if self._prune_thread is not None:
+            return
+
+        def run():
+            while True:
+                try:
+                    removed = self.prune(max_age_seconds)
+                    if removed:
+                        logger.info(f"Pruned {removed} spooled outputs")
+                except Exception as e:
+                    logger.error(f"Output pruning failed: {e}")
+                time.sleep(interval)
+
+        self._prune_thread = threading.Thread(target=run, daemon=True)
+        self._prune_thread.start()
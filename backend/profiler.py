@@ -0,0 +1,210 @@
+import contextvars
+import functools
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# For a request sent with the profiling header: ids of the profiles it produced
+_requested: contextvars.ContextVar = contextvars.ContextVar("profiling_requested", default=None)
+# The profiled call the current context is inside, so nested wrappers don't profile again
+_active: contextvars.ContextVar = contextvars.ContextVar("profiling_active", default=None)
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _Session:
+    """One profiled call: the thread it runs on, the frame it started in, and its samples"""
+    __slots__ = ("name", "thread_id", "frame", "stacks", "samples", "started", "wall_started", "requested")
+
+    def __init__(self, name: str, frame, requested: Optional[List[str]]):
+        self.name = name
+        self.requested = requested
+        self.thread_id = threading.get_ident()
+        self.frame = frame
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started = time.perf_counter()
+        self.wall_started = datetime.now()
+
+
+class _Profile:
+    __slots__ = ("profiler", "name", "session", "token")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.session = None
+
+    def __enter__(self):
+        self.session = _Session(self.name, sys._getframe(1), _requested.get())
+        self.token = _active.set(self.session)
+        self.profiler._attach(self.session)
+        return self.session
+
+    def __exit__(self, *exc_info):
+        _active.reset(self.token)
+        self.profiler._detach(self.session)
+        return False
+
+
+class _NotProfiled:
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NOT_PROFILED = _NotProfiled()
+
+
+class SamplingProfiler:
+    """Opt-in sampling profiler for slow automation calls and handlers
+
+    Off by default: profile() then costs a flag check and a context variable
+    lookup. When enabled (globally, or for one request via request_profiling())
+    a sampler thread reads the stack of each profiled call's thread from
+    sys._current_frames() every `interval` seconds. Calls that take at least
+    `slow_threshold` seconds, and every call of a profiled request, keep
+    their samples as collapsed stacks (the input format of flamegraph.pl and
+    speedscope); the last `keep` are kept.
+    """
+
+    def __init__(self, interval: float = 0.005, slow_threshold: float = 0.5, keep: int = 50,
+                 max_depth: int = 128):
+        self.enabled = False
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self.max_depth = max_depth
+        self.profiles: deque = deque(maxlen=keep)
+        self._sessions: Dict[int, _Session] = {}
+        self._lock = threading.Lock()
+        self._sampler = None
+
+    def configure(self, enabled: Optional[bool] = None, slow_threshold: Optional[float] = None,
+                  interval: Optional[float] = None, keep: Optional[int] = None):
+        if enabled is not None:
+            self.enabled = enabled
+        if slow_threshold is not None:
+            self.slow_threshold = slow_threshold
+        if interval is not None:
+            self.interval = max(interval, 0.001)
+        if keep is not None and keep != self.profiles.maxlen:
+            self.profiles = deque(self.profiles, maxlen=keep)
+
+    @staticmethod
+    def request_profiling():
+        """Profile everything run in the current context (e.g. one request); returns a reset token"""
+        return _requested.set([])
+
+    @staticmethod
+    def end_request_profiling(token) -> List[str]:
+        """Stop profiling the current context; returns the ids of the profiles it produced"""
+        profile_ids = _requested.get() or []
+        _requested.reset(token)
+        return profile_ids
+
+    def profile(self, name: str):
+        """Context manager sampling its block when profiling is on and no outer call is already sampled"""
+        if not (self.enabled or _requested.get() is not None) or _active.get() is not None:
+            return NOT_PROFILED
+        return _Profile(self, name)
+
+    def profiled(self, name: Optional[str] = None):
+        """Decorator running the function inside profile()"""
+        def decorate(fn):
+            label = name or fn.__name__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.profile(label):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def _attach(self, session: _Session):
+        with self._lock:
+            self._sessions[id(session)] = session
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+                self._sampler.start()
+
+    def _detach(self, session: _Session):
+        with self._lock:
+            self._sessions.pop(id(session), None)
+        duration = time.perf_counter() - session.started
+        if duration < self.slow_threshold and session.requested is None:
+            return
+        profile_id = uuid.uuid4().hex
+        if session.requested is not None:
+            session.requested.append(profile_id)
+        self.profiles.append({
+            "id": profile_id,
+            "name": session.name,
+            "duration": round(duration, 4),
+            "samples": session.samples,
+            "interval": self.interval,
+            "started": session.wall_started.isoformat(),
+            "stacks": dict(session.stacks)
+        })
+
+    def _stack(self, frame, stop) -> Optional[str]:
+        """Collapsed stack from the profiled call's frame down to `frame`"""
+        names = []
+        while frame is not None and frame is not stop and len(names) < self.max_depth:
+            names.append(_frame_name(frame))
+            frame = frame.f_back
+        if frame is not stop:
+            return None
+        names.append(_frame_name(stop))
+        return ";".join(reversed(names))
+
+    def _sample_loop(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                sessions = list(self._sessions.values())
+                if not sessions:
+                    self._sampler = None
+                    return
+            frames = sys._current_frames()
+            for session in sessions:
+                frame = frames.get(session.thread_id)
+                stack = self._stack(frame, session.frame) if frame is not None else None
+                if stack:
+                    session.stacks[stack] += 1
+                    session.samples += 1
+
+    def recent(self) -> List[Dict]:
+        """Slow calls kept so far, newest first, without their stacks"""
+        return [{key: value for key, value in profile.items() if key != "stacks"}
+                for profile in reversed(self.profiles)]
+
+    def get(self, profile_id: str) -> Optional[Dict]:
+        return next((profile for profile in self.profiles if profile["id"] == profile_id), None)
+
+    @staticmethod
+    def collapsed(profile: Dict) -> str:
+        """Stacks as 'frame;frame;frame count' lines, heaviest first"""
+        lines = sorted(profile["stacks"].items(), key=lambda item: item[1], reverse=True)
+        return "".join(f"{stack} {count}\n" for stack, count in lines)
+
+    def status(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "interval": self.interval,
+            "slow_threshold": self.slow_threshold,
+            "keep": self.profiles.maxlen,
+            "kept": len(self.profiles),
+            "active": len(self._sessions)
+        }
@@ -0,0 +1,166 @@
+import bisect
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from capability_registry import MEMBER_CAPABILITY
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers sub-millisecond safety checks up to 30 s command timeouts
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs: Iterable[Tuple[str, str]]) -> str:
+    pairs = list(pairs)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class Histogram:
+    """Prometheus histogram with labels
+
+    observe() is a bisect plus a few additions under a lock; the cumulative
+    bucket counts Prometheus expects are only computed when rendering.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last one is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {list(self.labelnames)}, got {sorted(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def time(self, **labels) -> _Timer:
+        """Context manager observing the time spent in its block"""
+        self._key(labels)
+        return _Timer(self, labels)
+
+    def snapshot(self, **labels) -> Optional[Dict]:
+        """Count, sum and cumulative bucket counts of one series (None if unseen)"""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            if series is None:
+                return None
+            counts, total = list(series[0]), series[1]
+        cumulative, running = {}, 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            running += count
+            cumulative[bound] = running
+        return {"count": running, "sum": total, "buckets": cumulative}
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((key, list(counts), total) for key, (counts, total) in self._series.items())
+        for key, counts, total in series:
+            pairs = list(zip(self.labelnames, key))
+            running = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                running += count
+                labels = _format_labels(pairs + [("le", _format_number(bound))])
+                lines.append(f"{self.name}_bucket{labels} {running}")
+            lines.append(f"{self.name}_sum{_format_labels(pairs)} {_format_number(total)}")
+            lines.append(f"{self.name}_count{_format_labels(pairs)} {running}")
+        return lines
+
+
+class MetricsRegistry:
+    """Set of histograms rendered together in the Prometheus text format
+
+    Each process keeps its own registry; with several workers each one is
+    scraped (or summed) separately, as with any multi-process exporter.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        with self._lock:
+            if name in self._metrics:
+                raise ValueError(f"Metric {name} is already registered")
+            metric = self._metrics[name] = Histogram(name, documentation, labelnames, buckets)
+            return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+class InstrumentedAutomation:
+    """Times every automation method call into a histogram labelled by
+    capability (capture, matching, ocr, input, ...) and method name
+
+    Attributes that are not methods (screen_width, wake_word_active, ...)
+    and helpers outside the capability table pass straight through. With a
+    `profiler`, calls are also run under profiler.profile().
+    """
+
+    def __init__(self, automation, histogram: Histogram, profiler=None):
+        self._automation = automation
+        self._histogram = histogram
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        attribute = getattr(self._automation, name)
+        capability = MEMBER_CAPABILITY.get(name)
+        if capability is None or not callable(attribute):
+            return attribute
+        histogram, profiler = self._histogram, self._profiler
+
+        def timed(*args, **kwargs):
+            with histogram.time(capability=capability, action=name):
+                if profiler is None:
+                    return attribute(*args, **kwargs)
+                with profiler.profile(f"automation.{name}"):
+                    return attribute(*args, **kwargs)
+
+        return timed
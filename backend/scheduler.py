@@ -0,0 +1,427 @@
+import heapq
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, fields
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single server process is assumed
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+CRON_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+}
+
+# (name, lowest, highest) for the five cron fields; weekday 7 is also Sunday
+CRON_FIELDS = [("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7)]
+
+INTERVAL_PATTERN = re.compile(r"^(?:@every|every)\s+(\d+(?:\.\d+)?)\s*([smhd]?)$")
+INTERVAL_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+MISFIRE_POLICIES = ("run_once", "skip")
+
+
+class IntervalSchedule:
+    def __init__(self, seconds: float):
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.seconds = seconds
+
+    def next_after(self, ts: float) -> float:
+        return ts + self.seconds
+
+
+def _parse_cron_field(text: str, name: str, low: int, high: int) -> set:
+    values = set()
+    for part in text.split(","):
+        expr, has_step, step = part.partition("/")
+        try:
+            step = int(step) if has_step else 1
+            if expr == "*":
+                start, end = low, high
+            elif "-" in expr:
+                start, end = (int(v) for v in expr.split("-", 1))
+            else:
+                start = int(expr)
+                end = high if has_step else start
+        except ValueError:
+            raise ValueError(f"Invalid cron {name} field: '{text}'")
+        if step < 1 or not low <= start <= end <= high:
+            raise ValueError(f"Cron {name} field out of range: '{text}'")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """Standard five-field cron expression, evaluated in local time
+
+    As in cron, when both day-of-month and weekday are restricted a day
+    matching either one fires.
+    """
+
+    def __init__(self, expression: str):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Cron expression needs 5 fields, got {len(parts)}: '{expression}'")
+        parsed = [_parse_cron_field(text, *spec) for text, spec in zip(parts, CRON_FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = {day % 7 for day in weekdays}
+        self.day_restricted = parts[2] != "*"
+        self.weekday_restricted = parts[4] != "*"
+
+    def _day_matches(self, dt: datetime) -> bool:
+        day_ok = dt.day in self.days
+        weekday_ok = (dt.weekday() + 1) % 7 in self.weekdays
+        if self.day_restricted and self.weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, ts: float) -> float:
+        dt = datetime.fromtimestamp(ts).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 5)
+        # Jump field by field instead of stepping through every minute
+        while dt < limit:
+            if dt.month not in self.months:
+                dt = (dt.replace(day=1) + timedelta(days=32)).replace(day=1, hour=0, minute=0)
+            elif not self._day_matches(dt):
+                dt = (dt + timedelta(days=1)).replace(hour=0, minute=0)
+            elif dt.hour not in self.hours:
+                dt = (dt + timedelta(hours=1)).replace(minute=0)
+            elif dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+            else:
+                return dt.timestamp()
+        raise ValueError("Cron expression never matches")
+
+
+def parse_schedule(spec: str):
+    """Schedule from 'every 30s' / '@every 5m' (s, m, h, d), a cron alias like
+    '@daily', or a five-field cron expression"""
+    spec = spec.strip()
+    match = INTERVAL_PATTERN.match(spec.lower())
+    if match:
+        return IntervalSchedule(float(match.group(1)) * INTERVAL_UNITS[match.group(2)])
+    return CronSchedule(CRON_ALIASES.get(spec.lower(), spec))
+
+
+@dataclass
+class ScheduledJob:
+    name: str
+    schedule: str
+    action: str
+    commands: List[str] = field(default_factory=list)
+    user_id: str = "default"
+    max_concurrency: int = 1
+    jitter: float = 0.0
+    misfire_policy: str = "run_once"
+    misfire_grace: float = 60.0
+    enabled: bool = True
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    next_run: Optional[float] = None
+    last_run: Optional[float] = None
+    last_result: Optional[Dict] = None
+    run_count: int = 0
+    missed_runs: int = 0
+    skipped_runs: int = 0
+    updated_at: float = field(default_factory=time.time)
+
+    def __post_init__(self):
+        if self.misfire_policy not in MISFIRE_POLICIES:
+            raise ValueError(f"misfire_policy must be one of {MISFIRE_POLICIES}")
+        if self.max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.parsed_schedule = parse_schedule(self.schedule)
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data["next_run_at"] = datetime.fromtimestamp(self.next_run).isoformat() if self.next_run else None
+        data["last_run_at"] = datetime.fromtimestamp(self.last_run).isoformat() if self.last_run else None
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ScheduledJob":
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in names})
+
+
+# Fields the scheduler itself changes as jobs run
+STATE_FIELDS = ("next_run", "next_run_at", "last_run", "last_run_at", "last_result",
+                "run_count", "missed_runs", "skipped_runs")
+
+
+class MongoJobStore:
+    """Persists jobs in a MongoDB collection, one document per job id"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def save(self, job: ScheduledJob):
+        self.collection.replace_one({"id": job.id}, job.to_dict(), upsert=True)
+
+    def save_state(self, job: ScheduledJob):
+        """Update run bookkeeping only; a job deleted meanwhile stays deleted"""
+        data = job.to_dict()
+        self.collection.update_one({"id": job.id}, {"$set": {name: data[name] for name in STATE_FIELDS}},
+                                   upsert=False)
+
+    def delete(self, job_id: str):
+        self.collection.delete_one({"id": job_id})
+
+    def load_all(self) -> List[ScheduledJob]:
+        jobs = []
+        for doc in self.collection.find({}, {"_id": 0}):
+            try:
+                jobs.append(ScheduledJob.from_dict(doc))
+            except (TypeError, ValueError) as e:
+                logger.error(f"Skipping invalid stored job {doc.get('id')}: {e}")
+        return jobs
+
+
+def acquire_leader_lock(path: str):
+    """Non-blocking exclusive lock so only one of several worker processes runs
+    the scheduler loop; returns a handle to keep alive, or None if another
+    process holds the lock"""
+    if fcntl is None:
+        return True
+    lock_file = open(path, "a")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+class Scheduler:
+    """Timer-heap scheduler for recurring jobs
+
+    Due times live in a min-heap, so each tick costs O(log n) no matter how
+    many jobs exist. Updated or removed jobs leave their old heap entry
+    behind; a per-job generation number marks it stale and it is dropped
+    when popped.
+
+    A run later than `misfire_grace` (e.g. after downtime) is either run once
+    or skipped, per the job's misfire policy; missed slots are never replayed
+    one by one. `jitter` adds up to that many seconds to each run so jobs
+    sharing a schedule do not all start together, and a job already running
+    `max_concurrency` times skips its slot.
+
+    With a store, jobs are saved on every change and re-read every
+    `sync_interval` seconds so edits made by other server processes apply.
+    """
+
+    def __init__(self, runner: Callable[[ScheduledJob], Dict], store=None,
+                 max_workers: int = 4, sync_interval: float = 30.0):
+        self.runner = runner
+        self.store = store
+        self.sync_interval = sync_interval
+        self.jobs: Dict[str, ScheduledJob] = {}
+        self.stats = {"runs": 0, "failures": 0, "missed": 0, "skipped": 0}
+        self._heap = []
+        self._generations: Dict[str, int] = {}
+        self._running: Dict[str, int] = {}
+        self._counter = 0
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scheduler")
+        self._thread = None
+        self._stopped = False
+        self._next_sync = 0.0
+
+    def _save(self, job: ScheduledJob):
+        if self.store is None:
+            return
+        try:
+            self.store.save(job)
+        except Exception as e:
+            logger.error(f"Could not persist job {job.id}: {e}")
+
+    def _save_state(self, job: ScheduledJob):
+        if self.store is None:
+            return
+        try:
+            self.store.save_state(job)
+        except Exception as e:
+            logger.error(f"Could not persist state of job {job.id}: {e}")
+
+    def _push(self, job: ScheduledJob):
+        """Queue the job's next run; the caller holds the lock"""
+        generation = self._generations[job.id] = self._generations.get(job.id, 0) + 1
+        if not job.enabled or job.next_run is None:
+            return
+        self._counter += 1
+        due = job.next_run + (random.uniform(0, job.jitter) if job.jitter else 0.0)
+        heapq.heappush(self._heap, (due, self._counter, job.id, generation))
+        self._cond.notify()
+
+    def _register(self, job: ScheduledJob, now: float):
+        if job.next_run is None:
+            job.next_run = job.parsed_schedule.next_after(now)
+        self.jobs[job.id] = job
+        self._push(job)
+
+    def add_job(self, job: ScheduledJob) -> ScheduledJob:
+        """Add or replace a job and persist it"""
+        job.updated_at = time.time()
+        with self._cond:
+            self._register(job, time.time())
+        self._save(job)
+        return job
+
+    def _refresh_if_passive(self):
+        # Processes that do not run the loop read the store so they see the leader's jobs
+        if self._thread is None and self.store is not None:
+            self.sync_from_store()
+
+    def remove_job(self, job_id: str) -> bool:
+        self._refresh_if_passive()
+        with self._cond:
+            job = self.jobs.pop(job_id, None)
+            self._generations.pop(job_id, None)
+        if self.store is not None:
+            try:
+                self.store.delete(job_id)
+            except Exception as e:
+                logger.error(f"Could not delete stored job {job_id}: {e}")
+        return job is not None
+
+    def sync_from_store(self):
+        """Pick up jobs added, changed or deleted through the store"""
+        try:
+            stored = {job.id: job for job in self.store.load_all()}
+        except Exception as e:
+            logger.error(f"Could not load scheduled jobs: {e}")
+            return
+        now = time.time()
+        with self._cond:
+            for job_id in set(self.jobs) - set(stored):
+                del self.jobs[job_id]
+                self._generations.pop(job_id, None)
+            for job_id, job in stored.items():
+                current = self.jobs.get(job_id)
+                if current is None or job.updated_at > current.updated_at:
+                    self._register(job, now)
+
+    def _next_nominal(self, job: ScheduledJob, now: float) -> float:
+        next_run = job.parsed_schedule.next_after(job.next_run or now)
+        if next_run <= now:
+            # Coalesce slots missed while the server was down or busy
+            next_run = job.parsed_schedule.next_after(now)
+        return next_run
+
+    def _fire(self, job: ScheduledJob, due: float, now: float):
+        """Start (or skip) one due run and queue the next; the caller holds the lock"""
+        if now - due > job.misfire_grace and job.misfire_policy == "skip":
+            job.missed_runs += 1
+            self.stats["missed"] += 1
+            logger.warning(f"Job '{job.name}' missed its run by {now - due:.0f}s, skipping")
+        elif self._running.get(job.id, 0) >= job.max_concurrency:
+            job.skipped_runs += 1
+            self.stats["skipped"] += 1
+            logger.warning(f"Job '{job.name}' is still running, skipping this run")
+        else:
+            self._start(job)
+        job.next_run = self._next_nominal(job, now)
+        self._push(job)
+
+    def _start(self, job: ScheduledJob):
+        self._running[job.id] = self._running.get(job.id, 0) + 1
+        self._executor.submit(self._run, job)
+
+    def _run(self, job: ScheduledJob):
+        started = time.time()
+        try:
+            result = self.runner(job)
+            success = bool(result.get("success"))
+            error = result.get("error")
+        except Exception as e:
+            logger.error(f"Scheduled job '{job.name}' failed: {e}")
+            success, error = False, str(e)
+
+        with self._cond:
+            self._running[job.id] -= 1
+            # Removed while running: don't write it back
+            still_scheduled = self.jobs.get(job.id) is job
+            job.last_run = started
+            job.run_count += 1
+            job.last_result = {"success": success, "error": error,
+                               "duration": round(time.time() - started, 3)}
+            self.stats["runs"] += 1
+            if not success:
+                self.stats["failures"] += 1
+        if still_scheduled:
+            self._save_state(job)
+
+    def run_now(self, job_id: str) -> bool:
+        """Start a job immediately (outside its schedule), respecting its concurrency limit"""
+        self._refresh_if_passive()
+        with self._cond:
+            job = self.jobs.get(job_id)
+            if job is None or self._running.get(job_id, 0) >= job.max_concurrency:
+                return False
+            self._start(job)
+        return True
+
+    def running(self, job_id: str) -> int:
+        return self._running.get(job_id, 0)
+
+    def list_jobs(self) -> List[ScheduledJob]:
+        self._refresh_if_passive()
+        with self._cond:
+            return sorted(self.jobs.values(), key=lambda job: job.next_run or float("inf"))
+
+    def start(self):
+        if self._thread is not None:
+            return
+        if self.store is not None:
+            self.sync_from_store()
+            self._next_sync = time.time() + self.sync_interval
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._executor.shutdown(wait=False)
+
+    def _loop(self):
+        while True:
+            if self.store is not None and time.time() >= self._next_sync:
+                self._next_sync = time.time() + self.sync_interval
+                self.sync_from_store()
+
+            fired = None
+            with self._cond:
+                if self._stopped:
+                    return
+                now = time.time()
+                if not self._heap or self._heap[0][0] > now:
+                    wakeups = [self._heap[0][0]] if self._heap else []
+                    if self.store is not None:
+                        wakeups.append(self._next_sync)
+                    self._cond.wait(timeout=min(wakeups) - now if wakeups else None)
+                    continue
+                due, _, job_id, generation = heapq.heappop(self._heap)
+                job = self.jobs.get(job_id)
+                if job is not None and self._generations.get(job_id) == generation and job.enabled:
+                    self._fire(job, due, now)
+                    fired = job
+            if fired is not None:
+                self._save_state(fired)
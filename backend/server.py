@@ -2,32 +2,90 @@ import os
 import json
 import subprocess
 import platform
-import tempfile
 import uuid
 import time
 import threading
-from typing import Dict, List, Optional
+import tempfile
+from typing import Dict, List, Optional, Union
 from datetime import datetime, timedelta
 import asyncio
 from pathlib import Path
 
 from fastapi import FastAPI, HTTPException, UploadFile, File, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse, Response
 from pydantic import BaseModel
 from pymongo import MongoClient
+from starlette.concurrency import run_in_threadpool
 import uvicorn
 
-# Import the automation module
-# Check if we're in a headless environment
-try:
-    # Try to import the real automation module
-    from automation import automation
-    print("Using real automation module")
-except Exception as e:
-    # Fall back to mock automation in headless environments
-    print(f"Using mock automation module due to: {e}")
-    from mock_automation import automation
+# Import the automation backend. With AUTOMATION_SOCKET set this process is one
+# of several HTTP workers and the automation daemon owns the input devices;
+# otherwise each capability is served in-process by the real backend when its
+# dependencies load and by the mock otherwise (or as pinned in config)
+from capability_registry import create_automation
+from automation_daemon import RemoteAutomation
+
+AUTOMATION_SOCKET = os.environ.get('AUTOMATION_SOCKET')
+# uvicorn also reads WEB_CONCURRENCY as its default --workers
+HTTP_WORKERS = int(os.environ.get('WEB_CONCURRENCY', 1))
+if AUTOMATION_SOCKET:
+    print(f"Using automation daemon at {AUTOMATION_SOCKET} ({HTTP_WORKERS} HTTP worker(s))")
+    automation = RemoteAutomation(AUTOMATION_SOCKET)
+elif HTTP_WORKERS > 1:
+    # Each worker would own its own mouse, keyboard, hotkeys and dashboard state
+    raise RuntimeError("Running several HTTP workers needs the automation daemon; set AUTOMATION_SOCKET")
+else:
+    automation = create_automation()
+
+# Latency histograms exported at /metrics; automation calls are timed per capability and action
+from prometheus_metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, InstrumentedAutomation, MetricsRegistry
+
+metrics_registry = MetricsRegistry()
+request_seconds = metrics_registry.histogram(
+    "shayak_http_request_duration_seconds", "HTTP request latency by route", ["method", "route", "status"])
+stage_seconds = metrics_registry.histogram(
+    "shayak_stage_duration_seconds", "Time spent in backend hot paths", ["stage"])
+automation_seconds = metrics_registry.histogram(
+    "shayak_automation_duration_seconds", "Automation call latency", ["capability", "action"])
+
+# Opt-in sampling profiler (PROFILING=1, /api/admin/profiling or an X-Profile request header)
+from profiler import SamplingProfiler
+
+profiler = SamplingProfiler(
+    interval=float(os.environ.get('PROFILE_INTERVAL_MS', 5)) / 1000,
+    slow_threshold=float(os.environ.get('PROFILE_SLOW_MS', 500)) / 1000,
+    keep=int(os.environ.get('PROFILE_KEEP', 50))
+)
+profiler.configure(enabled=os.environ.get('PROFILING') == '1')
+
+automation = InstrumentedAutomation(automation, automation_seconds, profiler)
+
+# Request tracing: one trace per HTTP request with a span per stage. Stage spans also
+# feed stage_seconds; TRACE_FILE appends every trace as OTLP/JSON lines
+from tracing import OtlpJsonSink, Tracer, trace_header
+
+def observe_stage(span):
+    if span.trace is None or span.parent_id is not None:
+        stage_seconds.observe(span.duration, stage=span.name)
+
+TRACE_FILE = os.environ.get('TRACE_FILE')
+tracer = Tracer(sink=OtlpJsonSink(TRACE_FILE) if TRACE_FILE else None, on_span_end=observe_stage)
+
+from system_metrics import SystemMetricsSampler
+from state_feed import StateFeed
+from http_cache import CachedResponse, json_response
+from bootstrap import gather_sections, select_sections
+from transcription import get_transcriber
+from event_bus import event_bus, HotkeyPressed, SequenceCompleted, WakeWordDetected, WindowsChanged
+from window_inventory import apply_window_diff
+from local_recognizer import IntentMatcher, SphinxKeywordRecognizer, StaticRecognizer, VoiceIntentRecognizer
+from scheduler import MongoJobStore, ScheduledJob, Scheduler, acquire_leader_lock
+from job_queue import JobQueue, QueueFull
+from output_spool import OutputSpool
+from history_store import HistoryStore
+from history_search import HistorySearch
+from analytics import AnalyticsRollup, parse_time
 
 # Initialize FastAPI app
 app = FastAPI(title="Shayak AI Assistant", version="1.0.0")
@@ -41,6 +99,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def instrument_request(request: Request, call_next):
+    """Trace the request and record its latency
+
+    Send `X-Trace: 1` to get the span breakdown back in an X-Trace header, and
+    `X-Profile: 1` to profile the request's handler and automation calls (their
+    profile ids come back in X-Profile-Ids; see /api/admin/profiling).
+    """
+    profile_token = profiler.request_profiling() if request.headers.get("x-profile") else None
+    try:
+        with tracer.trace(f"{request.method} {request.url.path}") as root:
+            response = await call_next(request)
+            # The route template, not the raw path, so ids in URLs don't create new series
+            route = request.scope.get("route")
+            route_path = route.path if route is not None else "unmatched"
+            root.name = f"{request.method} {route_path}"
+            root.set(status=response.status_code)
+    finally:
+        profile_ids = profiler.end_request_profiling(profile_token) if profile_token else None
+    request_seconds.observe(root.duration, method=request.method, route=route_path,
+                            status=response.status_code)
+    response.headers["X-Trace-Id"] = root.trace.trace_id
+    if request.headers.get("x-trace"):
+        response.headers["X-Trace"] = trace_header(root)
+    if profile_ids:
+        response.headers["X-Profile-Ids"] = ",".join(profile_ids)
+    return response
+
 # MongoDB connection
 try:
     mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017/')
@@ -50,31 +136,200 @@ try:
     history_collection = db.command_history
     batch_collection = db.batch_commands
     automation_collection = db.automation_tasks
+    scheduled_jobs_collection = db.scheduled_jobs
+    output_blobs_collection = db.output_blobs
+    command_rollups_collection = db.command_rollups
+    analytics_collection = db.analytics_buckets
     print(f"Connected to MongoDB at {mongo_url}")
 except Exception as e:
     print(f"MongoDB connection failed: {e}")
 
-# Global task scheduler
-scheduled_tasks = {}
+# Global task scheduler; scheduled_tasks maps job id -> ScheduledJob
+scheduler = Scheduler(lambda job: run_scheduled_job(job), store=MongoJobStore(scheduled_jobs_collection))
+scheduled_tasks = scheduler.jobs
+
+# Shared queue for command, batch and sequence execution. Sequences drive the
+# mouse and keyboard, so the "sequence" lane runs only one at a time.
+# Each HTTP worker has its own queue, so the per-user limits are split between
+# them (at least one job each); across workers the daemon still runs one
+# device call at a time.
+def per_worker_limit(total: int) -> int:
+    return max(1, total // HTTP_WORKERS)
+
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 4))
+job_queue = JobQueue(
+    workers=JOB_WORKERS,
+    max_queued=int(os.environ.get('JOB_QUEUE_SIZE', 200)),
+    max_queued_per_user=per_worker_limit(int(os.environ.get('JOB_QUEUE_PER_USER', 50))),
+    max_running_per_user=per_worker_limit(int(os.environ.get('JOB_RUNNING_PER_USER', max(1, JOB_WORKERS // 2)))),
+    lanes={"sequence": 1}
+)
+
+# 'high' is reserved for hotkey and wake-word dispatch, which has someone waiting at the keyboard
+CLIENT_PRIORITIES = ("normal", "low")
+
+# Command output beyond the inline limit is spilled to compressed blobs (see /api/outputs)
+output_spool = OutputSpool(
+    os.environ.get('OUTPUT_SPOOL_DIR', 'outputs'),
+    inline_limit=int(os.environ.get('OUTPUT_INLINE_LIMIT', 16 * 1024))
+)
+output_spool.start_pruning(float(os.environ.get('OUTPUT_RETENTION_DAYS', 30)) * 86400)
+
+# Command/batch history; 'dedup' stores each distinct output once, compressed
+history_store = HistoryStore(
+    commands_collection,
+    batch_collection,
+    output_blobs_collection,
+    command_rollups_collection,
+    mode=os.environ.get('HISTORY_STORAGE', 'dedup'),
+    retention_days=int(os.environ.get('HISTORY_RETENTION_DAYS', 90)),
+    rollup_after_days=int(os.environ.get('HISTORY_ROLLUP_DAYS', 30))
+)
+
+# Full-text history search: MongoDB text indexes, or an in-process index with HISTORY_SEARCH=local
+history_search = HistorySearch(commands_collection, history_collection,
+                               mode=os.environ.get('HISTORY_SEARCH', 'mongo'))
+
+# Hourly run counts, success rates and latency histograms behind /api/analytics
+analytics = AnalyticsRollup(analytics_collection,
+                            retention_days=int(os.environ.get('ANALYTICS_RETENTION_DAYS', 365)))
+
+# Background system metrics sampler
+metrics_sampler = SystemMetricsSampler(interval=float(os.environ.get('METRICS_INTERVAL', 2.0)))
+
+# Dashboard state pushed to clients over /api/state/stream. Each worker keeps
+# its own copy; changes clients make go through share_state() so every worker's
+# copy (and every SSE client) sees them. Health and metrics describe this host
+# and are published locally by each worker.
+state_feed = StateFeed()
+RECENT_HISTORY_SIZE = 10
+
+def compact_metrics(snapshot: Dict) -> Dict:
+    """The subset of a metrics snapshot the dashboard needs"""
+    return {
+        "cpu": snapshot["cpu"]["percent"],
+        "memory": snapshot["memory"]["percent"],
+        "disk": snapshot["disk"]["percent"],
+        "uptime_seconds": snapshot["uptime_seconds"],
+        "timestamp": snapshot["timestamp"]
+    }
+
+# Command output can be large; feed rows leave it out and clients fetch it by output_id
+FEED_ROW_EXCLUDED = {"_id", "output", "error"}
+
+def feed_row(doc: Dict) -> Dict:
+    """A history row (command or batch) without _id or command output, for the state feed"""
+    row = {k: v for k, v in doc.items() if k not in FEED_ROW_EXCLUDED}
+    if "results" in row:
+        row["results"] = [{k: v for k, v in result.items() if k not in FEED_ROW_EXCLUDED}
+                          for result in row["results"]]
+    return row
+
+def apply_state_change(change: Dict):
+    """Apply a state change from share_state() to this worker's feed"""
+    if change.get("limit"):
+        state_feed.prepend(change["section"], change["value"], change["limit"])
+    else:
+        state_feed.publish(change["section"], change["value"])
+
+def share_state(section: str, value, limit: Optional[int] = None):
+    """Update a feed section on every worker; with `limit`, prepend value to a list section
+
+    With the automation daemon the change is relayed through it; if the
+    daemon can't be reached only this worker's feed is updated.
+    """
+    change = {"section": section, "value": value, "limit": limit}
+    if AUTOMATION_SOCKET:
+        try:
+            automation.broadcast(change)
+            return
+        except (OSError, RuntimeError) as e:
+            print(f"State broadcast failed, updating this worker only: {e}")
+    apply_state_change(change)
+
+def publish_recent_row(section: str, doc: Dict):
+    """Push a freshly stored history row to the state feed"""
+    share_state(section, feed_row(doc), limit=RECENT_HISTORY_SIZE)
+
+def read_automation_status() -> Optional[Dict]:
+    try:
+        return {
+            "wake_word_active": automation.wake_word_active,
+            "screen_size": {
+                "width": automation.screen_width,
+                "height": automation.screen_height
+            }
+        }
+    except Exception as e:
+        print(f"Automation status unavailable: {e}")
+        return None
+
+def publish_automation_status():
+    status = read_automation_status()
+    if status is not None:
+        share_state("automation", status)
+
+def read_analytics_totals() -> Optional[Dict]:
+    """The last 24 hours' run totals"""
+    try:
+        return analytics.summary(top=0)["totals"]
+    except Exception as db_error:
+        print(f"Database error: {db_error}")
+        return None
+
+def publish_analytics():
+    totals = read_analytics_totals()
+    if totals is not None:
+        share_state("analytics", totals)
+
+def load_recent_history():
+    """Seed the feed's recent history sections from MongoDB"""
+    try:
+        state_feed.publish("recent_commands",
+                           [feed_row(row) for row in history_store.recent_commands(limit=RECENT_HISTORY_SIZE)])
+        state_feed.publish("recent_batches",
+                           [feed_row(row) for row in history_store.recent_batches(limit=RECENT_HISTORY_SIZE)])
+    except Exception as db_error:
+        print(f"Database error: {db_error}")
+
+@app.on_event("startup")
+async def start_metrics_sampler():
+    state_feed.attach(asyncio.get_running_loop())
+    state_feed.publish("health", HEALTH_RESPONSE.payload)
+    # Seed this worker's copy directly; later changes arrive through share_state()
+    status = await run_in_threadpool(read_automation_status)
+    if status is not None:
+        state_feed.publish("automation", status)
+    await asyncio.get_running_loop().run_in_executor(None, load_recent_history)
+    metrics_sampler.subscribe(lambda snapshot: state_feed.publish("metrics", compact_metrics(snapshot)))
+    metrics_sampler.start()
+    totals = await asyncio.get_running_loop().run_in_executor(None, read_analytics_totals)
+    if totals is not None:
+        state_feed.publish("analytics", totals)
+    analytics.start_flushing(float(os.environ.get('ANALYTICS_FLUSH_INTERVAL', 10.0)), on_flush=publish_analytics)
 
 # Pydantic models
 class CommandRequest(BaseModel):
     command: str
     user_id: str = "default"
+    priority: str = "normal"  # 'normal' or 'low' on the job queue
 
 class BatchCommandRequest(BaseModel):
     commands: List[str]
     name: str = "Batch Command"
     user_id: str = "default"
+    priority: str = "normal"
 
 class AutomationSequenceRequest(BaseModel):
     sequence: List[Dict]
     name: str = "Automation Sequence"
     user_id: str = "default"
+    priority: str = "normal"
 
 class ScreenshotRequest(BaseModel):
-    region: Optional[Dict] = None
+    region: Optional[Dict] = None  # Relative to the window when window_title is set
     filename: Optional[str] = None
+    window_title: Optional[str] = None
 
 class ClickRequest(BaseModel):
     x: int
@@ -86,6 +341,7 @@ class ClickImageRequest(BaseModel):
     template_image: str  # Base64 encoded image or file path
     confidence: float = 0.8
     double_click: bool = False
+    window_title: Optional[str] = None
 
 class TypeTextRequest(BaseModel):
     text: str
@@ -94,15 +350,29 @@ class TypeTextRequest(BaseModel):
 class KeyPressRequest(BaseModel):
     key_combination: str
 
+class BulkInputRequest(BaseModel):
+    items: List[Union[str, Dict]]  # Text strings or {"text": ...} / {"key": "ctrl+s"}
+    use_clipboard: bool = True
+    min_interval: float = 0.0
+
 class ScrollRequest(BaseModel):
     direction: str
     amount: int = 3
     x: Optional[int] = None
     y: Optional[int] = None
 
+class GestureRequest(BaseModel):
+    points: List[Union[Dict, List[float]]]  # {"x": .., "y": ..} or [x, y]
+    path_type: str = "polyline"  # polyline or bezier
+    duration: float = 0.5
+    sample_rate: int = 60
+    fast: bool = False
+    button: str = "left"
+
 class OCRRequest(BaseModel):
-    region: Optional[Dict] = None
+    region: Optional[Dict] = None  # Relative to the window when window_title is set
     lang: str = "eng"
+    window_title: Optional[str] = None
 
 class WindowRequest(BaseModel):
     window_title: str
@@ -111,6 +381,7 @@ class WaitForImageRequest(BaseModel):
     template_image: str
     timeout: int = 10
     confidence: float = 0.8
+    window_title: Optional[str] = None
 
 class HotkeyRequest(BaseModel):
     key_combination: str
@@ -118,12 +389,31 @@ class HotkeyRequest(BaseModel):
 
 class WakeWordRequest(BaseModel):
     wake_word: str = "shayak"
+    action: Optional[str] = None  # 'template:<name>' or 'sequence:<id>' to run on detection
 
 class CommandExecutionRequest(BaseModel):
     natural_language: str
     user_id: str = "default"
     confirm: bool = False
 
+class ProfilingRequest(BaseModel):
+    enabled: Optional[bool] = None
+    slow_ms: Optional[float] = None  # keep calls at least this slow
+    interval_ms: Optional[float] = None  # sampling interval
+    keep: Optional[int] = None  # how many slow calls to keep
+
+class ScheduleRequest(BaseModel):
+    name: str
+    schedule: str  # 'every 10m', '@daily' or a cron expression like '0 9 * * 1-5'
+    action: str  # 'template:<name>', 'sequence:<id>' or 'batch'
+    commands: List[str] = []  # For 'batch'
+    user_id: str = "default"
+    max_concurrency: int = 1
+    jitter: float = 0.0  # Up to this many seconds added to each run
+    misfire_policy: str = "run_once"  # or 'skip' for runs missed by more than misfire_grace
+    misfire_grace: float = 60.0
+    enabled: bool = True
+
 # Safe command whitelist for Windows/Linux
 SAFE_WINDOWS_COMMANDS = {
     # File management
@@ -232,6 +522,7 @@ DANGEROUS_PATTERNS = [
     ':(){ :|:& };:', 'killall', 'reboot', 'halt', 'poweroff'
 ]
 
+@tracer.traced("safety_check")
 def is_command_safe(command: str) -> tuple[bool, str]:
     """Check if a command is safe to execute"""
     command_lower = command.lower().strip()
@@ -256,6 +547,7 @@ def is_command_safe(command: str) -> tuple[bool, str]:
     
     return True, "Command is safe"
 
+@tracer.traced("execute")
 def execute_system_command(command: str) -> Dict:
     """Execute a system command safely"""
     try:
@@ -270,21 +562,32 @@ def execute_system_command(command: str) -> Dict:
                 "timestamp": datetime.now().isoformat()
             }
         
-        # Execute the command
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=30  # 30 second timeout
-        )
+        # Execute the command, writing output to temp files rather than memory
+        with tempfile.TemporaryFile() as stdout_file, tempfile.TemporaryFile() as stderr_file, \
+                tracer.span("command"):
+            result = subprocess.run(
+                command,
+                shell=True,
+                stdout=stdout_file,
+                stderr=stderr_file,
+                timeout=30  # 30 second timeout
+            )
+            stdout = output_spool.spool(stdout_file)
+            stderr = output_spool.spool(stderr_file)
         
         return {
             "success": result.returncode == 0,
-            "output": result.stdout,
-            "error": result.stderr,
+            "output": stdout["text"],
+            "error": stderr["text"],
             "return_code": result.returncode,
             "command": command,
+            # Full output of a truncated stream is at /api/outputs/<id>
+            "output_size": stdout["size"],
+            "output_truncated": stdout["truncated"],
+            "output_id": stdout["output_id"],
+            "error_size": stderr["size"],
+            "error_truncated": stderr["truncated"],
+            "error_id": stderr["output_id"],
             "timestamp": datetime.now().isoformat()
         }
         
@@ -305,70 +608,93 @@ def execute_system_command(command: str) -> Dict:
             "timestamp": datetime.now().isoformat()
         }
 
+# Common natural language -> command mappings, shared by the mock interpreter
+# and the local voice intent recognizer
+COMMAND_INTERPRETATIONS = {
+    'show me the files': 'ls -la',
+    'list files': 'ls -la',
+    'show files': 'ls -la',
+    'what files are here': 'ls -la',
+    'list directory': 'ls -la',
+    'show directory': 'ls -la',
+    
+    'what time is it': 'date',
+    'current time': 'date',
+    'show time': 'date',
+    'time': 'date',
+    'date': 'date',
+    
+    'who am i': 'whoami',
+    'current user': 'whoami',
+    'show user': 'whoami',
+    
+    'where am i': 'pwd',
+    'current directory': 'pwd',
+    'show current directory': 'pwd',
+    'working directory': 'pwd',
+    
+    'system info': 'uname -a',
+    'system information': 'uname -a',
+    'show system info': 'uname -a',
+    
+    'show processes': 'ps aux',
+    'running processes': 'ps aux',
+    'list processes': 'ps aux',
+    'tasks': 'ps aux',
+    
+    'network info': 'ifconfig',
+    'network information': 'ifconfig',
+    'show network': 'ifconfig',
+    'ip address': 'ifconfig',
+    
+    'disk space': 'df -h',
+    'disk usage': 'df -h',
+    'show disk': 'df -h',
+    'free space': 'df -h',
+    
+    'memory usage': 'free -h',
+    'memory info': 'free -h',
+    'show memory': 'free -h',
+    'ram usage': 'free -h',
+    
+    'system uptime': 'uptime',
+    'uptime': 'uptime',
+    'how long running': 'uptime',
+    
+    'clear screen': 'clear',
+    'clear': 'clear',
+    'cls': 'clear',
+    
+    'ping google': 'ping -c 4 google.com',
+    'test internet': 'ping -c 4 google.com',
+    'check connection': 'ping -c 4 google.com',
+}
+
+def build_voice_intent_recognizer() -> VoiceIntentRecognizer:
+    """Local recognizer over the known intent vocabulary (LOCAL_RECOGNIZER=sphinx|none)"""
+    matcher = IntentMatcher(COMMAND_INTERPRETATIONS)
+    if os.environ.get('LOCAL_RECOGNIZER', 'sphinx') == 'sphinx':
+        # Builds its decoder on first use; if that fails, requests take the remote path
+        recognizer = SphinxKeywordRecognizer(matcher.vocabulary)
+    else:
+        # Never recognizes anything, so every request takes the remote path
+        recognizer = StaticRecognizer()
+    return VoiceIntentRecognizer(recognizer, matcher)
+
+voice_intent_recognizer = build_voice_intent_recognizer()
+
+@app.on_event("startup")
+async def warm_voice_intent_recognizer():
+    # Load the speech model on a background thread so start-up and /api/health don't wait for it
+    warm = getattr(voice_intent_recognizer.recognizer, "warm", None)
+    if warm is not None:
+        threading.Thread(target=warm, name="voice-recognizer-warmup", daemon=True).start()
+
 def mock_interpret_command(natural_language: str) -> Dict:
     """Mock AI interpretation for common commands when OpenAI is not available"""
     nl_lower = natural_language.lower().strip()
     
-    # Common command mappings
-    interpretations = {
-        'show me the files': 'ls -la',
-        'list files': 'ls -la',
-        'show files': 'ls -la',
-        'what files are here': 'ls -la',
-        'list directory': 'ls -la',
-        'show directory': 'ls -la',
-        
-        'what time is it': 'date',
-        'current time': 'date',
-        'show time': 'date',
-        'time': 'date',
-        'date': 'date',
-        
-        'who am i': 'whoami',
-        'current user': 'whoami',
-        'show user': 'whoami',
-        
-        'where am i': 'pwd',
-        'current directory': 'pwd',
-        'show current directory': 'pwd',
-        'working directory': 'pwd',
-        
-        'system info': 'uname -a',
-        'system information': 'uname -a',
-        'show system info': 'uname -a',
-        
-        'show processes': 'ps aux',
-        'running processes': 'ps aux',
-        'list processes': 'ps aux',
-        'tasks': 'ps aux',
-        
-        'network info': 'ifconfig',
-        'network information': 'ifconfig',
-        'show network': 'ifconfig',
-        'ip address': 'ifconfig',
-        
-        'disk space': 'df -h',
-        'disk usage': 'df -h',
-        'show disk': 'df -h',
-        'free space': 'df -h',
-        
-        'memory usage': 'free -h',
-        'memory info': 'free -h',
-        'show memory': 'free -h',
-        'ram usage': 'free -h',
-        
-        'system uptime': 'uptime',
-        'uptime': 'uptime',
-        'how long running': 'uptime',
-        
-        'clear screen': 'clear',
-        'clear': 'clear',
-        'cls': 'clear',
-        
-        'ping google': 'ping -c 4 google.com',
-        'test internet': 'ping -c 4 google.com',
-        'check connection': 'ping -c 4 google.com',
-    }
+    interpretations = COMMAND_INTERPRETATIONS
     
     # Direct mapping
     if nl_lower in interpretations:
@@ -416,6 +742,7 @@ def mock_interpret_command(natural_language: str) -> Dict:
         "method": "mock_ai"
     }
 
+@tracer.traced("interpret")
 def interpret_natural_language_to_command(natural_language: str) -> Dict:
     """Use GPT or mock AI to convert natural language to commands"""
     try:
@@ -446,15 +773,16 @@ Examples:
 
 User request: """ + natural_language
 
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": natural_language}
-            ],
-            max_tokens=150,
-            temperature=0.3
-        )
+        with tracer.span("llm"):
+            response = client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": natural_language}
+                ],
+                max_tokens=150,
+                temperature=0.3
+            )
         
         command = response.choices[0].message.content.strip()
         
@@ -479,8 +807,7 @@ User request: """ + natural_language
 async def root():
     return {"message": "Shayak AI Assistant Backend is running"}
 
-@app.get("/api/health")
-async def health_check():
+def build_health_status() -> Dict:
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
@@ -494,36 +821,35 @@ async def health_check():
         }
     }
 
+# Health info is static for the life of the process, so it is served from a
+# precomputed body; its timestamp is the time the body was built
+HEALTH_RESPONSE = CachedResponse(build_health_status)
+
+@app.get("/api/health")
+async def health_check(request: Request):
+    return HEALTH_RESPONSE.respond(request)
+
 @app.post("/api/transcribe-voice")
-async def transcribe_voice(file: UploadFile = File(...)):
-    """Transcribe voice using OpenAI Whisper"""
+async def transcribe_voice(file: UploadFile = File(...), backend: Optional[str] = None):
+    """Transcribe voice with the configured transcriber backend (Whisper by default)
+
+    The upload's spooled buffer is streamed straight to the backend in the
+    threadpool, so nothing is copied to a temp file or blocks the event loop.
+    """
     try:
-        from openai import OpenAI
+        transcriber = get_transcriber(backend)
+        start_time = time.perf_counter()
         
-        client = OpenAI(
-            api_key=os.environ.get('OPENAI_API_KEY', 'sk-svcacct-xgoMM56QqYTdn0kcH46aT3BlbkFJJ5dEMVrwoNjH2IgkGIfA')
+        await file.seek(0)
+        transcript = await run_in_threadpool(
+            transcriber.transcribe, file.file, file.filename or "audio.wav"
         )
         
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_file_path = tmp_file.name
-        
-        # Transcribe using OpenAI Whisper
-        with open(tmp_file_path, "rb") as audio_file:
-            transcript = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                response_format="text"
-            )
-        
-        # Clean up temporary file
-        os.unlink(tmp_file_path)
-        
         return {
             "success": True,
             "transcription": transcript,
+            "backend": transcriber.name,
+            "duration": round(time.perf_counter() - start_time, 3),
             "timestamp": datetime.now().isoformat()
         }
         
@@ -533,6 +859,8 @@ async def transcribe_voice(file: UploadFile = File(...)):
             "error": str(e),
             "timestamp": datetime.now().isoformat()
         }
+    finally:
+        await file.close()
 
 @app.post("/api/interpret-command")
 async def interpret_command(request: CommandExecutionRequest):
@@ -552,9 +880,11 @@ async def interpret_command(request: CommandExecutionRequest):
         }
         
         try:
-            history_collection.insert_one(interpretation_doc)
+            with tracer.span("db_write"):
+                history_collection.insert_one(interpretation_doc)
         except Exception as db_error:
             print(f"Database error: {db_error}")
+        history_search.index(interpretation_doc, "interpretation")
         
         return result
         
@@ -565,30 +895,73 @@ async def interpret_command(request: CommandExecutionRequest):
             "timestamp": datetime.now().isoformat()
         }
 
+async def run_queued(fn, *args, user_id: str, priority: str = "normal", lane: Optional[str] = None) -> Dict:
+    """Run fn on the job queue and attach its queue/run timing to the result
+
+    Raises QueueFull when admission control rejects the job.
+    """
+    result, timing = await asyncio.wrap_future(
+        job_queue.submit(fn, *args, user_id=user_id, priority=priority, lane=lane)
+    )
+    result["job"] = dict(timing, priority=priority)
+    return result
+
+def check_client_priority(priority: str):
+    if priority not in CLIENT_PRIORITIES:
+        raise ValueError(f"Priority must be one of {list(CLIENT_PRIORITIES)}")
+
+def queue_full_response(error: QueueFull) -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        headers={"Retry-After": str(error.retry_after)},
+        content={
+            "success": False,
+            "error": str(error),
+            "retry_after": error.retry_after,
+            "timestamp": datetime.now().isoformat()
+        }
+    )
+
+@profiler.profiled()
+def run_command(command: str, user_id: str) -> Dict:
+    """Execute a command, then store and publish the result"""
+    started = time.perf_counter()
+    result = execute_system_command(command)
+    analytics.record("command", user_id, command, result["success"], time.perf_counter() - started)
+    
+    # Store execution result in database
+    execution_doc = {
+        "id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "command": command,
+        "success": result["success"],
+        "output": result.get("output", ""),
+        "error": result.get("error", ""),
+        "output_id": result.get("output_id"),
+        "error_id": result.get("error_id"),
+        "timestamp": datetime.now().isoformat()
+    }
+    
+    try:
+        with tracer.span("db_write"):
+            history_store.insert_command(execution_doc)
+    except Exception as db_error:
+        print(f"Database error: {db_error}")
+    history_search.index(execution_doc, "command")
+    publish_recent_row("recent_commands", execution_doc)
+    
+    return result
+
 @app.post("/api/execute-command")
 async def execute_command(request: CommandRequest):
     """Execute a system command safely"""
     try:
-        result = execute_system_command(request.command)
-        
-        # Store execution result in database
-        execution_doc = {
-            "id": str(uuid.uuid4()),
-            "user_id": request.user_id,
-            "command": request.command,
-            "success": result["success"],
-            "output": result.get("output", ""),
-            "error": result.get("error", ""),
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        try:
-            commands_collection.insert_one(execution_doc)
-        except Exception as db_error:
-            print(f"Database error: {db_error}")
-        
-        return result
+        check_client_priority(request.priority)
+        return await run_queued(run_command, request.command, request.user_id,
+                                user_id=request.user_id, priority=request.priority)
         
+    except QueueFull as e:
+        return queue_full_response(e)
     except Exception as e:
         return {
             "success": False,
@@ -596,54 +969,115 @@ async def execute_command(request: CommandRequest):
             "timestamp": datetime.now().isoformat()
         }
 
+@profiler.profiled()
+def run_batch(commands: List[str], name: str, user_id: str) -> Dict:
+    """Execute commands in order, then store and publish the batch"""
+    results = []
+    total_success = 0
+    
+    for i, command in enumerate(commands):
+        print(f"Executing batch command {i+1}/{len(commands)}: {command}")
+        started = time.perf_counter()
+        result = execute_system_command(command)
+        analytics.record("command", user_id, command, result["success"], time.perf_counter() - started)
+        results.append(result)
+        
+        if result["success"]:
+            total_success += 1
+        
+        # Add a small delay between commands
+        time.sleep(0.1)
+    
+    # Store batch execution in database
+    batch_doc = {
+        "id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "name": name,
+        "commands": commands,
+        "results": results,
+        "total_commands": len(commands),
+        "successful_commands": total_success,
+        "timestamp": datetime.now().isoformat()
+    }
+    
+    try:
+        with tracer.span("db_write"):
+            history_store.insert_batch(batch_doc)
+    except Exception as db_error:
+        print(f"Database error: {db_error}")
+    publish_recent_row("recent_batches", batch_doc)
+    
+    return {
+        "success": True,
+        "batch_name": name,
+        "total_commands": len(commands),
+        "successful_commands": total_success,
+        "results": results,
+        "timestamp": datetime.now().isoformat()
+    }
+
 @app.post("/api/batch-execute")
 async def batch_execute(request: BatchCommandRequest):
     """Execute multiple commands in batch"""
     try:
-        results = []
-        total_success = 0
+        check_client_priority(request.priority)
+        return await run_queued(run_batch, request.commands, request.name, request.user_id,
+                                user_id=request.user_id, priority=request.priority)
         
-        for i, command in enumerate(request.commands):
-            print(f"Executing batch command {i+1}/{len(request.commands)}: {command}")
-            result = execute_system_command(command)
-            results.append(result)
-            
-            if result["success"]:
-                total_success += 1
-            
-            # Add a small delay between commands
-            await asyncio.sleep(0.1)
-        
-        # Store batch execution in database
-        batch_doc = {
-            "id": str(uuid.uuid4()),
-            "user_id": request.user_id,
-            "name": request.name,
-            "commands": request.commands,
-            "results": results,
-            "total_commands": len(request.commands),
-            "successful_commands": total_success,
+    except QueueFull as e:
+        return queue_full_response(e)
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
             "timestamp": datetime.now().isoformat()
         }
-        
-        try:
-            batch_collection.insert_one(batch_doc)
-        except Exception as db_error:
-            print(f"Database error: {db_error}")
-        
+
+@profiler.profiled()
+def run_voice_pipeline(natural_language: str, confirm: bool, user_id: str = "default",
+                       interpretation: Optional[Dict] = None, always_confirm: bool = False) -> Dict:
+    """Interpret (unless an interpretation is supplied) and execute a voice command
+
+    With always_confirm, even safe commands stop at the confirmation stage.
+    Runs on the job queue; an executed command is stored and counted like
+    one from /api/execute-command.
+    """
+    # Step 1: Interpret natural language
+    if interpretation is None:
+        interpretation = interpret_natural_language_to_command(natural_language)
+    
+    if not interpretation["success"]:
         return {
-            "success": True,
-            "batch_name": request.name,
-            "total_commands": len(request.commands),
-            "successful_commands": total_success,
-            "results": results,
+            "success": False,
+            "stage": "interpretation",
+            "error": interpretation.get("error", "Failed to interpret command"),
+            "natural_language": natural_language,
             "timestamp": datetime.now().isoformat()
         }
+    
+    command = interpretation["command"]
+    
+    # Step 2: Execute command (if confirmed or safe)
+    if confirm or (not always_confirm and is_command_safe(command)[0]):
+        execution = run_command(command, user_id)
         
-    except Exception as e:
+        return {
+            "success": execution["success"],
+            "stage": "execution",
+            "natural_language": natural_language,
+            "interpreted_command": command,
+            "output": execution.get("output", ""),
+            "error": execution.get("error", ""),
+            "method": interpretation.get("method", "unknown"),
+            "timestamp": datetime.now().isoformat()
+        }
+    else:
         return {
             "success": False,
-            "error": str(e),
+            "stage": "confirmation",
+            "natural_language": natural_language,
+            "interpreted_command": command,
+            "message": "Command requires confirmation before execution",
             "timestamp": datetime.now().isoformat()
         }
 
@@ -651,61 +1085,73 @@ async def batch_execute(request: BatchCommandRequest):
 async def voice_command(request: CommandExecutionRequest):
     """Complete voice command pipeline: interpret + execute"""
     try:
-        # Step 1: Interpret natural language
-        interpretation = interpret_natural_language_to_command(request.natural_language)
-        
-        if not interpretation["success"]:
-            return {
-                "success": False,
-                "stage": "interpretation",
-                "error": interpretation.get("error", "Failed to interpret command"),
-                "natural_language": request.natural_language,
-                "timestamp": datetime.now().isoformat()
-            }
+        return await run_queued(run_voice_pipeline, request.natural_language, request.confirm, request.user_id,
+                                user_id=request.user_id)
+            
+    except QueueFull as e:
+        return queue_full_response(e)
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        }
+
+@app.post("/api/voice-command/audio")
+async def voice_command_audio(file: UploadFile = File(...), confirm: bool = False, user_id: str = "default"):
+    """Audio straight to execution: local intent recognition, remote fallback
+
+    Known phrases are recognized offline and mapped to a command without any
+    network hop; anything else goes through transcription + interpretation.
+    Keyword spotting can mishear, so a local match is never executed here:
+    it comes back at the confirmation stage whatever `confirm` says, and the
+    client runs the interpreted command once the user has confirmed it.
+    """
+    try:
+        start_time = time.perf_counter()
         
-        command = interpretation["command"]
+        await file.seek(0)
+        local = await run_in_threadpool(voice_intent_recognizer.recognize_intent, file.file)
         
-        # Step 2: Execute command (if confirmed or safe)
-        if request.confirm or is_command_safe(command)[0]:
-            execution = execute_system_command(command)
-            
-            return {
-                "success": execution["success"],
-                "stage": "execution",
-                "natural_language": request.natural_language,
-                "interpreted_command": command,
-                "output": execution.get("output", ""),
-                "error": execution.get("error", ""),
-                "method": interpretation.get("method", "unknown"),
-                "timestamp": datetime.now().isoformat()
+        if local["success"]:
+            natural_language = local["text"]
+            interpretation = {
+                "success": True,
+                "command": local["command"],
+                "method": local["method"]
             }
         else:
-            return {
-                "success": False,
-                "stage": "confirmation",
-                "natural_language": request.natural_language,
-                "interpreted_command": command,
-                "message": "Command requires confirmation before execution",
-                "timestamp": datetime.now().isoformat()
-            }
-            
+            # Fall back to the remote path
+            await file.seek(0)
+            transcriber = get_transcriber()
+            natural_language = await run_in_threadpool(
+                transcriber.transcribe, file.file, file.filename or "audio.wav"
+            )
+            interpretation = None
+        
+        # A local match always waits for the user to confirm it
+        result = await run_queued(run_voice_pipeline, natural_language, confirm and not local["success"], user_id,
+                                  interpretation, local["success"], user_id=user_id)
+        result["recognition"] = "local" if local["success"] else "remote"
+        result["duration"] = round(time.perf_counter() - start_time, 3)
+        return result
+        
+    except QueueFull as e:
+        return queue_full_response(e)
     except Exception as e:
         return {
             "success": False,
             "error": str(e),
             "timestamp": datetime.now().isoformat()
         }
+    finally:
+        await file.close()
 
 @app.get("/api/command-history")
-async def get_command_history(user_id: str = "default", limit: int = 50):
+def get_command_history(user_id: str = "default", limit: int = 50):
     """Get command execution history"""
     try:
-        history = list(
-            commands_collection.find(
-                {"user_id": user_id},
-                {"_id": 0}
-            ).sort("timestamp", -1).limit(limit)
-        )
+        history = history_store.recent_commands(user_id, limit)
         
         return {
             "success": True,
@@ -721,16 +1167,58 @@ async def get_command_history(user_id: str = "default", limit: int = 50):
             "timestamp": datetime.now().isoformat()
         }
 
+@app.on_event("startup")
+async def load_history_search_index():
+    try:
+        await run_in_threadpool(history_search.load_local_index)
+    except Exception as db_error:
+        print(f"Database error: {db_error}")
+
+@app.get("/api/history/search")
+def search_history(q: str, user_id: str = "default", since: Optional[str] = None, until: Optional[str] = None,
+                   success: Optional[bool] = None, kind: Optional[str] = None, limit: int = 50):
+    """Full-text search over executed commands and interpreted requests
+
+    since/until are ISO timestamps (with or without a Z or offset); kind is
+    'command' or 'interpretation' (default both).
+    """
+    try:
+        kinds = [kind] if kind else ["command", "interpretation"]
+        if not set(kinds) <= set(history_search.collections):
+            return {
+                "success": False,
+                "error": f"Unknown kind '{kind}'",
+                "timestamp": datetime.now().isoformat()
+            }
+        
+        # Stored timestamps are naive local ISO strings, so bounds are compared in that form
+        since = parse_time(since).isoformat() if since else None
+        until = parse_time(until).isoformat() if until else None
+        started = time.perf_counter()
+        results = history_search.search(q, user_id, since=since, until=until, success=success,
+                                        kinds=kinds, limit=min(limit, 500))
+        return {
+            "success": True,
+            "query": q,
+            "results": results,
+            "count": len(results),
+            "search_mode": history_search.mode,
+            "duration": round(time.perf_counter() - started, 4),
+            "timestamp": datetime.now().isoformat()
+        }
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        }
+
 @app.get("/api/batch-history")
-async def get_batch_history(user_id: str = "default", limit: int = 20):
+def get_batch_history(user_id: str = "default", limit: int = 20):
     """Get batch execution history"""
     try:
-        history = list(
-            batch_collection.find(
-                {"user_id": user_id},
-                {"_id": 0}
-            ).sort("timestamp", -1).limit(limit)
-        )
+        history = history_store.recent_batches(user_id, limit)
         
         return {
             "success": True,
@@ -746,9 +1234,7 @@ async def get_batch_history(user_id: str = "default", limit: int = 20):
             "timestamp": datetime.now().isoformat()
         }
 
-@app.get("/api/automation-templates")
-async def get_automation_templates():
-    """Get automation command templates"""
+def build_automation_templates() -> Dict:
     return {
         "success": True,
         "templates": AUTOMATION_TEMPLATES,
@@ -756,8 +1242,15 @@ async def get_automation_templates():
         "timestamp": datetime.now().isoformat()
     }
 
+AUTOMATION_TEMPLATES_RESPONSE = CachedResponse(build_automation_templates, max_age=60)
+
+@app.get("/api/automation-templates")
+async def get_automation_templates(request: Request):
+    """Get automation command templates"""
+    return AUTOMATION_TEMPLATES_RESPONSE.respond(request)
+
 @app.post("/api/execute-template")
-async def execute_template(template_name: str, user_id: str = "default"):
+async def execute_template(template_name: str, user_id: str = "default", priority: str = "normal"):
     """Execute an automation template"""
     try:
         if template_name not in AUTOMATION_TEMPLATES:
@@ -773,7 +1266,8 @@ async def execute_template(template_name: str, user_id: str = "default"):
         batch_request = BatchCommandRequest(
             commands=commands,
             name=f"Template: {template_name}",
-            user_id=user_id
+            user_id=user_id,
+            priority=priority
         )
         
         return await batch_execute(batch_request)
@@ -785,9 +1279,7 @@ async def execute_template(template_name: str, user_id: str = "default"):
             "timestamp": datetime.now().isoformat()
         }
 
-@app.get("/api/safe-commands")
-async def get_safe_commands():
-    """Get list of safe commands"""
+def build_safe_commands() -> Dict:
     return {
         "success": True,
         "safe_commands": SAFE_WINDOWS_COMMANDS,
@@ -795,6 +1287,239 @@ async def get_safe_commands():
         "timestamp": datetime.now().isoformat()
     }
 
+SAFE_COMMANDS_RESPONSE = CachedResponse(build_safe_commands, max_age=60)
+
+@app.get("/api/safe-commands")
+async def get_safe_commands(request: Request):
+    """Get list of safe commands"""
+    return SAFE_COMMANDS_RESPONSE.respond(request)
+
+@app.get("/api/metrics")
+async def get_system_metrics(history: int = 0):
+    """Get the latest system metrics snapshot (and optionally recent history)"""
+    try:
+        if not metrics_sampler.available:
+            return {
+                "success": False,
+                "error": "System metrics unavailable: psutil is not installed",
+                "timestamp": datetime.now().isoformat()
+            }
+        
+        result = {
+            "success": True,
+            "metrics": metrics_sampler.latest(),
+            "interval": metrics_sampler.interval,
+            "timestamp": datetime.now().isoformat()
+        }
+        if history:
+            result["history"] = metrics_sampler.history(history)
+        return result
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        }
+
+def parse_range(range_header: str, size: int):
+    """(start, end) for a single 'bytes=start-end' range (end exclusive), or None if unsatisfiable"""
+    unit, _, spec = range_header.partition("=")
+    first, _, last = spec.partition("-")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    try:
+        if first:
+            start, end = int(first), int(last) + 1 if last else size
+        else:
+            start, end = max(0, size - int(last)), size
+    except ValueError:
+        return None
+    if start >= size or start >= end:
+        return None
+    return start, min(end, size)
+
+@app.get("/api/outputs/{output_id}")
+def get_output(output_id: str, request: Request):
+    """Full text of a spooled command output; supports HTTP Range requests"""
+    try:
+        size = output_spool.size(output_id)
+    except (KeyError, ValueError):
+        raise HTTPException(status_code=404, detail=f"Output '{output_id}' not found")
+    
+    headers = {"Accept-Ranges": "bytes", "Content-Length": str(size)}
+    range_header = request.headers.get("range")
+    if not range_header:
+        return StreamingResponse(output_spool.iter_range(output_id), media_type="text/plain; charset=utf-8",
+                                 headers=headers)
+    
+    byte_range = parse_range(range_header, size)
+    if byte_range is None:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    start, end = byte_range
+    headers.update({"Content-Range": f"bytes {start}-{end - 1}/{size}", "Content-Length": str(end - start)})
+    return StreamingResponse(output_spool.iter_range(output_id, start, end), status_code=206,
+                             media_type="text/plain; charset=utf-8", headers=headers)
+
+@app.get("/api/analytics")
+def get_analytics(user_id: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None,
+                  kind: Optional[str] = None, granularity: str = "hour", top: int = 10):
+    """Run counts, success rates and latency percentiles from the hourly rollup buckets
+
+    since/until are ISO timestamps (default: the last 24 hours); ones without an
+    offset or Z are server local time. granularity is 'hour' or 'day'; kind is
+    'command' or 'sequence'; user_id defaults to all users.
+    """
+    try:
+        summary = analytics.summary(
+            user_id=user_id,
+            since=parse_time(since) if since else None,
+            until=parse_time(until) if until else None,
+            kind=kind,
+            granularity=granularity,
+            top=min(top, 100)
+        )
+        return {
+            "success": True,
+            **summary,
+            "timestamp": datetime.now().isoformat()
+        }
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        }
+
+@app.get("/metrics")
+async def export_metrics():
+    """Latency histograms in the Prometheus text exposition format"""
+    return Response(metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+@app.get("/api/admin/profiling")
+async def get_profiling():
+    """Profiler settings and the slow calls captured so far (newest first)"""
+    return {
+        "success": True,
+        "profiling": profiler.status(),
+        "profiles": profiler.recent(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.post("/api/admin/profiling")
+async def configure_profiling(request: ProfilingRequest):
+    """Turn profiling of handlers and automation calls on or off for every request"""
+    profiler.configure(
+        enabled=request.enabled,
+        slow_threshold=request.slow_ms / 1000 if request.slow_ms is not None else None,
+        interval=request.interval_ms / 1000 if request.interval_ms is not None else None,
+        keep=request.keep
+    )
+    return {
+        "success": True,
+        "profiling": profiler.status(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/api/admin/profiling/{profile_id}")
+async def get_profile(profile_id: str, format: str = "collapsed"):
+    """One captured call: collapsed stacks for flamegraph.pl/speedscope, or JSON with format=json"""
+    profile = profiler.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "json":
+        return {"success": True, "profile": profile, "timestamp": datetime.now().isoformat()}
+    return Response(profiler.collapsed(profile), media_type="text/plain; charset=utf-8")
+
+@app.get("/api/jobs/stats")
+async def get_job_queue_stats():
+    """Job queue depth, rejections and queue/run time percentiles"""
+    return {
+        "success": True,
+        "jobs": job_queue.stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/api/metrics/stream")
+async def stream_system_metrics(request: Request):
+    """Stream each new metrics snapshot as Server-Sent Events"""
+    async def event_stream():
+        last_sequence = None
+        while not await request.is_disconnected():
+            snapshot = metrics_sampler.latest()
+            if snapshot and metrics_sampler.sequence != last_sequence:
+                last_sequence = metrics_sampler.sequence
+                yield f"data: {json.dumps(snapshot)}\n\n"
+            await asyncio.sleep(metrics_sampler.interval)
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+async def _cached_payload(cached: CachedResponse) -> Dict:
+    return cached.payload
+
+# Section name -> coroutine factory taking user_id; blocking DB reads go to the threadpool
+BOOTSTRAP_SECTIONS = {
+    "health": lambda user_id: _cached_payload(HEALTH_RESPONSE),
+    "safe_commands": lambda user_id: _cached_payload(SAFE_COMMANDS_RESPONSE),
+    "command_history": lambda user_id: run_in_threadpool(get_command_history, user_id),
+    "batch_history": lambda user_id: run_in_threadpool(get_batch_history, user_id),
+    "automation_templates": lambda user_id: _cached_payload(AUTOMATION_TEMPLATES_RESPONSE),
+    "automation_status": lambda user_id: run_in_threadpool(get_automation_status),
+    "windows": lambda user_id: get_window_list(),
+}
+
+@app.get("/api/bootstrap")
+async def bootstrap(request: Request, user_id: str = "default", fields: Optional[str] = None):
+    """Everything the frontend loads at startup, gathered concurrently in one response
+
+    `fields` is a comma-separated subset of BOOTSTRAP_SECTIONS. The response is
+    gzip-compressed when accepted and carries an ETag for conditional requests.
+    """
+    try:
+        names, unknown = select_sections(fields, list(BOOTSTRAP_SECTIONS))
+        if unknown:
+            return {
+                "success": False,
+                "error": f"Unknown bootstrap fields: {', '.join(unknown)}",
+                "available_fields": list(BOOTSTRAP_SECTIONS),
+                "timestamp": datetime.now().isoformat()
+            }
+        
+        sections = await gather_sections(BOOTSTRAP_SECTIONS, names, user_id)
+        return json_response(request, {"success": True, **sections})
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        }
+
+@app.get("/api/state/stream")
+async def stream_state(request: Request):
+    """Push dashboard state (health, automation, history, metrics) as SSE deltas
+
+    The first event carries every section; later events only the sections that
+    changed. Reconnecting clients resume from the Last-Event-ID version.
+    """
+    try:
+        version = int(request.headers.get("last-event-id", 0))
+    except ValueError:
+        version = 0
+    
+    async def event_stream():
+        nonlocal version
+        while not await request.is_disconnected():
+            version, delta = await state_feed.wait_for_changes(version, timeout=15)
+            if delta:
+                yield f"id: {version}\ndata: {json.dumps(delta)}\n\n"
+            else:
+                # Keep-alive comment so proxies don't close idle connections
+                yield ": keep-alive\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 # ============================================
 # SCREEN AUTOMATION ENDPOINTS
 # ============================================
@@ -807,7 +1532,12 @@ async def take_screenshot(request: ScreenshotRequest):
         if region:
             region = (region.get('x'), region.get('y'), region.get('width'), region.get('height'))
         
-        result = automation.take_screenshot(region=region, filename=request.filename)
+        result = await run_in_threadpool(
+            automation.take_screenshot,
+            region=region,
+            filename=request.filename,
+            window_title=request.window_title
+        )
         return result
         
     except Exception as e:
@@ -821,7 +1551,8 @@ async def take_screenshot(request: ScreenshotRequest):
 async def click_at_position(request: ClickRequest):
     """Click at specific coordinates"""
     try:
-        result = automation.click_at_position(
+        result = await run_in_threadpool(
+            automation.click_at_position,
             x=request.x,
             y=request.y,
             button=request.button,
@@ -840,10 +1571,12 @@ async def click_at_position(request: ClickRequest):
 async def click_on_image(request: ClickImageRequest):
     """Click on first occurrence of template image"""
     try:
-        result = automation.click_on_image(
+        result = await run_in_threadpool(
+            automation.click_on_image,
             template_image=request.template_image,
             confidence=request.confidence,
-            double_click=request.double_click
+            double_click=request.double_click,
+            window_title=request.window_title
         )
         return result
         
@@ -858,7 +1591,8 @@ async def click_on_image(request: ClickImageRequest):
 async def type_text(request: TypeTextRequest):
     """Type text with specified interval"""
     try:
-        result = automation.type_text(
+        result = await run_in_threadpool(
+            automation.type_text,
             text=request.text,
             interval=request.interval
         )
@@ -875,7 +1609,26 @@ async def type_text(request: TypeTextRequest):
 async def press_key(request: KeyPressRequest):
     """Press key or key combination"""
     try:
-        result = automation.press_key(request.key_combination)
+        result = await run_in_threadpool(automation.press_key, request.key_combination)
+        return result
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        }
+
+@app.post("/api/automation/bulk-input")
+async def bulk_input(request: BulkInputRequest):
+    """Inject a buffer of text and key chords in one request"""
+    try:
+        result = await run_in_threadpool(
+            automation.bulk_input,
+            items=request.items,
+            use_clipboard=request.use_clipboard,
+            min_interval=request.min_interval
+        )
         return result
         
     except Exception as e:
@@ -889,7 +1642,8 @@ async def press_key(request: KeyPressRequest):
 async def scroll_screen(request: ScrollRequest):
     """Scroll in specified direction"""
     try:
-        result = automation.scroll(
+        result = await run_in_threadpool(
+            automation.scroll,
             direction=request.direction,
             amount=request.amount,
             x=request.x,
@@ -904,6 +1658,28 @@ async def scroll_screen(request: ScrollRequest):
             "timestamp": datetime.now().isoformat()
         }
 
+@app.post("/api/automation/gesture")
+async def perform_gesture(request: GestureRequest):
+    """Press, move along a path and release the mouse button"""
+    try:
+        result = await run_in_threadpool(
+            automation.perform_gesture,
+            points=request.points,
+            path_type=request.path_type,
+            duration=request.duration,
+            sample_rate=request.sample_rate,
+            fast=request.fast,
+            button=request.button
+        )
+        return result
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        }
+
 @app.post("/api/automation/ocr")
 async def read_text_from_screen(request: OCRRequest):
     """Extract text from screen using OCR"""
@@ -912,7 +1688,12 @@ async def read_text_from_screen(request: OCRRequest):
         if region:
             region = (region.get('x'), region.get('y'), region.get('width'), region.get('height'))
         
-        result = automation.read_text_from_screen(region=region, lang=request.lang)
+        result = await run_in_threadpool(
+            automation.read_text_from_screen,
+            region=region,
+            lang=request.lang,
+            window_title=request.window_title
+        )
         return result
         
     except Exception as e:
@@ -923,10 +1704,13 @@ async def read_text_from_screen(request: OCRRequest):
         }
 
 @app.get("/api/automation/windows")
-async def get_window_list():
-    """Get list of all open windows"""
+async def get_window_list(query: Optional[str] = None, match: str = "exact", limit: int = 10):
+    """Get list of all open windows, or look windows up by title"""
     try:
-        result = automation.get_window_list()
+        if query:
+            result = await run_in_threadpool(automation.find_windows, query, match=match, limit=limit)
+        else:
+            result = await run_in_threadpool(automation.get_window_list)
         return result
         
     except Exception as e:
@@ -940,7 +1724,7 @@ async def get_window_list():
 async def activate_window(request: WindowRequest):
     """Activate window by title"""
     try:
-        result = automation.activate_window(request.window_title)
+        result = await run_in_threadpool(automation.activate_window, request.window_title)
         return result
         
     except Exception as e:
@@ -954,10 +1738,12 @@ async def activate_window(request: WindowRequest):
 async def wait_for_image(request: WaitForImageRequest):
     """Wait for image to appear on screen"""
     try:
-        result = automation.wait_for_image(
+        result = await run_in_threadpool(
+            automation.wait_for_image,
             template_image=request.template_image,
             timeout=request.timeout,
-            confidence=request.confidence
+            confidence=request.confidence,
+            window_title=request.window_title
         )
         return result
         
@@ -972,7 +1758,16 @@ async def wait_for_image(request: WaitForImageRequest):
 async def start_wake_word_detection(request: WakeWordRequest):
     """Start wake word detection"""
     try:
-        result = automation.start_wake_word_detection(request.wake_word)
+        error = validate_bound_action(request.action)
+        if error:
+            return {
+                "success": False,
+                "error": error,
+                "timestamp": datetime.now().isoformat()
+            }
+        
+        result = await run_in_threadpool(automation.start_wake_word_detection, request.wake_word, request.action)
+        await run_in_threadpool(publish_automation_status)
         return result
         
     except Exception as e:
@@ -986,7 +1781,8 @@ async def start_wake_word_detection(request: WakeWordRequest):
 async def stop_wake_word_detection():
     """Stop wake word detection"""
     try:
-        result = automation.stop_wake_word_detection()
+        result = await run_in_threadpool(automation.stop_wake_word_detection)
+        await run_in_threadpool(publish_automation_status)
         return result
         
     except Exception as e:
@@ -996,11 +1792,118 @@ async def stop_wake_word_detection():
             "timestamp": datetime.now().isoformat()
         }
 
+def parse_bound_action(action: str):
+    """Split 'template:<name>' / 'sequence:<id>' into (kind, target); other actions return (None, action)"""
+    kind, _, target = action.partition(":")
+    if kind in ("template", "sequence") and target:
+        return kind, target
+    return None, action
+
+def validate_bound_action(action: Optional[str]) -> Optional[str]:
+    """Error message for a binding that cannot be dispatched, else None"""
+    if not action:
+        return None
+    kind, target = parse_bound_action(action)
+    if kind == "template" and target not in AUTOMATION_TEMPLATES:
+        return f"Template '{target}' not found"
+    return None
+
+def run_stored_sequence(sequence_id: str, user_id: str = "default") -> Dict:
+    """Re-run a previously executed sequence by its id"""
+    sequence_doc = automation_collection.find_one({"id": sequence_id}, {"_id": 0})
+    if not sequence_doc:
+        return {
+            "success": False,
+            "error": f"Sequence '{sequence_id}' not found",
+            "timestamp": datetime.now().isoformat()
+        }
+    return run_automation_sequence(sequence_doc["sequence"], sequence_doc["name"], user_id)
+
+async def dispatch_bound_action(action: str, source: str):
+    # Someone is at the keyboard, so bound actions go ahead of queued background work
+    kind, target = parse_bound_action(action)
+    try:
+        if kind == "template":
+            result = await run_queued(run_batch, AUTOMATION_TEMPLATES[target], f"Template: {target}", "default",
+                                      user_id="default", priority="high")
+        elif kind == "sequence":
+            result = await run_queued(run_stored_sequence, target, user_id="default", priority="high",
+                                      lane="sequence")
+        else:
+            return
+    except QueueFull as e:
+        result = {"success": False, "error": str(e)}
+    print(f"{source} triggered {action}: success={result.get('success')}")
+
+def on_bound_event(event):
+    """Bus subscriber: run the template/sequence bound to a hotkey or the wake word"""
+    if not isinstance(event, (HotkeyPressed, WakeWordDetected)):
+        return
+    if event.action and server_loop["loop"] is not None:
+        asyncio.run_coroutine_threadsafe(dispatch_bound_action(event.action, event.type), server_loop["loop"])
+
+def on_windows_changed(event: WindowsChanged):
+    """Bus subscriber: keep the feed's windows section in step with the window inventory"""
+    state_feed.publish("windows", apply_window_diff(state_feed.get("windows", []), event.to_dict()))
+
+server_loop = {"loop": None}
+
+@app.on_event("startup")
+async def start_event_dispatch():
+    server_loop["loop"] = asyncio.get_running_loop()
+    # Every worker receives the inventory's diffs, from the daemon or in-process
+    event_bus.subscribe(on_windows_changed, WindowsChanged.type)
+    if AUTOMATION_SOCKET:
+        # Events happen in the daemon; it picks one worker to run each bound action
+        # and relays every worker's dashboard state changes
+        automation.forward_events(event_bus, on_dispatch=on_bound_event, on_state=apply_state_change)
+    else:
+        event_bus.subscribe(on_bound_event, HotkeyPressed.type)
+        event_bus.subscribe(on_bound_event, WakeWordDetected.type)
+    # Listing the windows also starts the inventory's background refresh
+    try:
+        windows = await run_in_threadpool(automation.get_window_list)
+        if windows.get("success"):
+            state_feed.publish("windows", windows["windows"])
+    except Exception as e:
+        print(f"Window list unavailable: {e}")
+
+@app.get("/api/events/stream")
+async def stream_events(request: Request):
+    """Push wake word, hotkey and sequence completion events as Server-Sent Events"""
+    client_queue, unsubscribe = event_bus.subscribe_async(asyncio.get_running_loop())
+    
+    async def event_stream():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(client_queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            unsubscribe()
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 @app.post("/api/automation/hotkey")
 async def setup_hotkey(request: HotkeyRequest):
-    """Setup global hotkey"""
+    """Setup global hotkey
+
+    An action of 'template:<name>' or 'sequence:<id>' runs that automation
+    template or stored sequence whenever the hotkey is pressed.
+    """
     try:
-        result = automation.setup_hotkey(request.key_combination, request.action)
+        error = validate_bound_action(request.action)
+        if error:
+            return {
+                "success": False,
+                "error": error,
+                "timestamp": datetime.now().isoformat()
+            }
+        
+        result = await run_in_threadpool(automation.setup_hotkey, request.key_combination, request.action)
         return result
         
     except Exception as e:
@@ -1010,28 +1913,134 @@ async def setup_hotkey(request: HotkeyRequest):
             "timestamp": datetime.now().isoformat()
         }
 
+@profiler.profiled()
+def run_automation_sequence(sequence: List[Dict], name: str, user_id: str) -> Dict:
+    """Execute, store and announce an automation sequence; run it on the job queue's "sequence" lane"""
+    started = time.perf_counter()
+    result = automation.execute_automation_sequence(sequence)
+    duration = time.perf_counter() - started
+    analytics.record("sequence", user_id, name,
+                     result.get("successful_actions", 0) == result.get("total_actions", len(sequence)), duration)
+    
+    # Store sequence execution in database
+    sequence_doc = {
+        "id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "name": name,
+        "sequence": sequence,
+        "result": result,
+        "timestamp": datetime.now().isoformat()
+    }
+    
+    try:
+        with tracer.span("db_write"):
+            automation_collection.insert_one(sequence_doc)
+    except Exception as db_error:
+        print(f"Database error: {db_error}")
+    
+    event_bus.publish(SequenceCompleted(
+        name=name,
+        successful_actions=result.get("successful_actions", 0),
+        total_actions=result.get("total_actions", len(sequence))
+    ))
+    
+    result["sequence_id"] = sequence_doc["id"]
+    return result
+
 @app.post("/api/automation/sequence")
 async def execute_automation_sequence(request: AutomationSequenceRequest):
     """Execute a sequence of automation actions"""
     try:
-        result = automation.execute_automation_sequence(request.sequence)
+        check_client_priority(request.priority)
+        return await run_queued(run_automation_sequence, request.sequence, request.name, request.user_id,
+                                user_id=request.user_id, priority=request.priority, lane="sequence")
         
-        # Store sequence execution in database
-        sequence_doc = {
-            "id": str(uuid.uuid4()),
-            "user_id": request.user_id,
-            "name": request.name,
-            "sequence": request.sequence,
-            "result": result,
+    except QueueFull as e:
+        return queue_full_response(e)
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
             "timestamp": datetime.now().isoformat()
         }
-        
+
+def validate_scheduled_action(action: str, commands: List[str]) -> Optional[str]:
+    if action == "batch":
+        return None if commands else "A batch schedule needs at least one command"
+    kind, _ = parse_bound_action(action)
+    if kind is None:
+        return "Action must be 'template:<name>', 'sequence:<id>' or 'batch'"
+    return validate_bound_action(action)
+
+def run_scheduled_job(job: ScheduledJob) -> Dict:
+    """Scheduler runner: execute a job's template, stored sequence or batch"""
+    kind, target = parse_bound_action(job.action)
+    if kind == "template":
+        return run_batch(AUTOMATION_TEMPLATES[target], f"Template: {target}", job.user_id)
+    if kind == "sequence":
+        # Through the queue, so it takes its turn with the other sequences
+        result, _ = job_queue.submit(run_stored_sequence, target, job.user_id,
+                                     user_id=job.user_id, lane="sequence").result()
+        return result
+    return run_batch(job.commands, job.name, job.user_id)
+
+scheduler_lock = {"handle": None}
+
+@app.on_event("startup")
+async def start_scheduler():
+    # With several workers only the one holding the lock runs jobs; the others just edit them
+    scheduler_lock["handle"] = acquire_leader_lock(os.environ.get('SCHEDULER_LOCK', '/tmp/shayak-scheduler.lock'))
+    if scheduler_lock["handle"]:
+        await run_in_threadpool(scheduler.start)
+        # History maintenance must also run in a single process
         try:
-            automation_collection.insert_one(sequence_doc)
+            await run_in_threadpool(history_store.ensure_indexes)
+            await run_in_threadpool(analytics.ensure_indexes)
+            if history_search.mode == "mongo":
+                await run_in_threadpool(history_search.ensure_indexes)
         except Exception as db_error:
             print(f"Database error: {db_error}")
+        history_store.start_rollups()
+
+@app.post("/api/schedules")
+async def create_schedule(request: ScheduleRequest):
+    """Schedule a template, stored sequence or batch to run on an interval or cron schedule"""
+    try:
+        error = validate_scheduled_action(request.action, request.commands)
+        if error:
+            return {
+                "success": False,
+                "error": error,
+                "timestamp": datetime.now().isoformat()
+            }
         
-        return result
+        job = await run_in_threadpool(scheduler.add_job, ScheduledJob(**request.dict()))
+        return {
+            "success": True,
+            "job": job.to_dict(),
+            "timestamp": datetime.now().isoformat()
+        }
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        }
+
+@app.get("/api/schedules")
+def list_schedules():
+    """List scheduled jobs, soonest first"""
+    try:
+        jobs = scheduler.list_jobs()
+        return {
+            "success": True,
+            "schedules": [dict(job.to_dict(), running=scheduler.running(job.id)) for job in jobs],
+            "count": len(jobs),
+            "scheduler_active": bool(scheduler_lock["handle"]),
+            "stats": scheduler.stats,
+            "timestamp": datetime.now().isoformat()
+        }
         
     except Exception as e:
         return {
@@ -1040,9 +2049,41 @@ async def execute_automation_sequence(request: AutomationSequenceRequest):
             "timestamp": datetime.now().isoformat()
         }
 
+@app.delete("/api/schedules/{job_id}")
+def delete_schedule(job_id: str):
+    """Remove a scheduled job"""
+    if not scheduler.remove_job(job_id):
+        return {
+            "success": False,
+            "error": f"Schedule '{job_id}' not found",
+            "timestamp": datetime.now().isoformat()
+        }
+    return {
+        "success": True,
+        "job_id": job_id,
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.post("/api/schedules/{job_id}/run")
+def run_schedule_now(job_id: str):
+    """Run a scheduled job immediately, within its concurrency limit"""
+    started = scheduler.run_now(job_id)
+    if job_id not in scheduled_tasks:
+        return {
+            "success": False,
+            "error": f"Schedule '{job_id}' not found",
+            "timestamp": datetime.now().isoformat()
+        }
+    return {
+        "success": started,
+        "job_id": job_id,
+        "error": None if started else "Job is already running at its concurrency limit",
+        "timestamp": datetime.now().isoformat()
+    }
+
 @app.get("/api/automation/status")
-async def get_automation_status():
-    """Get automation system status"""
+def get_automation_status():
+    """Get automation system status (a plain def: the attributes may be read over the daemon socket)"""
     try:
         return {
             "success": True,
@@ -1062,6 +2103,7 @@ async def get_automation_status():
                 "height": automation.screen_height
             },
             "wake_word_active": automation.wake_word_active,
+            "capabilities": automation.capabilities(),
             "timestamp": datetime.now().isoformat()
         }
         
@@ -0,0 +1,77 @@
+import logging
+import os
+import tempfile
+import threading
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ARPAbet pronunciations for words the assistant listens for that are not in
+# the CMU dictionary shipped with PocketSphinx
+PRONUNCIATIONS = {
+    "shayak": "SH AH Y AA K",
+}
+
+
+def keyword_threshold(sensitivity: float) -> str:
+    """Detection threshold for a 0..1 sensitivity (the mapping speech_recognition uses)"""
+    return f"1e{100 * sensitivity - 110:g}"
+
+
+class KeywordDecoder:
+    """A PocketSphinx decoder in keyword search mode, built once and reused
+
+    Loading the acoustic model and dictionary costs far more than decoding a
+    short clip, so the decoder is created up front and shared by every call
+    (decoding is serialized with a lock). Each keyword must be in the CMU
+    dictionary or in `pronunciations`; construction raises ValueError
+    otherwise, instead of PocketSphinx quietly never matching the phrase.
+    With skip_unknown=True such phrases are left out (and logged) instead.
+    """
+
+    def __init__(self, keyword_entries: List[Tuple[str, float]], sample_rate: int = 16000,
+                 pronunciations: Optional[Dict[str, str]] = None, skip_unknown: bool = False):
+        from pocketsphinx import Decoder
+
+        pronunciations = {**PRONUNCIATIONS, **(pronunciations or {})}
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._decoder = Decoder(samprate=sample_rate, logfn=os.devnull)
+
+        entries = [(phrase.lower().strip(), sensitivity) for phrase, sensitivity in keyword_entries]
+        unknown = set()
+        for word in sorted({word for phrase, _ in entries for word in phrase.split()}):
+            if self._decoder.lookup_word(word) is not None:
+                continue
+            if word in pronunciations:
+                self._decoder.add_word(word, pronunciations[word], True)
+            elif skip_unknown:
+                unknown.add(word)
+            else:
+                raise ValueError(f"'{word}' is not in the PocketSphinx dictionary; "
+                                 f"add its ARPAbet pronunciation to PRONUNCIATIONS")
+        if unknown:
+            skipped = [phrase for phrase, _ in entries if unknown & set(phrase.split())]
+            logger.warning(f"Not listening for {skipped}: no pronunciation for {sorted(unknown)}")
+            entries = [(phrase, sensitivity) for phrase, sensitivity in entries if phrase not in skipped]
+        if not entries:
+            raise ValueError("None of the keywords can be pronounced by PocketSphinx")
+        self.keywords = [phrase for phrase, _ in entries]
+
+        with tempfile.NamedTemporaryFile("w", suffix=".kws", delete=False) as keyfile:
+            keyfile.writelines(f"{phrase} /{keyword_threshold(sensitivity)}/\n" for phrase, sensitivity in entries)
+        try:
+            self._decoder.add_kws("keywords", keyfile.name)
+        finally:
+            os.unlink(keyfile.name)
+        self._decoder.activate_search("keywords")
+
+    def decode(self, pcm: bytes) -> Optional[str]:
+        """The keywords heard in 16-bit mono PCM at `sample_rate`, or None"""
+        with self._lock:
+            self._decoder.start_utt()
+            self._decoder.process_raw(pcm, full_utt=True)
+            self._decoder.end_utt()
+            hypothesis = self._decoder.hyp()
+        text = hypothesis.hypstr.strip() if hypothesis is not None else ""
+        return text or None
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+from typing import Dict, Optional, Tuple
+
+
+class StateFeed:
+    """Versioned dashboard state pushed to clients as deltas
+
+    State is split into named sections (health, automation, metrics, ...).
+    Publishing a section that actually changed bumps the global version and
+    wakes every waiting client; a client passes the last version it saw and
+    gets back only the sections changed since then. Waiting clients just await
+    an asyncio.Event, so an idle connection costs nothing on the server.
+    Publishing is thread-safe so background threads can feed it directly.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._state: Dict[str, object] = {}
+        self._section_versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._changed: Optional[asyncio.Event] = None
+
+    def attach(self, loop: asyncio.AbstractEventLoop):
+        """Bind the feed to the server's event loop (call on startup)"""
+        self._loop = loop
+        self._changed = asyncio.Event()
+
+    def _wake_waiters(self):
+        # Swap in a fresh event so late waiters block until the next change
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def _set(self, section: str, value) -> bool:
+        """Store a section's value; the caller holds the lock"""
+        if self._state.get(section) == value:
+            return False
+        self.version += 1
+        self._state[section] = value
+        self._section_versions[section] = self.version
+        return True
+
+    def _notify(self):
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wake_waiters)
+
+    def publish(self, section: str, value) -> bool:
+        """Replace a section's value; returns False if nothing changed"""
+        with self._lock:
+            changed = self._set(section, value)
+        if changed:
+            self._notify()
+        return changed
+
+    def prepend(self, section: str, item, limit: int) -> bool:
+        """Put item at the front of a list section, keeping the first `limit` items
+
+        The read and the write happen under one lock, so concurrent prepends
+        never drop each other's items.
+        """
+        with self._lock:
+            changed = self._set(section, [item] + list(self._state.get(section, []))[:limit - 1])
+        if changed:
+            self._notify()
+        return changed
+
+    def get(self, section: str, default=None):
+        return self._state.get(section, default)
+
+    def changes_since(self, version: int) -> Tuple[int, Dict]:
+        """Current version and the sections changed after `version`"""
+        with self._lock:
+            delta = {
+                section: self._state[section]
+                for section, changed_at in self._section_versions.items()
+                if changed_at > version
+            }
+            return self.version, delta
+
+    async def wait_for_changes(self, version: int, timeout: Optional[float] = None) -> Tuple[int, Dict]:
+        """Block until something changes after `version` (or timeout; delta may be empty)"""
+        current, delta = self.changes_since(version)
+        if delta or self._changed is None:
+            return current, delta
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.changes_since(version)
@@ -0,0 +1,137 @@
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    import psutil
+except ImportError:  # Metrics are reported as unavailable instead of failing the server
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+
+class SystemMetricsSampler:
+    """Samples CPU, memory, disk, network and top processes into a ring buffer
+
+    Sampling happens on a background thread every `interval` seconds, so API
+    reads only copy the latest precomputed snapshot.
+    """
+
+    def __init__(self, interval: float = 2.0, history_size: int = 300,
+                 top_processes: int = 5, disk_path: str = "/"):
+        self.interval = interval
+        self.top_processes = top_processes
+        self.disk_path = disk_path
+        self.samples = deque(maxlen=history_size)
+        self.sequence = 0
+        self._last_net = None
+        self._last_net_time = None
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._subscribers = []
+
+    @property
+    def available(self) -> bool:
+        return psutil is not None
+
+    def _sample_processes(self) -> List[Dict]:
+        processes = []
+        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
+            info = proc.info
+            processes.append({
+                "pid": info['pid'],
+                "name": info['name'],
+                "cpu_percent": info['cpu_percent'] or 0.0,
+                "memory_percent": round(info['memory_percent'] or 0.0, 2)
+            })
+        processes.sort(key=lambda p: p["cpu_percent"], reverse=True)
+        return processes[:self.top_processes]
+
+    def sample(self) -> Dict:
+        """Take one sample and append it to the ring buffer"""
+        now = time.time()
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage(self.disk_path)
+        net = psutil.net_io_counters()
+
+        sent_rate = recv_rate = 0.0
+        if self._last_net is not None and now > self._last_net_time:
+            elapsed = now - self._last_net_time
+            sent_rate = (net.bytes_sent - self._last_net.bytes_sent) / elapsed
+            recv_rate = (net.bytes_recv - self._last_net.bytes_recv) / elapsed
+        self._last_net, self._last_net_time = net, now
+
+        snapshot = {
+            "timestamp": datetime.fromtimestamp(now).isoformat(),
+            "cpu": {
+                "percent": psutil.cpu_percent(interval=None),
+                "count": psutil.cpu_count()
+            },
+            "memory": {
+                "percent": memory.percent,
+                "used": memory.used,
+                "total": memory.total
+            },
+            "disk": {
+                "percent": disk.percent,
+                "used": disk.used,
+                "total": disk.total
+            },
+            "network": {
+                "bytes_sent": net.bytes_sent,
+                "bytes_recv": net.bytes_recv,
+                "sent_per_second": round(sent_rate, 1),
+                "recv_per_second": round(recv_rate, 1)
+            },
+            "uptime_seconds": int(now - psutil.boot_time()),
+            "processes": self._sample_processes()
+        }
+
+        self.samples.append(snapshot)
+        self.sequence += 1
+        for callback in list(self._subscribers):
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logger.error(f"Metrics subscriber failed: {e}")
+        return snapshot
+
+    def _sample_loop(self):
+        # cpu_percent(interval=None) measures since the previous call, so prime it
+        psutil.cpu_percent(interval=None)
+        while not self._stop_event.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"Metrics sampling failed: {e}")
+            self._stop_event.wait(self.interval)
+
+    def start(self):
+        """Start background sampling (no-op without psutil or if already running)"""
+        if not self.available or (self._thread and self._thread.is_alive()):
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._sample_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def subscribe(self, callback):
+        """Register a callback for each new sample; returns an unsubscribe function"""
+        self._subscribers.append(callback)
+
+        def unsubscribe():
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+        return unsubscribe
+
+    def latest(self) -> Optional[Dict]:
+        return self.samples[-1] if self.samples else None
+
+    def history(self, limit: Optional[int] = None) -> List[Dict]:
+        samples = list(self.samples)
+        return samples[-limit:] if limit else samples
@@ -0,0 +1,250 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# The span the current request/task is in; copied into threads by run_in_threadpool and the job queue
+_active_span: contextvars.ContextVar = contextvars.ContextVar("active_span", default=None)
+
+
+def _new_id(size: int) -> str:
+    return os.urandom(size).hex()
+
+
+class _Trace:
+    __slots__ = ("trace_id", "spans", "dropped", "lock")
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List["Span"] = []
+        self.dropped = 0
+        self.lock = threading.Lock()
+
+
+class Span:
+    __slots__ = ("name", "trace", "span_id", "parent_id", "attributes", "start", "end", "started", "error")
+
+    def __init__(self, name: str, trace: Optional[_Trace], parent_id: Optional[str], attributes: Dict):
+        self.name = name
+        self.trace = trace
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start = time.time()
+        self.started = time.perf_counter()
+        self.end = None
+        self.error = None
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.started
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict:
+        span = {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start,
+            "duration_ms": round(self.duration * 1000, 3)
+        }
+        if self.attributes:
+            span["attributes"] = self.attributes
+        if self.error:
+            span["error"] = self.error
+        return span
+
+
+class OtlpJsonSink:
+    """Appends each finished trace to a file as one OTLP/JSON line
+
+    The format is what the OpenTelemetry collector's file exporter writes
+    (an ExportTraceServiceRequest per line), so the file can be replayed
+    into any OTLP backend or read with jq. export() only queues the trace:
+    a background thread encodes and writes it, so request handlers never
+    wait on disk. When `max_pending` traces are already waiting, new ones
+    are dropped and counted.
+    """
+
+    def __init__(self, path: str, service_name: str = "shayak-backend", max_pending: int = 1000):
+        self.path = path
+        self.service_name = service_name
+        self.dropped = 0
+        self._pending: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._writer = None
+
+    @staticmethod
+    def _attributes(attributes: Dict) -> List[Dict]:
+        values = []
+        for key, value in attributes.items():
+            if isinstance(value, bool):
+                values.append({"key": key, "value": {"boolValue": value}})
+            elif isinstance(value, int):
+                values.append({"key": key, "value": {"intValue": str(value)}})
+            elif isinstance(value, float):
+                values.append({"key": key, "value": {"doubleValue": value}})
+            else:
+                values.append({"key": key, "value": {"stringValue": str(value)}})
+        return values
+
+    def encode(self, trace_id: str, spans: List[Span]) -> Dict:
+        otlp_spans = []
+        for span in spans:
+            start_ns = int(span.start * 1e9)
+            otlp_span = {
+                "traceId": trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": str(start_ns),
+                "endTimeUnixNano": str(start_ns + int(span.duration * 1e9)),
+                "attributes": self._attributes(span.attributes),
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1}
+            }
+            if span.parent_id:
+                otlp_span["parentSpanId"] = span.parent_id
+            otlp_spans.append(otlp_span)
+        return {"resourceSpans": [{
+            "resource": {"attributes": self._attributes({"service.name": self.service_name})},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": otlp_spans}]
+        }]}
+
+    def export(self, trace_id: str, spans: List[Span]):
+        """Queue a finished trace for the writer thread"""
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="trace-writer", daemon=True)
+                    self._writer.start()
+        try:
+            self._pending.put_nowait((trace_id, spans))
+        except queue.Full:
+            self.dropped += 1
+
+    def _write_loop(self):
+        while True:
+            batch = [self._pending.get()]
+            while True:
+                try:
+                    batch.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                lines = "".join(json.dumps(self.encode(trace_id, spans), separators=(",", ":")) + "\n"
+                                for trace_id, spans in batch)
+                with open(self.path, "a") as trace_file:
+                    trace_file.write(lines)
+            except Exception as e:
+                logger.error(f"Writing {len(batch)} traces to {self.path} failed: {e}")
+            finally:
+                for _ in batch:
+                    self._pending.task_done()
+
+    def flush(self):
+        """Block until every queued trace has been written"""
+        self._pending.join()
+
+
+class Tracer:
+    """Request-scoped span tracing
+
+    trace() opens the root span of a new trace (one per HTTP request);
+    span() opens a child of whatever span is active in the current context,
+    so stages nest without passing anything around. Spans opened outside a
+    trace (scheduled jobs, hotkeys) are still timed and reported to
+    `on_span_end`, just not collected. A finished trace goes to the sink.
+    """
+
+    def __init__(self, sink=None, on_span_end: Optional[Callable[[Span], None]] = None,
+                 max_spans: int = 1000):
+        self.sink = sink
+        self.on_span_end = on_span_end
+        self.max_spans = max_spans
+
+    @staticmethod
+    def current() -> Optional[Span]:
+        return _active_span.get()
+
+    def _finish(self, span: Span, token):
+        span.end = time.perf_counter()
+        _active_span.reset(token)
+        if self.on_span_end is not None:
+            try:
+                self.on_span_end(span)
+            except Exception as e:
+                logger.error(f"Span callback failed: {e}")
+
+    @contextmanager
+    def trace(self, name: str, trace_id: Optional[str] = None, **attributes):
+        trace = _Trace(trace_id or _new_id(16))
+        root = Span(name, trace, None, attributes)
+        token = _active_span.set(root)
+        try:
+            yield root
+        except BaseException as e:
+            root.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self._finish(root, token)
+            with trace.lock:
+                trace.spans.insert(0, root)
+            if self.sink is not None:
+                try:
+                    self.sink.export(trace.trace_id, trace.spans)
+                except Exception as e:
+                    logger.error(f"Trace export failed: {e}")
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        parent = _active_span.get()
+        trace = parent.trace if parent is not None else None
+        span = Span(name, trace, parent.span_id if parent is not None else None, attributes)
+        token = _active_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self._finish(span, token)
+            if trace is not None:
+                with trace.lock:
+                    if len(trace.spans) < self.max_spans:
+                        trace.spans.append(span)
+                    else:
+                        trace.dropped += 1
+
+    def traced(self, name: str):
+        """Decorator running the function inside span(name)"""
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+
+def trace_header(root: Span, limit: int = 100) -> str:
+    """Compact JSON breakdown of a finished trace for the X-Trace response header"""
+    spans = root.trace.spans if root.trace is not None else [root]
+    payload = {
+        "trace_id": root.trace.trace_id if root.trace is not None else None,
+        "spans": [[span.name, span.span_id, span.parent_id, round(span.duration * 1000, 3)]
+                  for span in spans[:limit]]
+    }
+    dropped = len(spans) - len(payload["spans"]) + (root.trace.dropped if root.trace is not None else 0)
+    if dropped:
+        payload["dropped"] = dropped
+    return json.dumps(payload, separators=(",", ":"))
@@ -0,0 +1,86 @@
+import os
+import logging
+from typing import BinaryIO, Dict
+
+logger = logging.getLogger(__name__)
+
+# Audio is streamed to backends in chunks of this size
+CHUNK_SIZE = 64 * 1024
+
+
+class Transcriber:
+    """Speech-to-text backend: turns a readable audio stream into text"""
+
+    name = "base"
+
+    def transcribe(self, audio: BinaryIO, filename: str) -> str:
+        raise NotImplementedError
+
+
+class WhisperTranscriber(Transcriber):
+    """OpenAI Whisper over the network
+
+    The audio stream is handed to the client as-is (no temp file copy); the
+    client is created once and reused across requests.
+    """
+
+    name = "whisper"
+
+    def __init__(self, model: str = "whisper-1"):
+        self.model = model
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(api_key=os.environ.get('OPENAI_API_KEY'))
+        return self._client
+
+    def transcribe(self, audio: BinaryIO, filename: str) -> str:
+        return self._get_client().audio.transcriptions.create(
+            model=self.model,
+            file=(filename, audio),
+            response_format="text"
+        )
+
+
+class OfflineTranscriber(Transcriber):
+    """Local stand-in for tests and offline development
+
+    Consumes the stream chunk by chunk like a real backend would and returns a
+    fixed transcript (TRANSCRIBER_OFFLINE_TEXT), so the upload path can be
+    exercised without network access.
+    """
+
+    name = "offline"
+
+    def __init__(self, text: str = None):
+        self.text = text if text is not None else os.environ.get('TRANSCRIBER_OFFLINE_TEXT', 'what time is it')
+        self.bytes_read = 0
+
+    def transcribe(self, audio: BinaryIO, filename: str) -> str:
+        self.bytes_read = 0
+        while True:
+            chunk = audio.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            self.bytes_read += len(chunk)
+        return self.text
+
+
+TRANSCRIBERS: Dict[str, type] = {
+    WhisperTranscriber.name: WhisperTranscriber,
+    OfflineTranscriber.name: OfflineTranscriber,
+}
+
+_transcribers: Dict[str, Transcriber] = {}
+
+
+def get_transcriber(name: str = None) -> Transcriber:
+    """Transcriber instance for `name` (default: TRANSCRIBER_BACKEND, else whisper)"""
+    name = name or os.environ.get('TRANSCRIBER_BACKEND', WhisperTranscriber.name)
+    if name not in TRANSCRIBERS:
+        raise ValueError(f"Unknown transcriber backend: {name}")
+    if name not in _transcribers:
+        _transcribers[name] = TRANSCRIBERS[name]()
+    return _transcribers[name]
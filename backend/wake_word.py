@@ -0,0 +1,249 @@
+import logging
+import math
+import time
+import wave
+from array import array
+from typing import Callable, Dict, List, Optional
+
+from sphinx_keywords import KeywordDecoder
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_WIDTH = 2  # 16-bit mono PCM
+
+
+class AudioRingBuffer:
+    """Fixed-size ring buffer over raw 16-bit PCM bytes
+
+    Writes never allocate; the most recent `capacity` bytes are kept and older
+    audio is overwritten.
+    """
+
+    def __init__(self, seconds: float, sample_rate: int):
+        self.capacity = int(seconds * sample_rate) * SAMPLE_WIDTH
+        self._buffer = bytearray(self.capacity)
+        self._write_pos = 0
+        self.size = 0
+
+    def write(self, data: bytes):
+        if len(data) >= self.capacity:
+            data = data[-self.capacity:]
+        end = self._write_pos + len(data)
+        if end <= self.capacity:
+            self._buffer[self._write_pos:end] = data
+        else:
+            split = self.capacity - self._write_pos
+            self._buffer[self._write_pos:] = data[:split]
+            self._buffer[:end - self.capacity] = data[split:]
+        self._write_pos = end % self.capacity
+        self.size = min(self.capacity, self.size + len(data))
+
+    def read_last(self, num_bytes: int) -> bytes:
+        """The most recent num_bytes (or everything buffered, if less)"""
+        num_bytes = min(num_bytes, self.size)
+        num_bytes -= num_bytes % SAMPLE_WIDTH
+        start = (self._write_pos - num_bytes) % self.capacity
+        if start + num_bytes <= self.capacity:
+            return bytes(self._buffer[start:start + num_bytes])
+        return bytes(self._buffer[start:]) + bytes(self._buffer[:self._write_pos])
+
+
+def frame_rms(frame: bytes) -> float:
+    samples = array('h', frame[:len(frame) - len(frame) % SAMPLE_WIDTH])
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+class EnergyGate:
+    """Cheap energy-based voice activity gate with an adaptive noise floor
+
+    The gate opens after `attack_frames` consecutive frames louder than
+    `ratio` x noise floor (and at least `min_rms`), and closes after
+    `release_frames` quiet frames. The noise floor tracks quiet frames only.
+    """
+
+    def __init__(self, ratio: float = 3.0, min_rms: float = 300.0,
+                 attack_frames: int = 2, release_frames: int = 10, floor_alpha: float = 0.05):
+        self.ratio = ratio
+        self.min_rms = min_rms
+        self.attack_frames = attack_frames
+        self.release_frames = release_frames
+        self.floor_alpha = floor_alpha
+        self.noise_floor = None
+        self.is_open = False
+        self._loud_run = 0
+        self._quiet_run = 0
+
+    @property
+    def threshold(self) -> float:
+        return max(self.min_rms, (self.noise_floor or 0.0) * self.ratio)
+
+    def update(self, rms: float) -> Optional[str]:
+        """Feed one frame's RMS; returns 'open', 'close' or None"""
+        if self.noise_floor is None:
+            self.noise_floor = rms
+
+        if rms >= self.threshold:
+            self._loud_run += 1
+            self._quiet_run = 0
+            if not self.is_open and self._loud_run >= self.attack_frames:
+                self.is_open = True
+                return 'open'
+        else:
+            self._quiet_run += 1
+            self._loud_run = 0
+            self.noise_floor += self.floor_alpha * (rms - self.noise_floor)
+            if self.is_open and self._quiet_run >= self.release_frames:
+                self.is_open = False
+                return 'close'
+        return None
+
+
+class KeywordSpotter:
+    """Decides whether a speech segment contains the wake word"""
+
+    name = "base"
+
+    def spot(self, pcm: bytes, sample_rate: int) -> bool:
+        raise NotImplementedError
+
+
+class SphinxKeywordSpotter(KeywordSpotter):
+    """Local PocketSphinx keyword search for a single wake word
+
+    The decoder is built here, once; a wake word PocketSphinx cannot
+    pronounce raises ValueError instead of never being detected.
+    """
+
+    name = "sphinx"
+
+    def __init__(self, wake_word: str, sensitivity: float = 0.8, sample_rate: int = 16000,
+                 pronunciations: Optional[Dict[str, str]] = None):
+        self.decoder = KeywordDecoder([(wake_word, sensitivity)], sample_rate, pronunciations)
+
+    def spot(self, pcm: bytes, sample_rate: int) -> bool:
+        if sample_rate != self.decoder.sample_rate:
+            raise ValueError(f"Spotter expects {self.decoder.sample_rate} Hz audio, got {sample_rate} Hz")
+        return self.decoder.decode(pcm) is not None
+
+
+class WakeWordEngine:
+    """Ring-buffered wake word pipeline: energy gate first, keyword spotter second
+
+    Every frame goes into the ring buffer and through the energy gate; the
+    (comparatively expensive) spotter only runs on a speech segment once the
+    gate closes or the segment reaches `max_segment_seconds`. Silence therefore
+    costs one RMS per frame.
+    """
+
+    def __init__(self, spotter: KeywordSpotter, sample_rate: int = 16000,
+                 buffer_seconds: float = 4.0, max_segment_seconds: float = 2.0,
+                 pre_roll_seconds: float = 0.3, gate: Optional[EnergyGate] = None,
+                 on_detect: Optional[Callable[[Dict], None]] = None):
+        self.spotter = spotter
+        self.sample_rate = sample_rate
+        self.max_segment_bytes = int(max_segment_seconds * sample_rate) * SAMPLE_WIDTH
+        self.pre_roll_bytes = int(pre_roll_seconds * sample_rate) * SAMPLE_WIDTH
+        self.ring = AudioRingBuffer(buffer_seconds, sample_rate)
+        self.gate = gate or EnergyGate()
+        self.on_detect = on_detect
+        self._segment_bytes = 0
+        self._segment_start = None
+        self.audio_time = 0.0
+        self.stats = {
+            "frames": 0,
+            "gated_frames": 0,
+            "spotter_calls": 0,
+            "detections": 0,
+            "gate_seconds": 0.0,
+            "spotter_seconds": 0.0,
+            "last_latency": None
+        }
+
+    def _run_spotter(self) -> Optional[Dict]:
+        segment = self.ring.read_last(self._segment_bytes + self.pre_roll_bytes)
+        self.stats["spotter_calls"] += 1
+        started = time.perf_counter()
+        try:
+            detected = self.spotter.spot(segment, self.sample_rate)
+        except Exception as e:
+            logger.error(f"Keyword spotter failed: {e}")
+            detected = False
+        self.stats["spotter_seconds"] += time.perf_counter() - started
+
+        speech_start = self._segment_start
+        self._segment_bytes = 0
+        # A segment cut at max length while speech continues starts the next one
+        self._segment_start = self.audio_time if self.gate.is_open else None
+        if not detected:
+            return None
+
+        detection = {
+            "audio_time": round(self.audio_time, 3),
+            "speech_start": round(speech_start, 3),
+            # Audio time from speech onset to detection
+            "latency": round(self.audio_time - speech_start, 3)
+        }
+        self.stats["detections"] += 1
+        self.stats["last_latency"] = detection["latency"]
+        if self.on_detect:
+            self.on_detect(detection)
+        return detection
+
+    def process_frame(self, frame: bytes) -> Optional[Dict]:
+        """Feed one chunk of PCM audio; returns a detection dict when the wake word is heard"""
+        started = time.perf_counter()
+        self.ring.write(frame)
+        frame_seconds = len(frame) / (SAMPLE_WIDTH * self.sample_rate)
+        self.audio_time += frame_seconds
+        self.stats["frames"] += 1
+
+        transition = self.gate.update(frame_rms(frame))
+        if transition == 'open':
+            # Include the attack frames that opened the gate
+            self._segment_start = self.audio_time - frame_seconds * self.gate.attack_frames
+            self._segment_bytes = len(frame) * self.gate.attack_frames
+        elif self.gate.is_open or transition == 'close':
+            self._segment_bytes += len(frame)
+        if self.gate.is_open:
+            self.stats["gated_frames"] += 1
+        self.stats["gate_seconds"] += time.perf_counter() - started
+
+        if self._segment_start is not None and (
+                transition == 'close' or self._segment_bytes >= self.max_segment_bytes):
+            return self._run_spotter()
+        return None
+
+
+def replay_wav(engine: WakeWordEngine, path: str, frame_ms: int = 20) -> Dict:
+    """Test harness: run a recorded 16-bit mono WAV through the engine
+
+    Returns every detection plus engine stats and the wall-clock cost relative
+    to the audio duration (real_time_factor < 1 means faster than real time).
+    """
+    detections: List[Dict] = []
+    started = time.perf_counter()
+    with wave.open(path, 'rb') as wav:
+        if wav.getsampwidth() != SAMPLE_WIDTH or wav.getnchannels() != 1:
+            raise ValueError("Wake word harness expects 16-bit mono WAV audio")
+        if wav.getframerate() != engine.sample_rate:
+            raise ValueError(f"Expected {engine.sample_rate} Hz audio, got {wav.getframerate()} Hz")
+        frames_per_chunk = engine.sample_rate * frame_ms // 1000
+        audio_seconds = wav.getnframes() / wav.getframerate()
+        while True:
+            chunk = wav.readframes(frames_per_chunk)
+            if not chunk:
+                break
+            detection = engine.process_frame(chunk)
+            if detection:
+                detections.append(detection)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "detections": detections,
+        "stats": dict(engine.stats),
+        "audio_seconds": round(audio_seconds, 3),
+        "processing_seconds": round(elapsed, 4),
+        "real_time_factor": round(elapsed / audio_seconds, 4) if audio_seconds else None
+    }
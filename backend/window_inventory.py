@@ -0,0 +1,210 @@
+import bisect
+import difflib
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MATCH_MODES = ('exact', 'prefix', 'contains', 'fuzzy')
+
+
+class WindowInventory:
+    """In-memory window inventory refreshed in the background
+
+    `source` returns a list of (window_info, handle) pairs where window_info is
+    the dict served by the API and handle is whatever the backend needs to act
+    on the window (e.g. a pygetwindow Window). Reads are served from the last
+    snapshot and a title index; subscribers receive a diff after each refresh
+    that changed something. Each window_info gets an "id": its native handle
+    when the backend reports one (as "pid"), otherwise its title and geometry,
+    so windows sharing a title stay separate entries.
+    """
+
+    def __init__(self, source: Callable[[], List], refresh_interval: float = 2.0):
+        self.source = source
+        self.refresh_interval = refresh_interval
+        self.last_refresh = None
+        self._lock = threading.Lock()
+        self._windows: Dict[str, Dict] = {}
+        self._handles: Dict[str, object] = {}
+        self._window_list: List[Dict] = []
+        self._by_title: Dict[str, List[str]] = {}
+        self._sorted_titles: List[str] = []
+        self._subscribers: List[Callable[[Dict], None]] = []
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+
+    @staticmethod
+    def _window_key(info: Dict) -> str:
+        if info.get("pid") is not None:
+            return str(info["pid"])
+        position = info.get("position") or {}
+        return (f"{info['title']}@{position.get('x')},{position.get('y')},"
+                f"{position.get('width')}x{position.get('height')}")
+
+    def refresh(self) -> Dict:
+        """Re-enumerate windows, rebuild the index and notify subscribers of changes"""
+        windows = {}
+        handles = {}
+        for info, handle in self.source():
+            if not info.get("title"):
+                continue
+            key = base_key = self._window_key(info)
+            # Identical windows without a handle are told apart by enumeration order
+            duplicate = 1
+            while key in windows:
+                duplicate += 1
+                key = f"{base_key}#{duplicate}"
+            info["id"] = key
+            windows[key] = info
+            handles[key] = handle
+
+        by_title: Dict[str, List[str]] = {}
+        for key, info in windows.items():
+            by_title.setdefault(info["title"].lower(), []).append(key)
+
+        with self._lock:
+            previous = self._windows
+            self._windows = windows
+            self._handles = handles
+            self._window_list = list(windows.values())
+            self._by_title = by_title
+            self._sorted_titles = sorted(by_title)
+            self.last_refresh = time.time()
+
+        diff = {
+            "added": [windows[k] for k in windows.keys() - previous.keys()],
+            "removed": [previous[k] for k in previous.keys() - windows.keys()],
+            "changed": [windows[k] for k in windows.keys() & previous.keys() if windows[k] != previous[k]],
+        }
+        if diff["added"] or diff["removed"] or diff["changed"]:
+            for callback in list(self._subscribers):
+                try:
+                    callback(diff)
+                except Exception as e:
+                    logger.error(f"Window inventory subscriber failed: {e}")
+        return diff
+
+    def _refresh_loop(self):
+        while not self._stop_event.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Window inventory refresh failed: {e}")
+            self._wake_event.wait(self.refresh_interval)
+            self._wake_event.clear()
+
+    def start(self):
+        """Start background refreshing (no-op if already running)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake_event.set()
+
+    def invalidate(self):
+        """Ask the background thread to refresh now, e.g. after activating a window"""
+        self._wake_event.set()
+
+    def _ensure_loaded(self):
+        if self.last_refresh is None:
+            self.refresh()
+            self.start()
+
+    def subscribe(self, callback: Callable[[Dict], None]) -> Callable[[], None]:
+        """Register a diff callback; returns a function that unsubscribes it"""
+        self._subscribers.append(callback)
+
+        def unsubscribe():
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+        return unsubscribe
+
+    def windows(self) -> List[Dict]:
+        """All known windows from the latest snapshot"""
+        self._ensure_loaded()
+        return self._window_list
+
+    def find(self, query: str, match: str = 'exact', limit: int = 10) -> List[Dict]:
+        """Look up windows by title (case-insensitive)"""
+        if match not in MATCH_MODES:
+            raise ValueError(f"Invalid match mode: {match}")
+
+        self._ensure_loaded()
+        query = query.lower()
+        with self._lock:
+            windows, by_title, titles = self._windows, self._by_title, self._sorted_titles
+
+        if match == 'exact':
+            keys = by_title.get(query, [])
+        elif match == 'prefix':
+            keys = []
+            i = bisect.bisect_left(titles, query)
+            while i < len(titles) and titles[i].startswith(query) and len(keys) < limit:
+                keys.extend(by_title[titles[i]])
+                i += 1
+        elif match == 'contains':
+            keys = [k for title in titles if query in title for k in by_title[title]]
+        else:
+            close = difflib.get_close_matches(query, titles, n=limit, cutoff=0.5)
+            keys = [k for title in close for k in by_title[title]]
+
+        return [windows[k] for k in keys[:limit]]
+
+    def resolve(self, query: str) -> Optional[Dict]:
+        """Best single match for a title: exact, then prefix, then substring"""
+        for match in ('exact', 'prefix', 'contains'):
+            found = self.find(query, match, limit=1)
+            if found:
+                return found[0]
+        return None
+
+    def get_handle(self, info: Dict):
+        with self._lock:
+            return self._handles.get(info.get("id") or self._window_key(info))
+
+
+def apply_window_diff(windows: List[Dict], diff: Dict) -> List[Dict]:
+    """A window list with a subscriber diff applied, matched by "id"
+
+    Applying a diff the list already reflects changes nothing, so a diff that
+    races a fresh snapshot is harmless.
+    """
+    by_id = {window["id"]: window for window in windows}
+    for window in diff.get("removed", []):
+        by_id.pop(window["id"], None)
+    for window in diff.get("changed", []) + diff.get("added", []):
+        by_id[window["id"]] = window
+    return list(by_id.values())
+
+
+def window_region(info: Dict, region=None, screen_width=None, screen_height=None):
+    """Screen-space (x, y, width, height) for a window, optionally narrowed to a
+    window-relative sub-region and clipped to the screen"""
+    position = info["position"]
+    left, top = position["x"], position["y"]
+    right, bottom = left + position["width"], top + position["height"]
+
+    if region:
+        rx, ry, rw, rh = region
+        left, top, right, bottom = (
+            max(left, left + rx), max(top, top + ry),
+            min(right, left + rx + rw), min(bottom, top + ry + rh)
+        )
+
+    left, top = max(left, 0), max(top, 0)
+    if screen_width is not None:
+        right = min(right, screen_width)
+    if screen_height is not None:
+        bottom = min(bottom, screen_height)
+
+    if right <= left or bottom <= top:
+        raise ValueError(f"Window '{info['title']}' has no visible area to capture")
+    return (left, top, right - left, bottom - top)
@@ -0,0 +1,147 @@
+"""Minimal benchmark runner: calibrated timing rounds, JSON results and comparison"""
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import types
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+BENCHMARKS: List["Benchmark"] = []
+
+
+class SkipBenchmark(Exception):
+    """Raised by a benchmark's setup when something it needs is unavailable"""
+
+
+class Benchmark:
+    def __init__(self, name: str, group: str, setup: Callable[[], Callable[[], object]]):
+        self.name = name
+        self.group = group
+        self.setup = setup
+
+
+def benchmark(name: str, group: str):
+    """Register `setup`, which prepares fixtures and returns the zero-argument callable to time
+
+    A setup that needs cleaning up can instead be a generator yielding the
+    callable once; it is closed after the benchmark runs.
+    """
+    def register(setup):
+        BENCHMARKS.append(Benchmark(name, group, setup))
+        return setup
+    return register
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def measure(fn: Callable[[], object], rounds: int = 15, min_round_time: float = 0.02,
+            warmup_rounds: int = 2) -> Dict:
+    """Time fn over `rounds` rounds; each round repeats it enough times to last
+    at least `min_round_time`, so timer resolution doesn't dominate fast calls"""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - started >= min_round_time or loops >= 1 << 20:
+            break
+        loops *= 2
+
+    per_call = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for round_number in range(warmup_rounds + rounds):
+            started = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            if round_number >= warmup_rounds:
+                per_call.append((time.perf_counter() - started) / loops)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    median = statistics.median(per_call)
+    return {
+        "rounds": rounds,
+        "loops": loops,
+        "min": min(per_call),
+        "median": median,
+        "mean": statistics.fmean(per_call),
+        "stdev": statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+        "p95": _percentile(per_call, 0.95),
+        "ops_per_second": 1 / median if median else None
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run(benchmarks: List[Benchmark], rounds: int = 15, min_round_time: float = 0.02,
+        log=print) -> Dict:
+    results = {}
+    for bench in benchmarks:
+        try:
+            prepared = bench.setup()
+            fn = next(prepared) if isinstance(prepared, types.GeneratorType) else prepared
+        except SkipBenchmark as e:
+            results[bench.name] = {"group": bench.group, "skipped": str(e)}
+            log(f"{bench.name:45} skipped: {e}")
+            continue
+        try:
+            stats = measure(fn, rounds=rounds, min_round_time=min_round_time)
+        finally:
+            if isinstance(prepared, types.GeneratorType):
+                prepared.close()
+        results[bench.name] = {"group": bench.group, **stats}
+        log(f"{bench.name:45} median {stats['median'] * 1e6:12.2f} us  p95 {stats['p95'] * 1e6:12.2f} us")
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "timestamp": datetime.now().isoformat()
+        },
+        "benchmarks": results
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = 1.25) -> List[Dict]:
+    """Median time ratios (current / baseline) for benchmarks present in both runs
+
+    A ratio above `threshold` is flagged as a regression.
+    """
+    rows = []
+    for name, result in current["benchmarks"].items():
+        previous = baseline["benchmarks"].get(name)
+        if not previous or "median" not in previous or "median" not in result:
+            continue
+        ratio = result["median"] / previous["median"] if previous["median"] else float("inf")
+        rows.append({
+            "name": name,
+            "baseline": previous["median"],
+            "current": result["median"],
+            "ratio": round(ratio, 3),
+            "regression": ratio > threshold
+        })
+    return rows
+
+
+def load(path: str) -> Dict:
+    with open(path) as results_file:
+        return json.load(results_file)
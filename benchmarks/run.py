@@ -0,0 +1,48 @@
+"""Run the backend benchmarks and write JSON results
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --output new.json --compare results.json --threshold 1.25
+
+With --compare, exits with status 1 when any benchmark's median got slower
+than `threshold` times the baseline.
+"""
+import argparse
+import json
+import sys
+
+from benchmarks import suite  # noqa: F401  (registers the benchmarks)
+from benchmarks.harness import BENCHMARKS, compare, load, run
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Shayak backend hot paths offline")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against an earlier results file")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="median slowdown ratio counted as a regression (default 1.25)")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--rounds", type=int, default=15, help="timed rounds per benchmark")
+    parser.add_argument("--quick", action="store_true", help="few short rounds, for smoke testing")
+    args = parser.parse_args(argv)
+
+    selected = [bench for bench in BENCHMARKS if args.filter in bench.name]
+    rounds, min_round_time = (3, 0.002) if args.quick else (args.rounds, 0.02)
+    results = run(selected, rounds=rounds, min_round_time=min_round_time)
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+        print(f"Results written to {args.output}")
+
+    if not args.compare:
+        return 0
+    rows = compare(load(args.compare), results, args.threshold)
+    for row in rows:
+        marker = "REGRESSION" if row["regression"] else ""
+        print(f"{row['name']:45} {row['baseline'] * 1e6:12.2f} us -> {row['current'] * 1e6:12.2f} us "
+              f"x{row['ratio']:<6} {marker}")
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
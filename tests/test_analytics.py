@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from analytics import AnalyticsRollup, estimate_percentile, latency_bin, parse_time
+
+
+class FakeCollection:
+    """Just enough of a pymongo collection for AnalyticsRollup"""
+
+    def __init__(self):
+        self.docs = []
+        self.writes = 0
+
+    def update_one(self, query, update, upsert=False):
+        self.writes += 1
+        doc = next((doc for doc in self.docs if all(doc.get(k) == v for k, v in query.items())), None)
+        if doc is None:
+            doc = dict(query)
+            self.docs.append(doc)
+        for path, amount in update["$inc"].items():
+            target = doc
+            *parents, leaf = path.split(".")
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[leaf] = target.get(leaf, 0) + amount
+
+    def find(self, query, projection=None):
+        def matches(doc):
+            for key, condition in query.items():
+                if isinstance(condition, dict):
+                    if not condition["$gte"] <= doc[key] < condition["$lt"]:
+                        return False
+                elif doc.get(key) != condition:
+                    return False
+            return True
+        return [dict(doc) for doc in self.docs if matches(doc)]
+
+
+NOON = datetime(2026, 3, 2, 12, 30)
+
+
+def test_runs_are_aggregated_in_memory_until_flushed():
+    rollup = AnalyticsRollup(FakeCollection())
+    for i in range(50):
+        rollup.record("command", "ops", "uptime", i % 10 != 0, 0.02, moment=NOON)
+    rollup.record("command", "ops", "df -h", True, 0.2, moment=NOON)
+
+    assert rollup.collection.writes == 0
+    assert rollup.flush() == 2
+    assert rollup.collection.writes == 2
+
+    uptime = next(doc for doc in rollup.collection.docs if doc["name"] == "uptime")
+    assert uptime["bucket"] == datetime(2026, 3, 2, 12)
+    assert uptime["count"] == 50 and uptime["successes"] == 45
+    assert uptime["latency"] == {f"b{latency_bin(0.02)}": 50}
+
+
+def test_flushes_from_several_processes_add_up():
+    collection = FakeCollection()
+    for _ in range(2):
+        rollup = AnalyticsRollup(collection)
+        rollup.record("command", "ops", "uptime", True, 0.02, moment=NOON)
+        rollup.flush()
+
+    assert len(collection.docs) == 1
+    assert collection.docs[0]["count"] == 2
+
+
+def test_summary_merges_buckets_and_pending_counters():
+    rollup = AnalyticsRollup(FakeCollection())
+    rollup.record("command", "ops", "uptime", True, 0.02, moment=NOON)
+    rollup.record("command", "ops", "uptime", False, 0.02, moment=NOON.replace(hour=13))
+    rollup.record("sequence", "ops", "Login", True, 3.0, moment=NOON)
+    rollup.record("command", "guest", "ls", True, 0.02, moment=NOON)
+    rollup.flush()
+    rollup.record("command", "ops", "uptime", True, 0.02, moment=NOON.replace(hour=14))
+
+    since, until = datetime(2026, 3, 2), datetime(2026, 3, 3)
+    hourly = rollup.summary(user_id="ops", since=since, until=until)
+    assert hourly["totals"]["count"] == 4
+    assert hourly["totals"]["success_rate"] == 0.75
+    assert [point["count"] for point in hourly["timeline"]] == [2, 1, 1]
+    assert hourly["top"][0] == {**hourly["top"][0], "kind": "command", "name": "uptime", "count": 3}
+    assert list(hourly["users"]) == ["ops"]
+
+    daily = rollup.summary(since=since, until=until, granularity="day", kind="command")
+    assert [point["count"] for point in daily["timeline"]] == [4]
+    assert set(daily["users"]) == {"ops", "guest"}
+
+
+def test_percentiles_are_estimated_from_the_histogram():
+    bins = [0] * 14
+    bins[latency_bin(0.02)] = 90
+    bins[latency_bin(4.0)] = 10
+
+    assert 0.01 <= estimate_percentile(bins, 0.5) <= 0.025
+    assert 2.5 <= estimate_percentile(bins, 0.99) <= 5.0
+    assert estimate_percentile([0] * 14, 0.5) is None
+
+
+def test_unknown_kind_is_rejected():
+    rollup = AnalyticsRollup(FakeCollection())
+    with pytest.raises(ValueError):
+        rollup.record("batch", "ops", "nightly", True, 1.0)
+    with pytest.raises(ValueError):
+        rollup.summary(granularity="week")
+
+
+def test_aware_timestamps_are_compared_in_local_time():
+    moment = datetime(2026, 1, 1, 12, 30)
+    aware = moment.astimezone(timezone.utc)
+    assert parse_time(aware.isoformat()) == moment
+    assert parse_time(aware.strftime("%Y-%m-%dT%H:%M:%SZ")) == moment
+    assert parse_time("2026-01-01T12:30:00") == moment
+
+    rollup = AnalyticsRollup(FakeCollection())
+    rollup.record("command", "ops", "uptime", True, 0.01, moment=moment)
+    summary = rollup.summary(since=aware - timedelta(hours=1), until=aware + timedelta(hours=1))
+    assert summary["totals"]["count"] == 1
@@ -0,0 +1,110 @@
+import socket
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from automation_daemon import AutomationDaemon, RemoteAutomation
+from event_bus import EventBus, event_bus
+
+
+@pytest.fixture
+def daemon(mock_automation):
+    # Unix socket paths are length-limited, so keep this one short
+    with tempfile.TemporaryDirectory() as socket_dir:
+        daemon = AutomationDaemon(mock_automation, str(Path(socket_dir) / "a.sock"))
+        daemon.start()
+        yield daemon
+        daemon.stop()
+
+
+def test_calls_and_attributes_run_in_the_daemon(daemon):
+    remote = RemoteAutomation(daemon.socket_path)
+
+    assert remote.screen_width == 1920
+    assert remote.click_at_position(10, 20)["success"]
+    assert remote.setup_hotkey("ctrl+alt+h", action="template:system_health")["success"]
+    assert daemon.automation.hotkeys == {"ctrl+alt+h": "template:system_health"}
+
+    with pytest.raises(RuntimeError, match="not available over IPC"):
+        remote.window_inventory()
+
+
+def test_events_reach_every_worker_and_one_dispatches(daemon):
+    workers = [(RemoteAutomation(daemon.socket_path), EventBus()) for _ in range(2)]
+    received, dispatched = [], []
+    done = threading.Semaphore(0)
+
+    for remote, bus in workers:
+        bus.subscribe(lambda event: (received.append(event), done.release()))
+        remote.forward_events(bus, on_dispatch=dispatched.append)
+
+    deadline = time.time() + 10
+    while len(daemon._subscribers) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+
+    remote = workers[0][0]
+    remote.setup_hotkey("ctrl+alt+s", action="sequence:abc")
+    remote.trigger_hotkey("ctrl+alt+s")
+    event_bus.wait_idle()
+    for _ in range(2):
+        assert done.acquire(timeout=5)
+
+    while not dispatched and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert [event.action for event in received] == ["sequence:abc", "sequence:abc"]
+    assert len(dispatched) == 1
+
+
+def test_state_changes_reach_every_worker_in_one_order(daemon):
+    workers = [RemoteAutomation(daemon.socket_path) for _ in range(2)]
+    changes = [[], []]
+    done = threading.Semaphore(0)
+
+    for remote, received in zip(workers, changes):
+        remote.forward_events(EventBus(), on_state=lambda change, received=received: (received.append(change),
+                                                                                     done.release()))
+
+    deadline = time.time() + 10
+    while len(daemon._subscribers) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+
+    workers[0].broadcast({"section": "recent_commands", "value": {"id": 1}, "limit": 10})
+    workers[1].broadcast({"section": "automation", "value": {"wake_word_active": True}, "limit": None})
+    for _ in range(4):
+        assert done.acquire(timeout=5)
+
+    assert changes[0] == changes[1]
+    assert [change["section"] for change in changes[0]] == ["recent_commands", "automation"]
+
+
+def test_connections_closed_by_the_daemon_are_detected():
+    ours, theirs = socket.socketpair()
+    ours.settimeout(5)
+    assert not RemoteAutomation._closed_by_peer(ours)
+    assert ours.gettimeout() == 5
+
+    theirs.close()
+    assert RemoteAutomation._closed_by_peer(ours)
+    ours.close()
+
+
+def test_request_that_reached_the_daemon_is_not_retried(daemon):
+    calls = []
+
+    def slow_click(x, y, **kwargs):
+        calls.append((x, y))
+        time.sleep(0.5)
+        return {"success": True}
+
+    daemon.automation.click_at_position = slow_click
+    remote = RemoteAutomation(daemon.socket_path, timeout=0.1)
+    assert remote.screen_width == 1920
+
+    with pytest.raises(OSError):
+        remote.click_at_position(10, 20)
+    time.sleep(0.6)
+    assert calls == [(10, 20)]
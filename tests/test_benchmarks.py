@@ -0,0 +1,39 @@
+from benchmarks.harness import Benchmark, SkipBenchmark, compare, measure, run
+
+
+def test_measure_reports_per_call_statistics():
+    stats = measure(lambda: sum(range(100)), rounds=3, min_round_time=0.001)
+    assert stats["rounds"] == 3 and stats["loops"] >= 1
+    assert 0 < stats["min"] <= stats["median"] <= stats["p95"]
+
+
+def test_run_handles_skips_and_generator_setups():
+    closed = []
+
+    def missing_dependency():
+        raise SkipBenchmark("cv2 not installed")
+
+    def with_cleanup():
+        try:
+            yield lambda: None
+        finally:
+            closed.append(True)
+
+    results = run([Benchmark("skipped", "g", missing_dependency), Benchmark("cleaned", "g", with_cleanup)],
+                  rounds=2, min_round_time=0.001, log=lambda line: None)
+
+    assert results["benchmarks"]["skipped"] == {"group": "g", "skipped": "cv2 not installed"}
+    assert results["benchmarks"]["cleaned"]["median"] >= 0
+    assert closed == [True]
+    assert set(results["meta"]) >= {"commit", "python", "platform", "timestamp"}
+
+
+def test_compare_flags_slowdowns_beyond_the_threshold():
+    baseline = {"benchmarks": {"a": {"median": 1.0}, "b": {"median": 1.0}, "gone": {"median": 1.0}}}
+    current = {"benchmarks": {"a": {"median": 1.1}, "b": {"median": 1.5}, "new": {"median": 1.0},
+                              "skipped": {"skipped": "no server"}}}
+
+    rows = {row["name"]: row for row in compare(baseline, current, threshold=1.25)}
+    assert set(rows) == {"a", "b"}
+    assert not rows["a"]["regression"] and rows["b"]["regression"]
+    assert rows["b"]["ratio"] == 1.5
@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+
+from bootstrap import gather_sections, select_sections
+
+AVAILABLE = ["health", "command_history", "automation_status"]
+
+
+async def health(user_id):
+    return {"status": "healthy", "timestamp": "2026-01-01T00:00:00"}
+
+
+async def history(user_id):
+    return {"user_id": user_id, "history": [], "refreshed_at": "now"}
+
+
+def test_section_selection():
+    assert select_sections(None, AVAILABLE) == (AVAILABLE, [])
+    assert select_sections(" , ", AVAILABLE) == (AVAILABLE, [])
+    assert select_sections("health, command_history", AVAILABLE) == (["health", "command_history"], [])
+    assert select_sections("health,nope", AVAILABLE) == (["health", "nope"], ["nope"])
+
+
+def test_sections_are_gathered_without_volatile_keys():
+    factories = {"health": health, "command_history": history}
+    sections = asyncio.run(gather_sections(factories, ["health", "command_history"], "ops"))
+    assert sections == {"health": {"status": "healthy"}, "command_history": {"user_id": "ops", "history": []}}
+
+
+def test_a_factory_returning_a_plain_dict_is_named():
+    factories = {"health": health, "automation_status": lambda user_id: {"success": True}}
+    with pytest.raises(TypeError, match="automation_status"):
+        asyncio.run(gather_sections(factories, ["health", "automation_status"], "ops"))
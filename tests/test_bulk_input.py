@@ -0,0 +1,138 @@
+import sys
+import types
+
+import pytest
+
+import automation as automation_module
+from automation import ScreenAutomation
+
+
+class FailSafeException(Exception):
+    pass
+
+
+class FakePyautogui:
+    """Records the input events bulk_input sends"""
+
+    FailSafeException = FailSafeException
+
+    def __init__(self):
+        self.events = []
+
+    def hotkey(self, *keys, _pause=True):
+        self.events.append(("hotkey", keys))
+
+    def typewrite(self, text, interval=0.0, _pause=True):
+        self.events.append(("typewrite", text, interval))
+
+    def press(self, key, _pause=True):
+        if key == "nosuchkey":
+            raise ValueError(f"Unknown key '{key}'")
+        self.events.append(("press", key))
+
+
+class FakeClipboard:
+    def __init__(self, contents="before"):
+        self.contents = contents
+        self.copies = []
+
+    def copy(self, text):
+        self.contents = text
+        self.copies.append(text)
+
+    def paste(self):
+        return self.contents
+
+
+@pytest.fixture
+def pyautogui(monkeypatch):
+    fake = FakePyautogui()
+    monkeypatch.setattr(automation_module, "pyautogui", fake)
+    return fake
+
+
+@pytest.fixture
+def clipboard(monkeypatch):
+    fake = FakeClipboard()
+    monkeypatch.setitem(sys.modules, "pyperclip", types.SimpleNamespace(copy=fake.copy, paste=fake.paste))
+    return fake
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    calls = []
+    monkeypatch.setattr(automation_module.time, "sleep", calls.append)
+    return calls
+
+
+def test_text_is_pasted_and_the_clipboard_restored(pyautogui, clipboard, sleeps):
+    result = ScreenAutomation().bulk_input(["hello", {"key": "ctrl+s"}, {"text": "world"}])
+
+    assert result["success"] and result["method"] == "clipboard"
+    assert (result["character_count"], result["key_count"]) == (10, 1)
+    paste = "command" if automation_module.platform.system() == "Darwin" else "ctrl"
+    assert pyautogui.events == [("hotkey", (paste, "v")), ("hotkey", ("ctrl", "s")), ("hotkey", (paste, "v"))]
+    assert clipboard.copies == ["hello", "world", "before"]
+
+
+def test_min_interval_types_each_item_with_pacing(pyautogui, clipboard, sleeps):
+    result = ScreenAutomation().bulk_input(["ab", {"key": "enter"}], min_interval=0.05)
+
+    assert result["success"] and result["method"] == "typewrite"
+    assert pyautogui.events == [("typewrite", "ab", 0.05), ("press", "enter")]
+    assert sleeps == [0.05, 0.05]
+    assert clipboard.copies == []
+
+
+def test_without_clipboard_text_is_typed_in_one_stream(pyautogui, clipboard, sleeps):
+    result = ScreenAutomation().bulk_input(["abc"], use_clipboard=False)
+    assert result["method"] == "typewrite"
+    assert pyautogui.events == [("typewrite", "abc", 0.0)]
+    assert sleeps == []
+
+
+def test_failed_items_are_reported_and_the_rest_sent(pyautogui, clipboard, sleeps):
+    result = ScreenAutomation().bulk_input([{"key": "nosuchkey"}, {"bogus": 1}, {"key": "tab"}],
+                                           use_clipboard=False)
+
+    assert not result["success"]
+    assert result["failed_items"] == [{"index": 0, "error": "Unknown key 'nosuchkey'"},
+                                      {"index": 1, "error": "Item needs 'text' or 'key'"}]
+    assert pyautogui.events == [("press", "tab")]
+    assert result["key_count"] == 1
+
+
+def test_mock_backend_reports_the_same_shape(mock_automation):
+    result = mock_automation.bulk_input(["hello", {"key": "ctrl+s"}, {}], min_interval=0.01)
+    assert not result["success"]
+    assert result["method"] == "typewrite"
+    assert (result["character_count"], result["key_count"]) == (5, 1)
+    assert result["failed_items"] == [{"index": 2, "error": "Item needs 'text' or 'key'"}]
+
+
+def test_non_ascii_text_is_pasted_while_typing(pyautogui, clipboard, sleeps):
+    result = ScreenAutomation().bulk_input(["ab", "héllo"], min_interval=0.05)
+
+    assert result["success"] and result["character_count"] == 7
+    paste = "command" if automation_module.platform.system() == "Darwin" else "ctrl"
+    assert pyautogui.events == [("typewrite", "ab", 0.05), ("hotkey", (paste, "v"))]
+    assert clipboard.copies == ["héllo", "before"]
+
+
+def test_non_ascii_text_fails_without_the_clipboard(pyautogui, clipboard, sleeps):
+    result = ScreenAutomation().bulk_input(["naïve", "ok"], use_clipboard=False)
+
+    assert result["failed_items"] == [{"index": 0, "error": "Non-ASCII text can't be typed without the clipboard"}]
+    assert result["character_count"] == 2
+    assert pyautogui.events == [("typewrite", "ok", 0.0)]
+
+
+def test_clipboard_is_restored_when_the_fail_safe_aborts(pyautogui, clipboard, sleeps):
+    def fail_safe(*keys, _pause=True):
+        raise FailSafeException("mouse in corner")
+
+    pyautogui.hotkey = fail_safe
+    result = ScreenAutomation().bulk_input(["hello", "world"])
+
+    assert not result["success"] and "mouse in corner" in result["error"]
+    assert clipboard.copies == ["hello", "before"]
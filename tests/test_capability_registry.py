@@ -0,0 +1,53 @@
+import pytest
+
+from capability_registry import CapabilityRegistry, pins_from_env
+
+
+class FakeRealAutomation:
+    """Real backend stand-in where only OCR's dependencies load"""
+
+    def __init__(self):
+        self.probed = []
+
+    def capability_ready(self, name):
+        self.probed.append(name)
+        return name == "ocr"
+
+    def capabilities(self):
+        return {name: {"available": name == "ocr", "loaded": name == "ocr",
+                       "error": None if name == "ocr" else "pyautogui is unavailable"}
+                for name in ("capture", "matching", "ocr", "input", "windows", "hotkeys", "audio")}
+
+    def read_text_from_screen(self, **kwargs):
+        return {"success": True, "text": "real ocr"}
+
+
+def test_auto_selects_per_capability(mock_automation):
+    real = FakeRealAutomation()
+    registry = CapabilityRegistry(real, mock_automation)
+
+    assert registry.read_text_from_screen()["text"] == "real ocr"
+    assert registry.take_screenshot()["success"]
+    assert real.probed == ["ocr", "capture"]
+
+    status = registry.capabilities()
+    assert status["ocr"]["backend"] == "real"
+    assert status["capture"]["backend"] == "mock"
+    assert status["capture"]["reason"] == "pyautogui is unavailable"
+
+
+def test_pins_override_probing(mock_automation):
+    real = FakeRealAutomation()
+    registry = CapabilityRegistry(real, mock_automation, {"ocr": "mock"})
+
+    assert registry.read_text_from_screen()["success"]
+    assert registry.backends()["ocr"]["source"] == "pinned"
+    assert "ocr" not in real.probed
+
+
+def test_pins_from_env():
+    pins = pins_from_env({"AUTOMATION_BACKEND": "mock", "AUTOMATION_BACKEND_OCR": "Real"})
+    assert pins["ocr"] == "real"
+    assert pins["audio"] == "mock"
+    with pytest.raises(ValueError):
+        pins_from_env({"AUTOMATION_BACKEND_AUDIO": "sometimes"})
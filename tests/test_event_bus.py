@@ -0,0 +1,53 @@
+import asyncio
+
+from event_bus import EventBus, HotkeyPressed, SequenceCompleted, WakeWordDetected, event_bus
+
+
+def test_typed_subscribers_only_receive_their_events():
+    bus = EventBus()
+    hotkeys, everything = [], []
+    bus.subscribe(hotkeys.append, HotkeyPressed.type)
+    bus.subscribe(everything.append)
+
+    bus.publish(HotkeyPressed(key_combination="ctrl+alt+h", action="template:system_health"))
+    bus.publish(SequenceCompleted(name="Login", successful_actions=3, total_actions=3))
+    bus.wait_idle()
+
+    assert [e.action for e in hotkeys] == ["template:system_health"]
+    assert [e.type for e in everything] == ["hotkey", "sequence_completed"]
+    assert everything[1].to_dict()["successful_actions"] == 3
+
+
+def test_full_queue_drops_instead_of_blocking():
+    bus = EventBus(max_queue=1)
+    bus._ensure_started = lambda: None  # keep the dispatcher from draining the queue
+    assert bus.publish(WakeWordDetected(wake_word="shayak"))
+    assert not bus.publish(WakeWordDetected(wake_word="shayak"))
+    assert bus.stats == {"published": 1, "delivered": 0, "dropped": 1}
+
+
+def test_async_subscribers_receive_event_dicts():
+    async def scenario():
+        bus = EventBus()
+        client_queue, unsubscribe = bus.subscribe_async(asyncio.get_running_loop())
+        bus.publish(WakeWordDetected(wake_word="shayak", latency=0.4))
+        event = await asyncio.wait_for(client_queue.get(), timeout=2)
+        unsubscribe()
+        return event
+
+    event = asyncio.run(scenario())
+    assert event["type"] == "wake_word"
+    assert event["latency"] == 0.4
+
+
+def test_mock_hotkey_publishes_bound_action(mock_automation):
+    received = []
+    unsubscribe = event_bus.subscribe(received.append, HotkeyPressed.type)
+    try:
+        mock_automation.setup_hotkey("ctrl+alt+s", "sequence:abc123")
+        assert mock_automation.trigger_hotkey("ctrl+alt+s")["success"]
+        assert not mock_automation.trigger_hotkey("ctrl+alt+x")["success"]
+        event_bus.wait_idle()
+    finally:
+        unsubscribe()
+    assert [e.action for e in received] == ["sequence:abc123"]
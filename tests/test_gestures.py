@@ -0,0 +1,72 @@
+import pytest
+
+from gestures import build_gesture_path, normalize_points
+
+
+def test_normalize_points_accepts_dicts_and_pairs():
+    assert normalize_points([{"x": 1, "y": 2}, [3, 4]]) == [(1.0, 2.0), (3.0, 4.0)]
+
+
+def test_polyline_samples_follow_sample_rate():
+    path = build_gesture_path([[0, 0], [100, 0]], duration=1.0, sample_rate=10)
+    assert len(path) == 11
+    assert path[0] == {"x": 0, "y": 0, "t": 0.0}
+    assert path[-1] == {"x": 100, "y": 0, "t": 1.0}
+    assert [p["x"] for p in path] == list(range(0, 101, 10))
+
+
+def test_polyline_spreads_samples_by_arc_length():
+    path = build_gesture_path([[0, 0], [30, 0], [30, 10]], duration=1.0, sample_rate=4)
+    assert [(p["x"], p["y"]) for p in path] == [(0, 0), (10, 0), (20, 0), (30, 0), (30, 10)]
+
+
+def test_fast_polyline_only_visits_vertices():
+    path = build_gesture_path([[0, 0], [50, 50], [100, 0]], duration=0.2, fast=True)
+    assert [(p["x"], p["y"]) for p in path] == [(0, 0), (50, 50), (100, 0)]
+    assert path[-1]["t"] == 0.2
+
+
+def test_bezier_passes_through_end_points():
+    path = build_gesture_path([[0, 0], [50, 100], [100, 0]], path_type='bezier',
+                              duration=0.5, sample_rate=20)
+    assert (path[0]["x"], path[0]["y"]) == (0, 0)
+    assert (path[-1]["x"], path[-1]["y"]) == (100, 0)
+    assert max(p["y"] for p in path) == 50
+
+
+def test_invalid_paths_are_rejected():
+    with pytest.raises(ValueError):
+        build_gesture_path([[0, 0]])
+    with pytest.raises(ValueError):
+        build_gesture_path([[0, 0], [1, 1]], path_type='spline')
+
+
+def test_mock_gesture_presses_moves_and_releases(mock_automation):
+    result = mock_automation.perform_gesture([[10, 10], [200, 10], [200, 300]], fast=True)
+    assert result["success"]
+    events = mock_automation.last_gesture_events
+    assert events[0] == {"type": "move", "x": 10, "y": 10}
+    assert events[1] == {"type": "down", "button": "left"}
+    assert events[-1] == {"type": "up", "button": "left"}
+    assert [e for e in events if e["type"] == "move"][-1] == {"type": "move", "x": 200, "y": 300}
+
+
+def test_mock_drag_uses_start_position(mock_automation):
+    result = mock_automation.drag_and_drop(300, 400, 500, 600, duration=0.1)
+    assert result["success"]
+    assert result["start_position"] == {"x": 300, "y": 400}
+    assert mock_automation.last_gesture_events[0] == {"type": "move", "x": 300, "y": 400}
+
+
+def test_mock_gesture_rejects_off_screen_points(mock_automation):
+    result = mock_automation.perform_gesture([[0, 0], [5000, 0]])
+    assert not result["success"]
+    assert "outside screen bounds" in result["error"]
+
+
+def test_gesture_sequence_action(mock_automation):
+    result = mock_automation.execute_automation_sequence([
+        {"type": "gesture", "params": {"points": [[0, 0], [10, 10]], "fast": True}},
+        {"type": "drag", "params": {"start_x": 0, "start_y": 0, "end_x": 5, "end_y": 5}},
+    ])
+    assert result["successful_actions"] == 2
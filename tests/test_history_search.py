@@ -0,0 +1,77 @@
+from history_search import HistorySearch, InvertedIndex, search_terms, tokenize
+
+
+def command_row(row_id, command, output="", success=True, user_id="ops", day=1):
+    return {"id": row_id, "user_id": user_id, "command": command, "output": output,
+            "success": success, "timestamp": f"2026-01-{day:02d}T12:00:00"}
+
+
+def test_search_terms_are_distinct_and_capped():
+    assert tokenize("Active Internet connections (w/o servers)") == \
+        ["active", "internet", "connections", "w", "o", "servers"]
+    assert search_terms("tcp tcp udp TCP", limit=10) == "tcp udp"
+    assert search_terms(" ".join(f"word{i}" for i in range(500)), limit=3) == "word0 word1 word2"
+
+
+def test_index_matches_all_terms_with_filters():
+    index = InvertedIndex()
+    index.add(command_row("1", "netstat -an", "tcp LISTEN 0.0.0.0:22", day=1), "command")
+    index.add(command_row("2", "netstat -rn", "Kernel IP routing table", success=False, day=5), "command")
+    index.add(command_row("3", "netstat -an", "tcp LISTEN", user_id="someone-else", day=6), "command")
+    index.add({"id": "4", "user_id": "ops", "natural_language": "show network connections",
+               "interpreted_command": "netstat -an", "success": True,
+               "timestamp": "2026-01-07T12:00:00"}, "interpretation")
+
+    assert [hit["id"] for hit in index.search("netstat", "ops")] == ["4", "2", "1"]
+    assert [hit["id"] for hit in index.search("netstat listen", "ops")] == ["1"]
+    assert [hit["id"] for hit in index.search("netstat", "ops", success=False)] == ["2"]
+    assert [hit["id"] for hit in index.search("netstat", "ops", since="2026-01-02", kinds=["command"])] == ["2"]
+    assert index.search("netstat", "ops")[0]["kind"] == "interpretation"
+    assert "output" not in index.search("listen", "ops")[0]
+
+
+def test_oldest_entries_are_evicted():
+    index = InvertedIndex(max_docs=2)
+    for i in range(3):
+        index.add(command_row(str(i), f"uptime run{i}", day=i + 1), "command")
+    assert len(index) == 2
+    assert [hit["id"] for hit in index.search("uptime", "ops")] == ["2", "1"]
+    assert index.search("run0", "ops") == []
+
+
+class FakeCursor(list):
+    def sort(self, key, direction):
+        return FakeCursor(sorted(self, key=lambda doc: doc[key], reverse=direction < 0))
+
+    def limit(self, count):
+        return FakeCursor(self[:count])
+
+
+class FakeCollection:
+    def __init__(self, docs=()):
+        self.docs = list(docs)
+        self.queries = []
+
+    def find(self, query, projection=None):
+        self.queries.append(query)
+        return FakeCursor(dict(doc) for doc in self.docs)
+
+
+def test_local_index_keeps_the_newest_rows_of_both_collections():
+    commands = FakeCollection(command_row(str(i), "uptime", day=i + 1) for i in range(5))
+    interpretations = FakeCollection([{"id": "n1", "user_id": "ops", "natural_language": "how long is uptime",
+                                       "interpreted_command": "uptime", "success": True,
+                                       "timestamp": "2026-01-04T13:00:00"}])
+    search = HistorySearch(commands, interpretations, mode="local", max_local_docs=3)
+    search.load_local_index()
+
+    assert [hit["id"] for hit in search.search("uptime", "ops")] == ["4", "n1", "3"]
+
+
+def test_mongo_search_requires_every_term():
+    commands, interpretations = FakeCollection(), FakeCollection()
+    search = HistorySearch(commands, interpretations, mode="mongo")
+    search.search("Disk usage", "ops", kinds=["command"])
+
+    assert commands.queries[0]["$text"] == {"$search": '"disk" "usage"'}
+    assert search.search("  ", "ops") == []
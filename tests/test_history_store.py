@@ -0,0 +1,174 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from history_store import HistoryStore, compress_text, decompress_text
+
+
+class FakeCursor(list):
+    def sort(self, key, direction):
+        return FakeCursor(sorted(self, key=lambda doc: doc[key], reverse=direction < 0))
+
+    def limit(self, count):
+        return FakeCursor(self[:count])
+
+
+class FakeCollection:
+    """Just enough of a pymongo collection for HistoryStore"""
+
+    def __init__(self):
+        self.docs = []
+        self.writes = 0
+
+    def insert_one(self, doc):
+        self.writes += 1
+        self.docs.append(dict(doc))
+
+    def update_one(self, query, update, upsert=False):
+        self.writes += 1
+        for doc in self.docs:
+            if doc["_id"] == query["_id"]:
+                doc.update(update.get("$set", {}))
+                return
+        self.docs.append({**query, **update.get("$setOnInsert", {}), **update.get("$set", {})})
+
+    def find(self, query, projection=None):
+        def matches(doc):
+            for key, condition in query.items():
+                if isinstance(condition, dict):
+                    if doc.get(key) not in condition["$in"]:
+                        return False
+                elif doc.get(key) != condition:
+                    return False
+            return True
+        return FakeCursor({k: v for k, v in doc.items() if k != "_id" or projection.get("_id", 1)}
+                          for doc in self.docs if matches(doc))
+
+
+def make_store(**kwargs):
+    return HistoryStore(FakeCollection(), FakeCollection(), FakeCollection(), FakeCollection(), **kwargs)
+
+
+def test_compression_round_trip():
+    text = "Filesystem Size Used\n" * 100
+    assert decompress_text(compress_text(text)) == text
+    assert len(compress_text(text)) < len(text) // 10
+
+
+def test_repeated_output_is_stored_once_and_hydrated():
+    store = make_store()
+    for minute in range(5):
+        store.insert_command({"id": str(minute), "user_id": "ops", "command": "uptime", "success": True,
+                              "output": " 10:00 up 3 days\n", "error": "", "timestamp": f"2026-01-01T10:0{minute}"})
+
+    assert len(store.blobs.docs) == 1
+    assert store.blobs.writes == 1
+    assert all("output" not in row and row["output_hash"] for row in store.commands.docs)
+
+    history = store.recent_commands("ops", limit=2)
+    assert [row["id"] for row in history] == ["4", "3"]
+    assert history[0]["output"] == " 10:00 up 3 days\n"
+    assert history[0]["error"] == ""
+    assert "created_at" not in history[0]
+
+
+def test_batch_results_and_full_mode():
+    store = make_store()
+    store.insert_batch({"id": "b1", "user_id": "ops", "timestamp": "2026-01-01T10:00",
+                        "results": [{"output": "a\n"}, {"output": "a\n", "error": "warning\n"}]})
+    [batch] = store.recent_batches("ops")
+    assert batch["results"] == [{"output": "a\n", "error": ""}, {"output": "a\n", "error": "warning\n"}]
+    assert len(store.blobs.docs) == 2
+
+    full = make_store(mode="full")
+    full.insert_command({"id": "1", "user_id": "ops", "output": "x", "timestamp": "t"})
+    assert full.commands.docs[0]["output"] == "x"
+    assert full.blobs.docs == []
+
+
+class CommandRows(FakeCollection):
+    """Command rows with the updates and the rollup aggregation HistoryStore.rollup() runs"""
+
+    fail_deletes = False
+
+    @staticmethod
+    def matches(doc, query):
+        for key, condition in query.items():
+            if isinstance(condition, dict):
+                if "$lt" in condition and not doc[key] < condition["$lt"]:
+                    return False
+                if "$exists" in condition and (key in doc) != condition["$exists"]:
+                    return False
+            elif doc.get(key) != condition:
+                return False
+        return True
+
+    def update_many(self, query, update):
+        for doc in self.docs:
+            if self.matches(doc, query):
+                doc.update(update["$set"])
+
+    def distinct(self, key, query):
+        return sorted({doc[key] for doc in self.docs if self.matches(doc, query)})
+
+    def aggregate(self, pipeline):
+        groups = {}
+        for doc in self.docs:
+            if not self.matches(doc, pipeline[0]["$match"]):
+                continue
+            key = (doc["user_id"], doc["command"], doc["created_at"].strftime("%Y-%m-%d"))
+            group = groups.setdefault(key, {
+                "_id": {"user_id": key[0], "command": key[1], "day": key[2]},
+                "runs": 0, "successes": 0, "first_run": doc["created_at"], "last_run": doc["created_at"]
+            })
+            group["runs"] += 1
+            group["successes"] += doc["success"]
+            group["first_run"] = min(group["first_run"], doc["created_at"])
+            group["last_run"] = max(group["last_run"], doc["created_at"])
+        return list(groups.values())
+
+    def delete_many(self, query):
+        if self.fail_deletes:
+            raise ConnectionError("connection lost")
+        self.docs = [doc for doc in self.docs if not self.matches(doc, query)]
+
+
+class Rollups(FakeCollection):
+    def update_one(self, query, update, upsert=False):
+        if not any(all(doc.get(k) == v for k, v in query.items()) for doc in self.docs):
+            self.docs.append({**query, **update["$setOnInsert"]})
+
+
+def test_rollup_interrupted_before_delete_does_not_double_count():
+    store = HistoryStore(CommandRows(), FakeCollection(), FakeCollection(), Rollups(), rollup_after_days=30)
+    now = datetime(2026, 3, 1, 12)
+    for i, age in enumerate([40, 40, 40, 1]):
+        store.commands.insert_one({"id": str(i), "user_id": "ops", "command": "uptime", "success": i != 1,
+                                   "created_at": now - timedelta(days=age)})
+
+    store.commands.fail_deletes = True
+    with pytest.raises(ConnectionError):
+        store.rollup(now)
+    store.commands.fail_deletes = False
+    # A row that ages out meanwhile goes into a new window alongside the unfinished one
+    assert store.rollup(now + timedelta(days=29, hours=12)) == 4
+
+    assert sum(doc["runs"] for doc in store.rollups.docs) == 4
+    assert sum(doc["successes"] for doc in store.rollups.docs) == 3
+    assert store.commands.docs == []
+    assert store.rollup(now + timedelta(days=60)) == 0
+
+
+def test_blob_ttl_covers_the_touch_interval():
+    class Indexes(FakeCollection):
+        def __init__(self):
+            super().__init__()
+            self.indexes = {}
+
+        def create_index(self, keys, expireAfterSeconds=None):
+            self.indexes[str(keys)] = expireAfterSeconds
+
+    store = HistoryStore(Indexes(), Indexes(), Indexes(), Indexes(), retention_days=1, blob_touch_interval=3600)
+    store.ensure_indexes()
+    assert store.commands.indexes["created_at"] == 86400
+    assert store.blobs.indexes["last_seen"] == 86400 + 3600
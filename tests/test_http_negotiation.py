@@ -0,0 +1,39 @@
+import gzip
+
+from http_negotiation import (MIN_COMPRESS_SIZE, compute_etag, conditional_body, etag_matches,
+                              negotiate_encoding, serialize)
+
+BODY = serialize({"rows": ["x" * 40] * 100})
+
+
+def test_etag_round_trip_answers_304():
+    etag = compute_etag(BODY)
+    assert etag == compute_etag(serialize({"rows": ["x" * 40] * 100}))
+    assert etag != compute_etag(serialize({"rows": []}))
+
+    status, body, _ = conditional_body(BODY, etag, None, "gzip")
+    assert status == 200 and body
+    assert conditional_body(BODY, etag, etag, "gzip") == (304, b"", None)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+
+
+def test_gzip_only_above_the_threshold_and_when_accepted():
+    small = b"x" * (MIN_COMPRESS_SIZE - 1)
+    assert negotiate_encoding("gzip, deflate", small) is None
+    assert negotiate_encoding("deflate", BODY) is None
+    assert negotiate_encoding(None, BODY) is None
+    assert negotiate_encoding("gzip;q=1.0, identity", BODY) in ("gzip", "br")
+    assert negotiate_encoding("gzip", BODY) == "gzip"
+
+    status, body, encoding = conditional_body(BODY, compute_etag(BODY), None, "gzip")
+    assert (status, encoding) == (200, "gzip")
+    assert gzip.decompress(body) == BODY
+
+
+def test_compressed_bodies_are_cached_per_encoding():
+    cache = {}
+    first = conditional_body(BODY, compute_etag(BODY), None, "gzip", cache)
+    assert cache == {"gzip": first[1]}
+    assert conditional_body(BODY, compute_etag(BODY), None, "gzip", cache)[1] is first[1]
@@ -0,0 +1,106 @@
+import contextvars
+import threading
+
+import pytest
+
+from job_queue import JobQueue, QueueFull
+
+
+def blocked_queue(**kwargs):
+    """A one-worker queue whose worker is held until the returned event is set"""
+    queue = JobQueue(workers=1, **kwargs)
+    gate = threading.Event()
+    started = threading.Event()
+    queue.submit(lambda: (started.set(), gate.wait(5)), user_id="gate")
+    assert started.wait(5)
+    return queue, gate
+
+
+def test_users_take_turns_and_priorities_go_first():
+    queue, gate = blocked_queue(weights={"bulk": 2})
+    order = []
+    futures = [queue.submit(order.append, f"bulk-{i}", user_id="bulk") for i in range(4)]
+    futures.append(queue.submit(order.append, "alice-0", user_id="alice"))
+    futures.append(queue.submit(order.append, "alice-1", user_id="alice"))
+    futures.append(queue.submit(order.append, "urgent", user_id="alice", priority="high"))
+    gate.set()
+    for future in futures:
+        future.result(timeout=5)
+
+    assert order == ["urgent", "bulk-0", "bulk-1", "alice-0", "bulk-2", "bulk-3", "alice-1"]
+
+
+def test_admission_control_and_timings():
+    queue, gate = blocked_queue(max_queued=10, max_queued_per_user=2)
+    first = queue.submit(lambda: {"success": True}, user_id="bob")
+    queue.submit(lambda: {"success": True}, user_id="bob")
+
+    with pytest.raises(QueueFull) as rejected:
+        queue.submit(lambda: {"success": True}, user_id="bob")
+    assert rejected.value.retry_after >= 1
+    queue.submit(lambda: {"success": True}, user_id="carol")
+
+    gate.set()
+    result, timing = first.result(timeout=5)
+    assert result == {"success": True}
+    assert timing["queue_seconds"] >= 0 and timing["run_seconds"] >= 0
+    assert queue.stats()["rejected"] == 1
+
+
+def test_failures_propagate_to_the_caller():
+    queue = JobQueue(workers=1)
+    future = queue.submit(lambda: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        future.result(timeout=5)
+    assert queue.stats()["failed"] == 1
+
+
+def test_jobs_run_in_the_submitters_context():
+    request_id = contextvars.ContextVar("request_id", default=None)
+    queue = JobQueue(workers=1)
+
+    request_id.set("req-1")
+    future = queue.submit(request_id.get)
+    request_id.set("req-2")
+
+    assert future.result(timeout=5)[0] == "req-1"
+
+
+def test_lane_jobs_wait_without_holding_a_worker():
+    queue = JobQueue(workers=2, lanes={"sequence": 1})
+    gate = threading.Event()
+    started = threading.Event()
+    first = queue.submit(lambda: (started.set(), gate.wait(5)), user_id="alice", lane="sequence")
+    assert started.wait(5)
+
+    second = queue.submit(lambda: "second sequence", user_id="bob", lane="sequence")
+    command = queue.submit(lambda: "command", user_id="carol")
+    # The free worker skips the waiting sequence and runs the command
+    assert command.result(timeout=5)[0] == "command"
+    assert not second.done()
+    assert queue.stats()["running_by_lane"] == {"sequence": 1}
+
+    gate.set()
+    first.result(timeout=5)
+    assert second.result(timeout=5)[0] == "second sequence"
+
+
+def test_running_cap_leaves_workers_for_other_users():
+    queue = JobQueue(workers=2, max_running_per_user=1)
+    gate = threading.Event()
+    started = threading.Event()
+    queue.submit(lambda: (started.set(), gate.wait(5)), user_id="bulk")
+    assert started.wait(5)
+
+    order = []
+    backlog = [queue.submit(order.append, f"bulk-{i}", user_id="bulk") for i in range(3)]
+    single = queue.submit(order.append, "alice", user_id="alice")
+    single.result(timeout=5)
+    assert order == ["alice"]
+
+    gate.set()
+    for future in backlog:
+        future.result(timeout=5)
+    assert order == ["alice", "bulk-0", "bulk-1", "bulk-2"]
+    with pytest.raises(ValueError):
+        queue.submit(order.append, "x", lane="gpu")
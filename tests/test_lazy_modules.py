@@ -0,0 +1,32 @@
+import sys
+
+import pytest
+
+from lazy_modules import LazyModule, capability_status
+
+
+def test_module_is_imported_on_first_attribute_access():
+    sys.modules.pop("colorsys", None)
+    loaded = []
+    colorsys = LazyModule("colorsys", on_load=loaded.append)
+
+    assert "colorsys" not in sys.modules
+    assert colorsys.status() == {"available": True, "loaded": False, "error": None}
+
+    assert colorsys.rgb_to_hsv(1.0, 0.0, 0.0)[2] == 1.0
+    assert len(loaded) == 1
+    assert colorsys.status()["loaded"]
+
+
+def test_missing_module_fails_per_use_and_in_status():
+    missing = LazyModule("definitely_not_a_real_module")
+    present = LazyModule("json")
+
+    status = capability_status([present, missing])
+    assert not status["available"]
+    assert "definitely_not_a_real_module is not installed" in status["error"]
+
+    with pytest.raises(ImportError):
+        missing.anything
+    with pytest.raises(ImportError, match="unavailable"):
+        missing.anything
@@ -0,0 +1,60 @@
+import io
+
+from local_recognizer import IntentMatcher, StaticRecognizer, VoiceIntentRecognizer
+
+PHRASES = {
+    'show me the files': 'ls -la',
+    'show files': 'ls -la',
+    'time': 'date',
+    'what time is it': 'date',
+    'disk usage': 'df -h',
+}
+
+
+def test_exact_and_contained_phrases():
+    matcher = IntentMatcher(PHRASES)
+    assert matcher.match("What time is it?") == {"phrase": "what time is it", "command": "date"}
+    assert matcher.match("please show me the files now")["phrase"] == "show me the files"
+    assert matcher.match("check disk usage") == {"phrase": "disk usage", "command": "df -h"}
+
+
+def test_phrases_match_on_word_boundaries():
+    matcher = IntentMatcher(PHRASES)
+    assert matcher.match("sometimes") is None
+    assert matcher.match("") is None
+
+
+def test_recognizer_falls_back_when_nothing_is_heard():
+    matcher = IntentMatcher(PHRASES)
+    audio = io.BytesIO(b"RIFF")
+
+    hit = VoiceIntentRecognizer(StaticRecognizer("show files"), matcher).recognize_intent(audio)
+    assert hit["success"] and hit["command"] == "ls -la" and hit["method"] == "local_static"
+
+    miss = VoiceIntentRecognizer(StaticRecognizer(None), matcher).recognize_intent(audio)
+    assert not miss["success"]
+
+
+def test_sphinx_decoder_is_built_on_first_use(monkeypatch):
+    import local_recognizer
+    from local_recognizer import SphinxKeywordRecognizer
+
+    built = []
+
+    class Decoder:
+        def __init__(self, entries, sample_rate, skip_unknown):
+            built.append(entries)
+            if len(built) > 1:
+                raise AssertionError("decoder rebuilt")
+            raise ValueError("no acoustic model")
+
+    monkeypatch.setattr(local_recognizer, "KeywordDecoder", Decoder)
+    recognizer = SphinxKeywordRecognizer(["show files"])
+    assert built == []
+
+    recognizer.warm()
+    assert built == [[("show files", 0.8)]]
+    # The failure is remembered, so the intent path falls back without retrying the load
+    result = VoiceIntentRecognizer(recognizer, IntentMatcher(PHRASES)).recognize_intent(io.BytesIO(b""))
+    assert not result["success"] and "no acoustic model" in result["error"]
+    assert len(built) == 1
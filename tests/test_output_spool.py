@@ -0,0 +1,51 @@
+import os
+import tempfile
+import time
+
+import pytest
+
+from output_spool import OutputSpool
+
+
+def temp_stream(data: bytes):
+    stream = tempfile.TemporaryFile()
+    stream.write(data)
+    return stream
+
+
+def test_small_output_stays_inline(tmp_path):
+    spool = OutputSpool(str(tmp_path / "outputs"), inline_limit=100)
+    with temp_stream(b"total 0\n") as stream:
+        result = spool.spool(stream)
+    assert result == {"text": "total 0\n", "size": 8, "truncated": False, "output_id": None}
+    assert list((tmp_path / "outputs").iterdir()) == []
+
+
+def test_large_output_is_spooled_and_range_readable(tmp_path):
+    spool = OutputSpool(str(tmp_path / "outputs"), inline_limit=10, chunk_size=64)
+    data = b"".join(f"line {i}\n".encode() for i in range(100))
+    with temp_stream(data) as stream:
+        result = spool.spool(stream)
+
+    assert result["truncated"]
+    assert result["text"] == data[:10].decode()
+    assert result["size"] == len(data) == spool.size(result["output_id"])
+    assert spool.read_range(result["output_id"]) == data
+    # Spans several chunks and starts mid-chunk
+    assert spool.read_range(result["output_id"], 50, 300) == data[50:300]
+    assert spool.read_range(result["output_id"], len(data) - 5, len(data) + 100) == data[-5:]
+
+
+def test_unknown_ids_and_pruning(tmp_path):
+    spool = OutputSpool(str(tmp_path / "outputs"), inline_limit=1)
+    with pytest.raises(ValueError):
+        spool.size("../../etc/passwd")
+    with pytest.raises(KeyError):
+        spool.size("0" * 32)
+
+    with temp_stream(b"stale output") as stream:
+        output_id = spool.spool(stream)["output_id"]
+    old = time.time() - 7200
+    os.utime(tmp_path / "outputs" / f"{output_id}.json", (old, old))
+    assert spool.prune(3600) == 1
+    assert list((tmp_path / "outputs").iterdir()) == []
@@ -0,0 +1,76 @@
+import threading
+import time
+
+from profiler import NOT_PROFILED, SamplingProfiler
+
+
+def slow_template_match():
+    deadline = time.perf_counter() + 0.1
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+
+def test_disabled_profiler_does_nothing():
+    profiler = SamplingProfiler()
+    assert profiler.profile("click_on_image") is NOT_PROFILED
+
+    traced = profiler.profiled()(slow_template_match)
+    traced()
+    assert profiler.recent() == []
+
+
+def test_slow_calls_keep_collapsed_stacks():
+    profiler = SamplingProfiler(interval=0.002, slow_threshold=0.05)
+    profiler.configure(enabled=True)
+
+    @profiler.profiled("automation.click_on_image")
+    def click_on_image():
+        slow_template_match()
+
+    click_on_image()
+    profiler.profiled("fast")(lambda: None)()
+
+    [summary] = profiler.recent()
+    assert summary["name"] == "automation.click_on_image"
+    assert summary["samples"] > 5 and "stacks" not in summary
+
+    collapsed = profiler.collapsed(profiler.get(summary["id"]))
+    first_line = collapsed.splitlines()[0]
+    stack, count = first_line.rsplit(" ", 1)
+    assert stack.startswith("wrapper (profiler.py:")
+    assert "slow_template_match (test_profiler.py:" in stack
+    assert int(count) > 0
+
+
+def test_nested_calls_are_profiled_once():
+    profiler = SamplingProfiler(slow_threshold=0.0)
+    profiler.configure(enabled=True)
+    with profiler.profile("run_automation_sequence"):
+        assert profiler.profile("automation.type_text") is NOT_PROFILED
+    assert [p["name"] for p in profiler.recent()] == ["run_automation_sequence"]
+
+
+def test_request_profiling_keeps_every_call_and_reports_ids():
+    profiler = SamplingProfiler(slow_threshold=60.0)
+    token = profiler.request_profiling()
+    with profiler.profile("run_command"):
+        pass
+    profile_ids = profiler.end_request_profiling(token)
+
+    assert profile_ids == [profiler.recent()[0]["id"]]
+    assert profiler.profile("run_command") is NOT_PROFILED
+
+
+def test_other_threads_are_not_sampled_into_a_profile():
+    profiler = SamplingProfiler(interval=0.002, slow_threshold=0.0)
+    profiler.configure(enabled=True)
+    stop = threading.Event()
+    busy = threading.Thread(target=lambda: stop.wait(1))
+    busy.start()
+    with profiler.profile("wait"):
+        time.sleep(0.05)
+    stop.set()
+    busy.join()
+
+    stacks = profiler.get(profiler.recent()[0]["id"])["stacks"]
+    assert stacks and all("test_other_threads" in stack for stack in stacks)
@@ -0,0 +1,59 @@
+import pytest
+
+from prometheus_metrics import Histogram, InstrumentedAutomation, MetricsRegistry
+
+
+def test_observations_land_in_cumulative_buckets():
+    histogram = Histogram("stage_seconds", "Stage latency", ["stage"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, stage="command")
+
+    snapshot = histogram.snapshot(stage="command")
+    assert snapshot["count"] == 4
+    assert snapshot["sum"] == pytest.approx(4.05)
+    assert snapshot["buckets"] == {0.1: 1, 1.0: 3, float("inf"): 4}
+    assert histogram.snapshot(stage="llm") is None
+
+
+def test_render_uses_the_prometheus_text_format():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("request_seconds", "Request latency", ["route"], buckets=(0.5,))
+    histogram.observe(0.2, route='/api/"quoted"')
+
+    text = registry.render()
+    assert "# TYPE request_seconds histogram" in text
+    assert 'request_seconds_bucket{route="/api/\\"quoted\\"",le="0.5"} 1' in text
+    assert 'request_seconds_bucket{route="/api/\\"quoted\\"",le="+Inf"} 1' in text
+    assert 'request_seconds_count{route="/api/\\"quoted\\""} 1' in text
+    assert text.endswith("\n")
+
+
+def test_labels_must_match_and_names_are_unique():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("stage_seconds", "Stage latency", ["stage"])
+    with pytest.raises(ValueError):
+        histogram.observe(1.0, route="/api/")
+    with pytest.raises(ValueError):
+        registry.histogram("stage_seconds", "Again")
+
+
+class FakeAutomation:
+    screen_width = 1920
+
+    def read_text_from_screen(self, region=None):
+        return {"success": True, "text": "hello"}
+
+    def capabilities(self):
+        return {}
+
+
+def test_automation_calls_are_timed_per_capability():
+    histogram = Histogram("automation_seconds", "Automation latency", ["capability", "action"])
+    automation = InstrumentedAutomation(FakeAutomation(), histogram)
+
+    assert automation.read_text_from_screen()["text"] == "hello"
+    assert automation.screen_width == 1920
+    automation.capabilities()
+
+    assert histogram.snapshot(capability="ocr", action="read_text_from_screen")["count"] == 1
+    assert len(histogram._series) == 1
@@ -0,0 +1,138 @@
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from scheduler import STATE_FIELDS, ScheduledJob, Scheduler, parse_schedule
+
+
+class MemoryStore:
+    def __init__(self):
+        self.docs = {}
+
+    def save(self, job):
+        self.docs[job.id] = job.to_dict()
+
+    def save_state(self, job):
+        if job.id in self.docs:
+            self.docs[job.id].update({k: v for k, v in job.to_dict().items() if k in STATE_FIELDS})
+
+    def delete(self, job_id):
+        self.docs.pop(job_id, None)
+
+    def load_all(self):
+        return [ScheduledJob.from_dict(doc) for doc in self.docs.values()]
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_cron_and_interval_parsing():
+    monday_morning = datetime(2026, 1, 5, 8, 59).timestamp()
+    workday = parse_schedule("*/15 9-17 * * 1-5")
+    first = workday.next_after(monday_morning)
+    assert datetime.fromtimestamp(first) == datetime(2026, 1, 5, 9, 0)
+    assert datetime.fromtimestamp(workday.next_after(first)) == datetime(2026, 1, 5, 9, 15)
+
+    friday_evening = datetime(2026, 1, 9, 17, 50).timestamp()
+    assert datetime.fromtimestamp(workday.next_after(friday_evening)) == datetime(2026, 1, 12, 9, 0)
+    assert datetime.fromtimestamp(parse_schedule("0 0 29 2 *").next_after(monday_morning)) == datetime(2028, 2, 29)
+    assert parse_schedule("every 5m").seconds == 300
+
+    for bad in ("61 * * * *", "* * *", "every -1s"):
+        with pytest.raises(ValueError):
+            parse_schedule(bad)
+
+
+def test_interval_job_runs_repeatedly():
+    runs = []
+    scheduler = Scheduler(lambda job: runs.append(job.name) or {"success": True})
+    scheduler.add_job(ScheduledJob(name="tick", schedule="every 0.05s", action="batch", commands=["echo hi"]))
+    scheduler.start()
+    try:
+        assert wait_for(lambda: len(runs) >= 3)
+    finally:
+        scheduler.stop()
+    job = next(iter(scheduler.jobs.values()))
+    assert job.last_result["success"]
+    assert scheduler.stats["failures"] == 0
+
+
+def test_missed_run_is_skipped_and_rescheduled():
+    runs = []
+    scheduler = Scheduler(lambda job: runs.append(job) or {"success": True})
+    job = ScheduledJob(name="audit", schedule="@hourly", action="template:security_audit",
+                       misfire_policy="skip", misfire_grace=60, next_run=time.time() - 600)
+    scheduler.add_job(job)
+    scheduler.start()
+    try:
+        assert wait_for(lambda: job.missed_runs == 1)
+    finally:
+        scheduler.stop()
+    assert runs == []
+    assert job.next_run > time.time()
+
+
+def test_concurrency_limit_skips_overlapping_runs():
+    release = threading.Event()
+    calls = []
+
+    def slow_runner(job):
+        calls.append(job.id)
+        release.wait(5)
+        return {"success": True}
+
+    scheduler = Scheduler(slow_runner)
+    job = scheduler.add_job(ScheduledJob(name="slow", schedule="every 0.02s", action="batch", commands=["x"]))
+    scheduler.start()
+    try:
+        assert wait_for(lambda: job.skipped_runs >= 2)
+        assert len(calls) == 1
+        assert not scheduler.run_now(job.id)
+    finally:
+        release.set()
+        scheduler.stop()
+
+
+def test_jobs_persist_and_sync_between_schedulers():
+    store = MemoryStore()
+    leader = Scheduler(lambda job: {"success": True}, store=store)
+    follower = Scheduler(lambda job: {"success": True}, store=store)
+
+    job = follower.add_job(ScheduledJob(name="health", schedule="@daily", action="template:system_health"))
+    leader.sync_from_store()
+    assert leader.jobs[job.id].schedule == "@daily"
+
+    follower.remove_job(job.id)
+    leader.sync_from_store()
+    assert leader.jobs == {}
+
+
+def test_job_removed_while_running_is_not_written_back():
+    store = MemoryStore()
+    release = threading.Event()
+    started = threading.Event()
+
+    def runner(job):
+        started.set()
+        release.wait(5)
+        return {"success": True}
+
+    scheduler = Scheduler(runner, store=store)
+    job = scheduler.add_job(ScheduledJob(name="slow", schedule="@daily", action="template:system_health"))
+    assert scheduler.run_now(job.id)
+    assert started.wait(5)
+
+    assert scheduler.remove_job(job.id)
+    release.set()
+    assert wait_for(lambda: scheduler.running(job.id) == 0)
+    time.sleep(0.05)
+
+    assert job.id not in store.docs
+    scheduler.sync_from_store()
+    assert job.id not in scheduler.jobs
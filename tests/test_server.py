@@ -0,0 +1,28 @@
+import inspect
+import os
+
+import pytest
+
+# The app module needs the full server environment (FastAPI, pymongo, ...)
+pytest.importorskip("fastapi")
+pytest.importorskip("pymongo")
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    os.environ.setdefault("AUTOMATION_BACKEND", "mock")
+    os.environ.setdefault("OUTPUT_SPOOL_DIR", str(tmp_path_factory.mktemp("outputs")))
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("server"))
+    try:
+        import server as module
+    finally:
+        os.chdir(cwd)
+    return module
+
+
+def test_every_bootstrap_section_is_awaitable(server):
+    for name, factory in server.BOOTSTRAP_SECTIONS.items():
+        section = factory("default")
+        assert inspect.isawaitable(section), f"bootstrap section '{name}' is not awaitable"
+        section.close()
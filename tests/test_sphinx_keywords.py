@@ -0,0 +1,76 @@
+import sys
+import types
+from types import SimpleNamespace
+
+import pytest
+
+from sphinx_keywords import KeywordDecoder
+
+
+class FakeDecoder:
+    """Records what KeywordDecoder asks of PocketSphinx; 'hears' every keyword"""
+
+    instances = []
+
+    def __init__(self, **config):
+        self.config = config
+        self.dictionary = {"hello": "HH AH L OW", "world": "W ER L D"}
+        self.keyfile = None
+        self.utterances = 0
+        FakeDecoder.instances.append(self)
+
+    def lookup_word(self, word):
+        return self.dictionary.get(word)
+
+    def add_word(self, word, phones, update):
+        self.dictionary[word] = phones
+
+    def add_kws(self, name, keyfile):
+        with open(keyfile) as lines:
+            self.keyfile = lines.read()
+
+    def activate_search(self, name):
+        pass
+
+    def start_utt(self):
+        self.utterances += 1
+
+    def process_raw(self, pcm, full_utt=False):
+        self.pcm = pcm
+
+    def end_utt(self):
+        pass
+
+    def hyp(self):
+        return SimpleNamespace(hypstr=" hello world ") if self.pcm else None
+
+
+@pytest.fixture
+def pocketsphinx(monkeypatch):
+    FakeDecoder.instances = []
+    monkeypatch.setitem(sys.modules, "pocketsphinx", types.SimpleNamespace(Decoder=FakeDecoder))
+    return FakeDecoder
+
+
+def test_unknown_words_get_their_pronunciation_or_fail(pocketsphinx):
+    decoder = KeywordDecoder([("Shayak", 0.8), ("hello world", 0.5)])
+    fake = pocketsphinx.instances[0]
+    assert fake.dictionary["shayak"] == "SH AH Y AA K"
+    assert fake.keyfile == "shayak /1e-30/\nhello world /1e-60/\n"
+
+    assert decoder.decode(b"\x01\x00") == "hello world"
+    assert decoder.decode(b"") is None
+    # One decoder serves every utterance
+    assert len(pocketsphinx.instances) == 1 and fake.utterances == 2
+
+    with pytest.raises(ValueError, match="zorblax"):
+        KeywordDecoder([("zorblax", 0.8)])
+
+
+def test_unpronounceable_phrases_can_be_skipped(pocketsphinx):
+    decoder = KeywordDecoder([("cls", 0.8), ("hello", 0.8), ("hello zorblax", 0.8)], skip_unknown=True)
+    assert decoder.keywords == ["hello"]
+    assert pocketsphinx.instances[0].keyfile == "hello /1e-30/\n"
+
+    with pytest.raises(ValueError):
+        KeywordDecoder([("cls", 0.8)], skip_unknown=True)
@@ -0,0 +1,60 @@
+import asyncio
+import threading
+
+from state_feed import StateFeed
+
+
+def test_deltas_only_contain_changed_sections():
+    feed = StateFeed()
+    assert feed.publish("health", {"status": "healthy"})
+    assert feed.publish("metrics", {"cpu": 10})
+    assert not feed.publish("health", {"status": "healthy"})
+
+    version, delta = feed.changes_since(0)
+    assert version == 2
+    assert set(delta) == {"health", "metrics"}
+
+    feed.publish("metrics", {"cpu": 20})
+    version, delta = feed.changes_since(version)
+    assert delta == {"metrics": {"cpu": 20}}
+
+
+def test_waiters_wake_on_publish_from_another_thread():
+    async def scenario():
+        feed = StateFeed()
+        feed.attach(asyncio.get_running_loop())
+        feed.publish("automation", {"wake_word_active": False})
+        version, _ = feed.changes_since(0)
+
+        waiter = asyncio.create_task(feed.wait_for_changes(version, timeout=5))
+        await asyncio.sleep(0)
+        threading.Thread(target=feed.publish, args=("automation", {"wake_word_active": True})).start()
+        return await waiter
+
+    version, delta = asyncio.run(scenario())
+    assert version == 2
+    assert delta == {"automation": {"wake_word_active": True}}
+
+
+def test_idle_wait_times_out_with_empty_delta():
+    async def scenario():
+        feed = StateFeed()
+        feed.attach(asyncio.get_running_loop())
+        return await feed.wait_for_changes(0, timeout=0.01)
+
+    assert asyncio.run(scenario()) == (0, {})
+
+
+def test_concurrent_prepends_keep_every_row():
+    feed = StateFeed()
+    threads = [threading.Thread(target=lambda n=n: [feed.prepend("rows", (n, i), 1000) for i in range(200)])
+               for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    rows = feed.get("rows")
+    assert len(rows) == 800 and len(set(rows)) == 800
+    feed.prepend("rows", "newest", 3)
+    assert feed.get("rows")[0] == "newest" and len(feed.get("rows")) == 3
@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+
+import pytest
+
+import system_metrics
+from system_metrics import SystemMetricsSampler
+
+
+class FakeProcess:
+    def __init__(self, pid, name, cpu):
+        self.info = {"pid": pid, "name": name, "cpu_percent": cpu, "memory_percent": 1.234}
+
+
+class FakePsutil:
+    """Counters are advanced by the test; everything else is constant"""
+
+    def __init__(self):
+        self.bytes_sent = 1000
+        self.bytes_recv = 5000
+
+    def virtual_memory(self):
+        return SimpleNamespace(percent=50.0, used=4, total=8)
+
+    def disk_usage(self, path):
+        return SimpleNamespace(percent=25.0, used=1, total=4)
+
+    def net_io_counters(self):
+        return SimpleNamespace(bytes_sent=self.bytes_sent, bytes_recv=self.bytes_recv)
+
+    def cpu_percent(self, interval=None):
+        return 12.5
+
+    def cpu_count(self):
+        return 4
+
+    def boot_time(self):
+        return 0
+
+    def process_iter(self, attrs):
+        return [FakeProcess(1, "idle", None), FakeProcess(2, "busy", 80.0), FakeProcess(3, "some", 5.0)]
+
+
+@pytest.fixture
+def psutil(monkeypatch):
+    fake = FakePsutil()
+    monkeypatch.setattr(system_metrics, "psutil", fake)
+    return fake
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(system_metrics.time, "time", lambda: now[0])
+    return now
+
+
+def test_ring_buffer_keeps_the_newest_samples(psutil, clock):
+    sampler = SystemMetricsSampler(history_size=3, top_processes=2)
+    for _ in range(5):
+        clock[0] += 1
+        sampler.sample()
+
+    assert sampler.sequence == 5
+    assert len(sampler.history()) == 3
+    assert [s["uptime_seconds"] for s in sampler.history(2)] == [1004, 1005]
+    assert sampler.latest() is sampler.history()[-1]
+    assert [p["name"] for p in sampler.latest()["processes"]] == ["busy", "some"]
+
+
+def test_network_rate_is_measured_between_samples(psutil, clock):
+    sampler = SystemMetricsSampler()
+    first = sampler.sample()
+    assert first["network"]["sent_per_second"] == 0.0
+
+    clock[0] += 2
+    psutil.bytes_sent += 300
+    psutil.bytes_recv += 1001
+    network = sampler.sample()["network"]
+    assert (network["sent_per_second"], network["recv_per_second"]) == (150.0, 500.5)
+    assert network["bytes_recv"] == 6001
+
+
+def test_subscribers_are_notified_until_they_unsubscribe(psutil, clock):
+    sampler = SystemMetricsSampler()
+    received = []
+
+    def broken(snapshot):
+        raise RuntimeError("subscriber bug")
+
+    sampler.subscribe(broken)
+    unsubscribe = sampler.subscribe(received.append)
+    snapshot = sampler.sample()
+    assert received == [snapshot]
+
+    unsubscribe()
+    sampler.sample()
+    assert received == [snapshot]
+
+
+def test_sampler_is_unavailable_without_psutil(monkeypatch):
+    monkeypatch.setattr(system_metrics, "psutil", None)
+    sampler = SystemMetricsSampler()
+    assert not sampler.available
+    sampler.start()
+    assert sampler.latest() is None and sampler._thread is None
@@ -0,0 +1,114 @@
+import json
+import threading
+
+import pytest
+
+from tracing import OtlpJsonSink, Tracer, trace_header
+
+
+def test_spans_nest_under_the_active_trace(tmp_path):
+    sink = OtlpJsonSink(str(tmp_path / "traces.jsonl"))
+    tracer = Tracer(sink=sink)
+
+    @tracer.traced("safety_check")
+    def is_safe():
+        return True
+
+    with tracer.trace("POST /api/voice-command") as root:
+        with tracer.span("interpret") as interpret:
+            is_safe()
+        with tracer.span("execute", command="date"):
+            is_safe()
+
+    names = [span.name for span in root.trace.spans]
+    assert names == ["POST /api/voice-command", "safety_check", "interpret", "safety_check", "execute"]
+    by_name = {span.name: span for span in root.trace.spans}
+    assert by_name["interpret"].parent_id == root.span_id
+    assert root.trace.spans[1].parent_id == interpret.span_id
+    assert tracer.current() is None
+
+    sink.flush()
+    exported = json.loads((tmp_path / "traces.jsonl").read_text())
+    spans = exported["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert {span["traceId"] for span in spans} == {root.trace.trace_id}
+    assert len(root.trace.trace_id) == 32 and len(root.span_id) == 16
+    execute = next(span for span in spans if span["name"] == "execute")
+    assert execute["attributes"] == [{"key": "command", "value": {"stringValue": "date"}}]
+    assert int(execute["endTimeUnixNano"]) >= int(execute["startTimeUnixNano"])
+
+
+def test_spans_outside_a_trace_are_only_reported():
+    finished = []
+    tracer = Tracer(on_span_end=finished.append)
+    with tracer.span("command") as span:
+        pass
+    assert span.trace is None
+    assert [s.name for s in finished] == ["command"]
+
+
+def test_errors_are_recorded_and_reraised():
+    tracer = Tracer()
+    with pytest.raises(RuntimeError):
+        with tracer.trace("GET /api/") as root:
+            with tracer.span("db_write"):
+                raise RuntimeError("connection refused")
+    assert root.trace.spans[1].error == "RuntimeError: connection refused"
+    assert root.error == "RuntimeError: connection refused"
+
+
+def test_spans_are_isolated_between_threads():
+    tracer = Tracer()
+    roots = {}
+
+    def request(name):
+        with tracer.trace(name) as root:
+            with tracer.span(f"{name}-stage"):
+                pass
+        roots[name] = root
+
+    threads = [threading.Thread(target=request, args=(f"r{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for name, root in roots.items():
+        assert [span.name for span in root.trace.spans] == [name, f"{name}-stage"]
+
+
+def test_trace_header_is_compact_and_capped():
+    tracer = Tracer()
+    with tracer.trace("POST /api/batch-execute") as root:
+        for _ in range(5):
+            with tracer.span("execute"):
+                pass
+
+    header = json.loads(trace_header(root, limit=3))
+    assert header["trace_id"] == root.trace.trace_id
+    assert [span[0] for span in header["spans"]] == ["POST /api/batch-execute", "execute", "execute"]
+    assert header["dropped"] == 3
+
+
+def test_sink_writes_in_the_background_and_drops_when_backed_up(tmp_path):
+    sink = OtlpJsonSink(str(tmp_path / "traces.jsonl"), max_pending=1)
+    writing = threading.Event()
+    release = threading.Event()
+    encode = sink.encode
+
+    def slow_encode(trace_id, spans):
+        writing.set()
+        release.wait(5)
+        return encode(trace_id, spans)
+    sink.encode = slow_encode
+
+    tracer = Tracer(sink=sink)
+    for _ in range(3):
+        with tracer.trace("GET /api/health"):
+            pass
+        writing.wait(5)
+    # One trace is being written, one waits in the queue, the third was dropped
+    assert sink.dropped == 1
+
+    release.set()
+    sink.flush()
+    assert len((tmp_path / "traces.jsonl").read_text().splitlines()) == 2
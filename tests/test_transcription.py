@@ -0,0 +1,20 @@
+import io
+
+import pytest
+
+from transcription import CHUNK_SIZE, OfflineTranscriber, get_transcriber
+
+
+def test_offline_transcriber_streams_the_upload():
+    transcriber = OfflineTranscriber(text="show me the files")
+    audio = io.BytesIO(b"\0" * (CHUNK_SIZE * 3 + 10))
+    assert transcriber.transcribe(audio, "clip.wav") == "show me the files"
+    assert transcriber.bytes_read == CHUNK_SIZE * 3 + 10
+
+
+def test_backend_selection(monkeypatch):
+    monkeypatch.setenv("TRANSCRIBER_BACKEND", "offline")
+    assert get_transcriber().name == "offline"
+    assert get_transcriber("whisper").name == "whisper"
+    with pytest.raises(ValueError):
+        get_transcriber("vosk")
@@ -0,0 +1,94 @@
+import math
+import struct
+import wave
+
+from wake_word import AudioRingBuffer, EnergyGate, KeywordSpotter, WakeWordEngine, frame_rms, replay_wav
+
+SAMPLE_RATE = 16000
+
+
+def tone(seconds, amplitude, frequency=440):
+    count = int(seconds * SAMPLE_RATE)
+    return struct.pack(f"<{count}h", *(
+        int(amplitude * math.sin(2 * math.pi * frequency * i / SAMPLE_RATE)) for i in range(count)
+    ))
+
+
+def noise(seconds, amplitude=40):
+    count = int(seconds * SAMPLE_RATE)
+    return struct.pack(f"<{count}h", *((amplitude if i % 2 else -amplitude) for i in range(count)))
+
+
+class LoudSegmentSpotter(KeywordSpotter):
+    """Stand-in spotter: 'hears' the wake word in any segment with loud audio"""
+
+    name = "loud"
+
+    def __init__(self):
+        self.segments = []
+
+    def spot(self, pcm, sample_rate):
+        self.segments.append(len(pcm))
+        return frame_rms(pcm) > 1000
+
+
+def write_wav(path, pcm):
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(pcm)
+
+
+def test_ring_buffer_keeps_most_recent_audio():
+    ring = AudioRingBuffer(seconds=0.001, sample_rate=SAMPLE_RATE)  # 16 samples
+    ring.write(bytes(range(20)))
+    ring.write(bytes(range(20, 40)))
+    assert ring.size == ring.capacity == 32
+    assert ring.read_last(4) == bytes([36, 37, 38, 39])
+    assert ring.read_last(100) == bytes(range(8, 40))
+
+
+def test_gate_opens_on_speech_and_closes_after_release():
+    gate = EnergyGate(attack_frames=2, release_frames=3)
+    events = [gate.update(rms) for rms in [50, 50, 2000, 2000, 2000, 50, 50, 50]]
+    assert events == [None, None, None, 'open', None, None, None, 'close']
+
+
+def test_spotter_only_runs_on_speech(tmp_path):
+    path = tmp_path / "wake.wav"
+    write_wav(path, noise(1.0) + tone(0.6, 8000) + noise(1.0) + tone(0.4, 8000) + noise(0.5))
+
+    spotter = LoudSegmentSpotter()
+    result = replay_wav(WakeWordEngine(spotter, sample_rate=SAMPLE_RATE), str(path))
+
+    assert result["stats"]["frames"] == 175
+    assert result["stats"]["spotter_calls"] == 2
+    assert [round(d["speech_start"], 1) for d in result["detections"]] == [1.0, 2.6]
+    # Latency is speech duration plus the gate's release window
+    assert all(d["latency"] < 1.0 for d in result["detections"])
+    assert result["audio_seconds"] == 3.5
+
+
+def test_long_speech_is_split_at_max_segment_length(tmp_path):
+    path = tmp_path / "long.wav"
+    write_wav(path, noise(0.5) + tone(2.5, 8000) + noise(0.5))
+
+    spotter = LoudSegmentSpotter()
+    engine = WakeWordEngine(spotter, sample_rate=SAMPLE_RATE, max_segment_seconds=1.0)
+    result = replay_wav(engine, str(path))
+
+    assert result["stats"]["spotter_calls"] == 3
+    assert max(spotter.segments) <= engine.max_segment_bytes + engine.pre_roll_bytes + 640
+
+
+def test_starting_again_reports_the_active_wake_word(mock_automation):
+    assert mock_automation.start_wake_word_detection("shayak")["status"] == "listening"
+
+    again = mock_automation.start_wake_word_detection("computer", action="template:system_health")
+    assert (again["status"], again["wake_word"]) == ("already_listening", "shayak")
+    assert "stop detection" in again["message"]
+    assert mock_automation.wake_word_action == "template:system_health"
+
+    mock_automation.stop_wake_word_detection()
+    assert mock_automation.start_wake_word_detection("computer")["wake_word"] == "computer"
@@ -0,0 +1,120 @@
+from event_bus import WindowsChanged, event_from_dict
+from window_inventory import WindowInventory, apply_window_diff
+
+
+def make_window(title, pid, x=0):
+    return {"title": title, "pid": pid, "position": {"x": x, "y": 0, "width": 10, "height": 10}}
+
+
+def make_inventory(windows):
+    inventory = WindowInventory(lambda: [(dict(w), w["title"]) for w in windows])
+    inventory.refresh()
+    return inventory
+
+
+def test_lookup_modes():
+    inventory = make_inventory([
+        make_window("Terminal", 1),
+        make_window("Text Editor", 2),
+        make_window("Web Browser", 3),
+    ])
+    assert [w["pid"] for w in inventory.find("terminal")] == [1]
+    assert [w["pid"] for w in inventory.find("te", match="prefix")] == [1, 2]
+    assert [w["pid"] for w in inventory.find("browser", match="contains")] == [3]
+    assert [w["pid"] for w in inventory.find("Web Browsr", match="fuzzy")] == [3]
+    assert inventory.resolve("Text")["pid"] == 2
+
+
+def test_refresh_notifies_subscribers_with_diff():
+    windows = [make_window("Terminal", 1), make_window("Editor", 2)]
+    inventory = make_inventory(windows)
+    diffs = []
+    unsubscribe = inventory.subscribe(diffs.append)
+
+    windows[0] = make_window("Terminal", 1, x=50)
+    windows.pop()
+    windows.append(make_window("Browser", 3))
+    inventory.refresh()
+
+    assert len(diffs) == 1
+    assert [w["pid"] for w in diffs[0]["added"]] == [3]
+    assert [w["pid"] for w in diffs[0]["removed"]] == [2]
+    assert [w["position"]["x"] for w in diffs[0]["changed"]] == [50]
+
+    inventory.refresh()
+    assert len(diffs) == 1
+
+    unsubscribe()
+    windows.pop()
+    inventory.refresh()
+    assert len(diffs) == 1
+
+
+def test_diffs_rebuild_the_window_list():
+    windows = [make_window("Terminal", 1), make_window("Editor", 2)]
+    inventory = make_inventory(windows)
+    mirror = list(inventory.windows())
+    inventory.subscribe(lambda diff: mirror.__setitem__(slice(None), apply_window_diff(mirror, diff)))
+
+    windows[0] = make_window("Terminal", 1, x=50)
+    windows.pop()
+    windows.append(make_window("Browser", 3))
+    diff = inventory.refresh()
+
+    assert sorted(mirror, key=lambda w: w["pid"]) == sorted(inventory.windows(), key=lambda w: w["pid"])
+    # A diff the list already reflects is a no-op
+    assert apply_window_diff(mirror, diff) == mirror
+
+    # The diff survives the trip between processes as an event
+    event = event_from_dict(WindowsChanged(**diff).to_dict())
+    assert (event.added, event.removed, event.changed) == (diff["added"], diff["removed"], diff["changed"])
+
+
+def test_mock_automation_serves_windows_from_inventory(mock_automation):
+    assert mock_automation.get_window_list()["window_count"] == 3
+    assert mock_automation.find_windows("web", match="prefix")["windows"][0]["title"] == "Web Browser"
+    assert mock_automation.activate_window("Terminal")["success"]
+    assert not mock_automation.activate_window("Spreadsheet")["success"]
+
+
+def test_window_region_is_window_relative_and_clipped():
+    from window_inventory import window_region
+    info = make_window("Editor", 1, x=100)
+    info["position"].update({"width": 400, "height": 300})
+    assert window_region(info) == (100, 0, 400, 300)
+    assert window_region(info, (10, 20, 50, 60)) == (110, 20, 50, 60)
+    assert window_region(info, (350, 0, 200, 100), screen_width=480) == (450, 0, 30, 100)
+
+
+def test_scoped_results_are_translated_to_screen_space(mock_automation):
+    ocr = mock_automation.read_text_from_screen(window_title="Text Editor")
+    assert ocr["region"] == [200, 200, 600, 400]
+    assert ocr["words"][0]["bbox"]["x"] == 210
+
+    located = mock_automation.locate_on_screen("button.png", window_title="Web Browser")
+    assert (located["matches"][0]["x"], located["matches"][0]["y"]) == (200, 200)
+
+    assert not mock_automation.take_screenshot(window_title="Missing")["success"]
+
+
+def test_mock_wait_for_image_reports_a_miss(mock_automation, monkeypatch):
+    import mock_automation as mock_module
+    monkeypatch.setattr(mock_module.time, "sleep", lambda seconds: None)
+
+    assert mock_automation.wait_for_image("button.png", window_title="Web Browser")["success"]
+    missed = mock_automation.wait_for_image("button.png", timeout=3, window_title="Missing")
+    assert not missed["success"] and missed["timeout"] == 3
+    assert "Missing" in missed["error"]
+
+
+def test_windows_without_a_handle_sharing_a_title_stay_separate():
+    windows = [make_window("Untitled", None), make_window("Untitled", None, x=300),
+               make_window("Untitled", None, x=300)]
+    inventory = WindowInventory(lambda: [(dict(w), f"handle-{i}") for i, w in enumerate(windows)])
+    inventory.refresh()
+
+    found = inventory.find("untitled")
+    assert [w["position"]["x"] for w in found] == [0, 300, 300]
+    assert len({w["id"] for w in found}) == 3
+    assert [inventory.get_handle(w) for w in found] == ["handle-0", "handle-1", "handle-2"]
+    assert inventory.refresh() == {"added": [], "removed": [], "changed": []}